@@ -1,3 +1,5 @@
+import os
+import time
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
@@ -14,6 +16,7 @@ jwt = JWTManager()
 
 def create_app():
     """Función factory para crear la aplicación Flask y configurar sus componentes."""
+    started = time.perf_counter()
     app = Flask(__name__)
 
     # Cargamos la configuración desde el archivo config.py
@@ -25,6 +28,51 @@ def create_app():
     jwt.init_app(app)
     migrate.init_app(app, db)
 
+    # Hilo -> endpoint de la petición en curso, para atribuir las muestras del profiler. Se
+    # registra antes que los demás hooks para que su tiempo también se atribuya a la petición
+    from .utils.profiler import profiler
+    profiler.init_app(app)
+
+    # Una transacción por petición: los servicios hacen flush y el commit ocurre al final
+    from .utils import transaction
+    transaction.init_app(app)
+
+    # Verificación en memoria de los tokens revocados
+    from .services.token_service import TokenService
+    jwt.token_in_blocklist_loader(TokenService.is_token_revoked)
+    jwt.additional_claims_loader(TokenService.additional_claims)
+
+    # Pub/sub en memoria para el stream de eventos (SSE)
+    from .utils.pubsub import broker
+    broker.init_app(app)
+
+    # IP real del cliente detrás de los proxies de confianza (el rate limiting se hace por IP)
+    if app.config['TRUSTED_PROXY_COUNT']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
+
+    # Rate limiting por cliente y límites de concurrencia por endpoint
+    from .middlewares.rate_limit import limiter
+    limiter.init_app(app)
+
+    # Caché compartida de dos niveles (LRU del proceso + SQLite local) de la capa de servicios
+    from .utils.cache import cache
+    cache.init_app(app)
+
+    # Resúmenes en memoria de las entradas más nuevas (primeras páginas del feed)
+    from .utils.hot_set import hot_set
+    hot_set.init_app(app)
+
+    # Compresión negociada (gzip/deflate) de las respuestas JSON
+    from .middlewares import compression
+    compression.init_app(app)
+
+    # Cabeceras de caché HTTP (Cache-Control, Vary, surrogate keys) y purga del proxy inverso
+    from .middlewares import http_cache
+    http_cache.init_app(app)
+    from .utils.purge import purger
+    purger.init_app(app)
+
     # Configuración para JWT en Swagger
     authorizations = {
         'Bearer': {
@@ -35,20 +83,36 @@ def create_app():
         }
     }
 
-    # Configuramos la API Flask-RESTX
-    api = Api(
-        app,
+    # Configuramos la API Flask-RESTX. Según SWAGGER_MODE la especificación se genera a partir
+    # de los modelos ('dynamic'), se sirve pre-generada ('static') o se deshabilita ('off')
+    api_options = dict(
         title='Codenet API',
         version='1.0',
         description='API para gestión de usuarios, entradas, comentarios y seguimientos',
         authorizations=authorizations,
         security='Bearer'
     )
+    swagger_mode = app.config['SWAGGER_MODE']
+    if swagger_mode == 'static' and not os.path.exists(app.config['SWAGGER_SPEC_PATH']):
+        app.logger.warning('Swagger spec %s not found, generating it dynamically', app.config['SWAGGER_SPEC_PATH'])
+        swagger_mode = 'dynamic'
+    if swagger_mode == 'static':
+        from .utils.swagger import StaticSpecApi
+        api = StaticSpecApi(app, spec_path=app.config['SWAGGER_SPEC_PATH'], **api_options)
+    elif swagger_mode == 'off':
+        # `add_specs` solo se respeta al pasarlo a init_app
+        api = Api(doc=False, **api_options)
+        api.init_app(app, add_specs=False)
+    else:
+        api = Api(app, **api_options)
+    app.extensions['codenet_api'] = api
 
     # Importamos los controladores y namespaces
     from .controllers.user_controller import user_ns
     from .controllers.entry_controller import entry_ns
     from .controllers.auth_controller import auth_ns
+    from .controllers.stream_controller import stream_ns
+    from .controllers.admin_controller import admin_ns
     #from .controllers.comment_controller import comment_ns
     #from .controllers.following_controller import following_ns
 
@@ -56,8 +120,30 @@ def create_app():
     api.add_namespace(user_ns, path='/users')
     api.add_namespace(entry_ns, path='/entries')
     api.add_namespace(auth_ns, path='/auth')
+    api.add_namespace(stream_ns, path='/stream')
+    api.add_namespace(admin_ns, path='/admin')
     #api.add_namespace(comment_ns, path='/comments')
     #api.add_namespace(following_ns, path='/followings')
 
+    # Registramos los comandos de la CLI (`flask data ...`, `flask spec ...`, `flask related ...`)
+    from .cli import data_cli, spec_cli, related_cli, render_cli, backfill_cli, archive_cli, http_cache_cli, duplicates_cli
+    app.cli.add_command(data_cli)
+    app.cli.add_command(spec_cli)
+    app.cli.add_command(related_cli)
+    app.cli.add_command(render_cli)
+    app.cli.add_command(backfill_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(http_cache_cli)
+    app.cli.add_command(duplicates_cli)
+
+    # Preparamos el worker (pool, validadores, cachés) antes de aceptar tráfico
+    startup = {'create_app': time.perf_counter() - started}
+    if app.config['WARMUP_ENABLED']:
+        from .utils.warmup import warm_up
+        startup['warmup'] = warm_up(app, api)
+    startup['total'] = time.perf_counter() - started
+    app.extensions['startup'] = startup
+    app.logger.info('Application started in %.3fs', startup['total'])
+
     # Retornamos la aplicación ya configurada
     return app
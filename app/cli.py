@@ -0,0 +1,198 @@
+import json
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+# Tablas que se pueden exportar/importar en bloque (ver `BulkService`)
+TABLES = ['entries', 'users']
+
+# Grupo de comandos `flask data ...` para exportar e importar datos en bloque
+data_cli = AppGroup('data', help='Exportación e importación de datos en bloque.')
+
+
+@data_cli.command('export')
+@click.argument('table', type=click.Choice(TABLES))
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Archivo de salida (por defecto stdout).')
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True)
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Filas leídas del cursor por bloque.')
+def export_command(table, output, fmt, chunk_size):
+    """Exportar una tabla completa a JSONL o CSV en memoria constante."""
+    from app.services.bulk_service import BulkService
+
+    count = BulkService.export_rows(table, output, fmt=fmt, chunk_size=chunk_size)
+    click.echo(f'{count} rows exported from {table}', err=True)
+
+
+@data_cli.command('import')
+@click.argument('table', type=click.Choice(TABLES))
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True)
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Filas por INSERT y por commit.')
+@click.option('--prehashed', is_flag=True, help='Las contraseñas ya vienen hasheadas con bcrypt.')
+def import_command(table, source, fmt, chunk_size, prehashed):
+    """Importar un archivo JSONL o CSV con INSERTs multi-fila y un commit por bloque."""
+    from app.services.bulk_service import BulkService
+
+    def progress(rows, seconds):
+        click.echo(f'{rows} rows ({rows / seconds:.0f} rows/s)', err=True)
+
+    count, seconds = BulkService.import_rows(
+        table, source, fmt=fmt, chunk_size=chunk_size, prehashed=prehashed, progress=progress
+    )
+    rate = count / seconds if seconds else 0
+    click.echo(f'{count} rows imported into {table} in {seconds:.2f}s ({rate:.0f} rows/s)', err=True)
+
+
+# Grupo de comandos `flask spec ...` para la especificación Swagger
+spec_cli = AppGroup('spec', help='Especificación Swagger de la API.')
+
+
+@spec_cli.command('export')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default=None,
+              help='Archivo de salida (por defecto SWAGGER_SPEC_PATH).')
+def spec_export_command(output):
+    """Generar el swagger.json que se sirve con SWAGGER_MODE=static."""
+    from app.utils.swagger import build_spec
+
+    api = current_app.extensions['codenet_api']
+    with current_app.test_request_context():
+        spec = build_spec(api)
+    if output is None:
+        output = open(current_app.config['SWAGGER_SPEC_PATH'], 'w', encoding='utf-8')
+    with output:
+        json.dump(spec, output, ensure_ascii=False, indent=2)
+    click.echo(f'Swagger spec written to {output.name}', err=True)
+
+
+# Grupo de comandos `flask related ...` para el índice de entradas relacionadas
+related_cli = AppGroup('related', help='Índice de entradas relacionadas (TF-IDF).')
+
+
+@related_cli.command('rebuild')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Entradas por lote de similitud y commit.')
+def related_rebuild_command(batch_size):
+    """Recalcular las entradas relacionadas de todas las entradas."""
+    from app.services.related_service import RelatedService
+
+    def progress(done, total):
+        click.echo(f'{done}/{total} entries', err=True)
+
+    total = RelatedService.rebuild(batch_size=batch_size, progress=progress)
+    click.echo(f'Related entries rebuilt for {total} entries', err=True)
+
+
+# Grupo de comandos `flask render ...` para el HTML renderizado del contenido de las entradas
+render_cli = AppGroup('render', help='HTML renderizado del contenido de las entradas.')
+
+
+@render_cli.command('rebuild')
+@click.option('--chunk-size', type=int, default=500, show_default=True, help='Entradas por bloque y por commit.')
+def render_rebuild_command(chunk_size):
+    """Renderizar las entradas sin render vigente (por ejemplo, tras cambiar RENDERER_VERSION)."""
+    from app.services.render_service import RenderService
+
+    def progress(done):
+        click.echo(f'{done} entries', err=True)
+
+    total, pruned = RenderService.rebuild(chunk_size=chunk_size, progress=progress)
+    click.echo(f'Content rendered for {total} entries ({pruned} unused renders removed)', err=True)
+
+
+# Grupo de comandos `flask backfill ...` para los backfills por bloques de las migraciones
+backfill_cli = AppGroup('backfill', help='Backfills por bloques de las migraciones.')
+
+
+@backfill_cli.command('status')
+def backfill_status_command():
+    """Mostrar el avance de los backfills registrados."""
+    from sqlalchemy import select
+    from app import db
+    from app.utils.backfill import metadata, checkpoints
+
+    metadata.create_all(db.engine, checkfirst=True)
+    with db.engine.connect() as conn:
+        for row in conn.execute(select(checkpoints).order_by(checkpoints.c.name)):
+            state = 'done' if row.completed_at else f'{row.last_id}/{row.max_id}'
+            click.echo(f'{row.name}: {state} ({row.rows} rows)')
+
+
+@backfill_cli.command('reset')
+@click.argument('name')
+def backfill_reset_command(name):
+    """Olvidar el punto de control de un backfill para volver a ejecutarlo desde el principio."""
+    from app import db
+    from app.utils import backfill
+
+    backfill.reset(name, db.engine)
+    click.echo(f'Backfill {name} reset', err=True)
+
+
+# Grupo de comandos `flask archive ...` para el archivo de entradas antiguas
+archive_cli = AppGroup('archive', help='Archivo de entradas antiguas.')
+
+
+@archive_cli.command('run')
+@click.option('--older-than-days', type=int, default=None, help='Antigüedad mínima (por defecto ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Entradas por lote y commit (por defecto ARCHIVE_BATCH_SIZE).')
+def archive_run_command(older_than_days, batch_size):
+    """Mover las entradas antiguas de `entries` a `entries_archive`."""
+    from app.services.archive_service import ArchiveService
+
+    def progress(count):
+        click.echo(f'{count} entries archived', err=True)
+
+    count = ArchiveService.archive(older_than_days=older_than_days, batch_size=batch_size, progress=progress)
+    click.echo(f'{count} entries moved to entries_archive', err=True)
+
+
+# Grupo de comandos `flask http-cache ...` para la caché HTTP del proxy inverso
+http_cache_cli = AppGroup('http-cache', help='Caché HTTP del proxy inverso (surrogate keys).')
+
+
+@http_cache_cli.command('purge')
+@click.argument('keys', nargs=-1, required=True)
+def http_cache_purge_command(keys):
+    """Purgar del proxy las respuestas etiquetadas con las claves indicadas."""
+    from app.utils.purge import purger
+
+    purger.purge(*keys)
+    click.echo(f'Purged {" ".join(keys)}', err=True)
+
+
+@http_cache_cli.command('stand-in')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', type=int, default=8081, show_default=True)
+def http_cache_stand_in_command(host, port):
+    """Servidor local que acepta las purgas en lugar del proxy (HTTP_CACHE_PURGER=http://host:port/)."""
+    import time
+    from app.utils.purge import serve_stand_in
+
+    server = serve_stand_in(host, port, current_app.config['HTTP_CACHE_SURROGATE_HEADER'])
+    click.echo(f'Purge stand-in listening on http://{host}:{port}/', err=True)
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            for purge in list(server.received)[seen:]:
+                click.echo(f'{purge["method"]} {purge["path"]}: {" ".join(purge["keys"])}')
+            seen = len(server.received)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+# Grupo de comandos `flask duplicates ...` para el índice de firmas de casi duplicados
+duplicates_cli = AppGroup('duplicates', help='Índice de firmas MinHash para detectar entradas casi duplicadas.')
+
+
+@duplicates_cli.command('fingerprint')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Entradas por lote y commit.')
+@click.option('--rebuild', is_flag=True, help='Recalcular también las entradas ya indexadas (p. ej. al cambiar DUPLICATE_BANDS).')
+def duplicates_fingerprint_command(batch_size, rebuild):
+    """Calcular las firmas de las entradas existentes que aún no están en el índice."""
+    from app.services.duplicate_service import DuplicateService
+
+    def progress(count):
+        click.echo(f'{count} entries fingerprinted', err=True)
+
+    count = DuplicateService.fingerprint_all(batch_size=batch_size, rebuild=rebuild, progress=progress)
+    click.echo(f'Signatures computed for {count} entries', err=True)
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Cargar el archivo .env en las variables de entorno
@@ -18,6 +19,71 @@ class Config:
         SQLALCHEMY_ECHO (bool): Activa la impresión de todas las consultas SQL ejecutadas por la aplicación en la consola, útil para depuración.
         SECRET_KEY (str): Clave secreta para firmar cookies y otras funcionalidades de seguridad de Flask.
         JWT_SECRET_KEY (str): Clave secreta utilizada para generar y verificar tokens JWT.
+        JWT_ACCESS_TOKEN_EXPIRES (timedelta): Duración de los tokens de acceso.
+        JWT_REFRESH_TOKEN_EXPIRES (timedelta): Duración de los refresh tokens.
+        TOKEN_REVOCATION_SYNC_SECONDS (int): Intervalo de sincronización de las revocaciones de tokens.
+        TOKEN_REVOCATION_SYNC_OVERLAP (int): IDs de revocaciones ya vistos que se vuelven a leer en cada sincronización.
+        STREAM_HEARTBEAT_SECONDS (int): Intervalo de los heartbeats enviados en las conexiones SSE.
+        STREAM_BUFFER_SIZE (int): Eventos guardados para reanudar conexiones con Last-Event-ID.
+        STREAM_MAX_CONNECTIONS (int): Conexiones SSE simultáneas permitidas por worker.
+        STREAM_QUEUE_SIZE (int): Eventos pendientes por conexión antes de desconectar a un cliente lento.
+        STREAM_RETRY_SECONDS (int): Tiempo sugerido a los clientes antes de reconectarse.
+        ENTRY_BULK_MAX_ITEMS (int): Número máximo de entradas por petición a `POST /entries/bulk`.
+        AVAILABILITY_FILTER_CAPACITY (int): Elementos previstos en el filtro de nombres de usuario y correos en uso.
+        AVAILABILITY_FILTER_ERROR_RATE (float): Tasa de falsos positivos del filtro.
+        AVAILABILITY_FILTER_TTL (int): Segundos tras los que se reconstruye el filtro desde la base de datos.
+        RATELIMIT_ENABLED (bool): Activa el rate limiting y los límites de concurrencia.
+        RATELIMIT_STORAGE (str): 'memory' o 'sqlite:///ruta' para compartir los límites entre procesos.
+        RATE_LIMITS (dict): Límites por nombre en formato "peticiones/periodo".
+        RATELIMIT_SQLITE_PRUNE_EVERY (int): Consumos entre limpiezas de los buckets llenos en el backend SQLite.
+        TRUSTED_PROXY_COUNT (int): Proxies inversos delante de la API cuyo X-Forwarded-For es de confianza (0 = ninguno).
+        CONCURRENCY_LIMITS (dict): Peticiones simultáneas permitidas por grupo de endpoints en cada worker.
+        CONCURRENCY_RETRY_AFTER (int): Segundos sugeridos en Retry-After al rechazar por concurrencia.
+        SWAGGER_MODE (str): 'dynamic' (generada desde los modelos), 'static' (archivo pre-generado) u 'off'.
+        SWAGGER_SPEC_PATH (str): Ruta del swagger.json pre-generado con `flask spec export`.
+        WARMUP_ENABLED (bool): Ejecuta el warm-up (pool, validadores, cachés) al crear la aplicación.
+        WARMUP_POOL_CONNECTIONS (int): Conexiones del pool que se abren durante el warm-up.
+        COMPRESS_ENABLED (bool): Activa la compresión gzip/deflate de las respuestas.
+        COMPRESS_MIN_SIZE (int): Tamaño mínimo en bytes de una respuesta para comprimirla.
+        COMPRESS_LEVEL (int): Nivel de compresión de zlib (1-9).
+        COMPRESS_CACHE_SIZE (int): Cuerpos comprimidos guardados por ETag para no recomprimir.
+        PROFILE_LATEST_ENTRIES (int): Entradas recientes incluidas por defecto en el perfil de un autor.
+        PROFILE_MAX_ENTRIES (int): Máximo de entradas recientes que se pueden pedir en el perfil.
+        BACKGROUND_TASKS_ASYNC (bool): Ejecuta las tareas de segundo plano en un hilo aparte.
+        RELATED_ENABLED (bool): Calcula las entradas relacionadas de cada entrada nueva.
+        RELATED_TOP_N (int): Entradas relacionadas guardadas por entrada.
+        RELATED_MIN_SCORE (float): Similitud mínima para considerar dos entradas relacionadas.
+        RELATED_FEATURES (int): Dimensión de los vectores TF-IDF (hashing de términos).
+        RELATED_INDEX_TTL (int): Segundos tras los que se reconstruye el índice TF-IDF del proceso.
+        RELATED_MAX_DF (float): Fracción máxima de entradas en que puede aparecer un término para contar en la similitud.
+        RELATED_CHUNK_SIZE (int): Entradas del índice por bloque al calcular las similitudes de un lote.
+        CACHE_ENABLED (bool): Activa la caché de la capa de servicios.
+        CACHE_L1_SIZE (int): Claves guardadas en la LRU de cada proceso.
+        CACHE_L2_PATH (str): Archivo SQLite compartido por los workers (vacío para usar solo L1); las rutas relativas van en la carpeta de instancia.
+        CACHE_DEFAULT_TTL (int): Segundos de validez de un valor cacheado.
+        CACHE_EARLY_REFRESH_BETA (float): Agresividad del refresco anticipado probabilístico.
+        CACHE_VERSION_CHECK_INTERVAL (float): Segundos entre consultas de la versión de invalidación en L2.
+        CACHE_LOCK_TIMEOUT (float): Segundos máximos de espera del lease de recálculo entre procesos.
+        BACKFILL_CHUNK_SIZE (int): Rango de claves primarias por bloque en los backfills de las migraciones.
+        BACKFILL_THROTTLE (float): Segundos de pausa entre bloques de un backfill.
+        ADMIN_USER_IDS (set): IDs de los usuarios con acceso a los endpoints de administración.
+        PROFILER_MAX_SECONDS (int): Duración máxima de un perfil por muestreo.
+        PROFILER_MIN_INTERVAL (float): Intervalo mínimo entre muestras del profiler.
+        ARCHIVE_AFTER_DAYS (int): Antigüedad en días a partir de la cual una entrada se archiva.
+        ARCHIVE_BATCH_SIZE (int): Entradas movidas a `entries_archive` por lote y commit.
+        ENTRY_PAGE_MAX_SIZE (int): Máximo de entradas por página en `GET /entries/?limit=`.
+        HOT_SET_SIZE (int): Entradas más nuevas que cada proceso guarda en memoria para el feed (0 lo desactiva).
+        HOT_SET_TTL (float): Segundos máximos entre recargas del conjunto en memoria del feed.
+        DUPLICATE_DETECTION_ENABLED (bool): Indexa la firma MinHash de cada entrada y avisa de casi duplicados.
+        DUPLICATE_MIN_SIMILARITY (float): Similitud de Jaccard mínima para considerar dos entradas casi duplicadas.
+        DUPLICATE_BANDS (int): Bandas LSH por entrada en el índice de firmas MinHash.
+        DUPLICATE_BAND_ROWS (int): Valores de la firma MinHash por banda.
+        HTTP_CACHE_ENABLED (bool): Agrega Cache-Control, Vary y surrogate keys a las respuestas con política.
+        HTTP_CACHE_POLICIES (dict): Valor de Cache-Control de cada política declarada en los Resources.
+        HTTP_CACHE_SURROGATE_HEADER (str): Cabecera de las surrogate keys de respuestas y purgas.
+        HTTP_CACHE_PURGER (str): '' (sin proxy), 'memory' o la URL de purga del proxy de caché.
+        HTTP_CACHE_PURGE_METHOD (str): Método HTTP de las peticiones de purga.
+        HTTP_CACHE_PURGE_TIMEOUT (float): Segundos máximos de espera de una purga.
     """
 
     # URI de conexión a la base de datos MySQL, con las credenciales y el host tomados del archivo .env
@@ -35,3 +101,122 @@ class Config:
 
     # Clave secreta para la autenticación JWT, usada para generar tokens
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt_super_secret_key'
+
+    # Tokens de acceso de corta duración, renovables con un refresh token en /auth/refresh
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+
+    # Propagar los errores de Flask-JWT-Extended a sus manejadores (401) en lugar del manejador de Flask-RESTX (500)
+    PROPAGATE_EXCEPTIONS = True
+
+    # Las revocaciones de tokens se sincronizan desde la base de datos con este intervalo
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', 5))
+    # Ventana de IDs releída en cada sincronización (filas confirmadas fuera de orden)
+    TOKEN_REVOCATION_SYNC_OVERLAP = int(os.environ.get('TOKEN_REVOCATION_SYNC_OVERLAP', 1000))
+
+    # Configuración del stream de eventos (SSE) de nuevas entradas
+    STREAM_HEARTBEAT_SECONDS = int(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+    STREAM_BUFFER_SIZE = int(os.environ.get('STREAM_BUFFER_SIZE', 1000))
+    STREAM_MAX_CONNECTIONS = int(os.environ.get('STREAM_MAX_CONNECTIONS', 1000))
+    STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 100))
+    STREAM_RETRY_SECONDS = int(os.environ.get('STREAM_RETRY_SECONDS', 5))
+
+    # Número máximo de entradas aceptadas en una creación en bloque
+    ENTRY_BULK_MAX_ITEMS = int(os.environ.get('ENTRY_BULK_MAX_ITEMS', 1000))
+
+    # Filtro de Bloom para la verificación de disponibilidad de nombres de usuario y correos
+    AVAILABILITY_FILTER_CAPACITY = int(os.environ.get('AVAILABILITY_FILTER_CAPACITY', 100000))
+    AVAILABILITY_FILTER_ERROR_RATE = float(os.environ.get('AVAILABILITY_FILTER_ERROR_RATE', 0.01))
+    AVAILABILITY_FILTER_TTL = int(os.environ.get('AVAILABILITY_FILTER_TTL', 300))
+
+    # Rate limiting (token bucket) por cliente y límites de concurrencia por endpoint
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE', 'memory')
+    RATE_LIMITS = {
+        'login_ip': os.environ.get('RATELIMIT_LOGIN_IP', '20/minute'),
+        'login_username': os.environ.get('RATELIMIT_LOGIN_USERNAME', '5/minute'),
+        'write': os.environ.get('RATELIMIT_WRITE', '60/minute'),
+    }
+    RATELIMIT_SQLITE_PRUNE_EVERY = int(os.environ.get('RATELIMIT_SQLITE_PRUNE_EVERY', 1000))
+    # Detrás del proxy de caché todas las peticiones llegan desde su IP: la del cliente se toma
+    # de X-Forwarded-For, contando solo los saltos añadidos por proxies de confianza
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    CONCURRENCY_LIMITS = {
+        'bcrypt': int(os.environ.get('CONCURRENCY_LIMIT_BCRYPT', 4)),
+        'write': int(os.environ.get('CONCURRENCY_LIMIT_WRITE', 32)),
+    }
+    CONCURRENCY_RETRY_AFTER = int(os.environ.get('CONCURRENCY_RETRY_AFTER', 1))
+
+    # Modo de arranque: documentación Swagger y warm-up del worker antes de aceptar tráfico
+    SWAGGER_MODE = os.environ.get('SWAGGER_MODE', 'dynamic')
+    SWAGGER_SPEC_PATH = os.environ.get('SWAGGER_SPEC_PATH') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'swagger.json')
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'false').lower() == 'true'
+    WARMUP_POOL_CONNECTIONS = int(os.environ.get('WARMUP_POOL_CONNECTIONS', 5))
+
+    # Compresión negociada de las respuestas
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', 256))
+
+    # Perfil de autor
+    PROFILE_LATEST_ENTRIES = int(os.environ.get('PROFILE_LATEST_ENTRIES', 5))
+    PROFILE_MAX_ENTRIES = int(os.environ.get('PROFILE_MAX_ENTRIES', 50))
+
+    # Tareas en segundo plano y entradas relacionadas (TF-IDF)
+    BACKGROUND_TASKS_ASYNC = os.environ.get('BACKGROUND_TASKS_ASYNC', 'true').lower() == 'true'
+    RELATED_ENABLED = os.environ.get('RELATED_ENABLED', 'true').lower() == 'true'
+    RELATED_TOP_N = int(os.environ.get('RELATED_TOP_N', 5))
+    RELATED_MIN_SCORE = float(os.environ.get('RELATED_MIN_SCORE', 0.05))
+    RELATED_FEATURES = int(os.environ.get('RELATED_FEATURES', 2 ** 18))
+    RELATED_INDEX_TTL = int(os.environ.get('RELATED_INDEX_TTL', 3600))
+    RELATED_MAX_DF = float(os.environ.get('RELATED_MAX_DF', 0.5))
+    RELATED_CHUNK_SIZE = int(os.environ.get('RELATED_CHUNK_SIZE', 20000))
+
+    # Caché de dos niveles de la capa de servicios
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_L1_SIZE = int(os.environ.get('CACHE_L1_SIZE', 1024))
+    CACHE_L2_PATH = os.environ.get('CACHE_L2_PATH', 'codenet-cache.db')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 30))
+    CACHE_EARLY_REFRESH_BETA = float(os.environ.get('CACHE_EARLY_REFRESH_BETA', 1.0))
+    CACHE_VERSION_CHECK_INTERVAL = float(os.environ.get('CACHE_VERSION_CHECK_INTERVAL', 1.0))
+    CACHE_LOCK_TIMEOUT = float(os.environ.get('CACHE_LOCK_TIMEOUT', 5.0))
+
+    # Backfills por bloques de las migraciones (ver `app.utils.backfill`)
+    BACKFILL_CHUNK_SIZE = int(os.environ.get('BACKFILL_CHUNK_SIZE', 1000))
+    BACKFILL_THROTTLE = float(os.environ.get('BACKFILL_THROTTLE', 0.05))
+
+    # Administración: usuarios administradores y profiler por muestreo
+    ADMIN_USER_IDS = {int(i) for i in os.environ.get('ADMIN_USER_IDS', '').split(',') if i.strip()}
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 60))
+    PROFILER_MIN_INTERVAL = float(os.environ.get('PROFILER_MIN_INTERVAL', 0.001))
+
+    # Archivo de entradas antiguas y paginación por cursor del listado
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    ENTRY_PAGE_MAX_SIZE = int(os.environ.get('ENTRY_PAGE_MAX_SIZE', 100))
+
+    # Resúmenes de las entradas más nuevas en memoria, para el feed
+    HOT_SET_SIZE = int(os.environ.get('HOT_SET_SIZE', 500))
+    # Antigüedad máxima del conjunto: acota lo que dura un cambio no detectado por la versión
+    HOT_SET_TTL = float(os.environ.get('HOT_SET_TTL', 60))
+
+    # Caché HTTP en el proxy inverso: políticas por Resource y purga por surrogate keys
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+    HTTP_CACHE_POLICIES = {
+        'list': 'public, max-age=5, s-maxage=30',  # Listados: cambian con cada escritura
+        'public': 'public, max-age=30, s-maxage=300',  # Detalle, perfiles: se purgan al escribir
+        'private': 'private, no-cache',  # Vistas autenticadas
+        'no-store': 'no-store',  # Streams y respuestas que no deben guardarse
+    }
+    HTTP_CACHE_SURROGATE_HEADER = os.environ.get('HTTP_CACHE_SURROGATE_HEADER', 'Surrogate-Key')
+    HTTP_CACHE_PURGER = os.environ.get('HTTP_CACHE_PURGER', '')
+    HTTP_CACHE_PURGE_METHOD = os.environ.get('HTTP_CACHE_PURGE_METHOD', 'PURGE')
+    HTTP_CACHE_PURGE_TIMEOUT = float(os.environ.get('HTTP_CACHE_PURGE_TIMEOUT', 2.0))
+
+    # Detección de entradas casi duplicadas (MinHash con índice LSH por bandas)
+    DUPLICATE_DETECTION_ENABLED = os.environ.get('DUPLICATE_DETECTION_ENABLED', 'true').lower() == 'true'
+    DUPLICATE_MIN_SIMILARITY = float(os.environ.get('DUPLICATE_MIN_SIMILARITY', 0.7))
+    DUPLICATE_BANDS = int(os.environ.get('DUPLICATE_BANDS', 16))
+    DUPLICATE_BAND_ROWS = int(os.environ.get('DUPLICATE_BAND_ROWS', 4))
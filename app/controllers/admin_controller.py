@@ -0,0 +1,184 @@
+import os
+import uuid
+from flask import request, current_app, Response
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required
+from app import db
+from app.middlewares.auth_middleware import admin_required
+from app.middlewares.http_cache import cache_policy
+from app.services.archive_service import ArchiveService
+from app.utils import background
+from app.utils.cache import cache
+from app.utils.hot_set import hot_set
+from app.utils.profiler import profiler, ProfileBusyError, save_profile, load_profile
+
+# Crear un espacio de nombres (namespace) para las operaciones de administración
+admin_ns = Namespace('admin', description='Operaciones de administración y diagnóstico')
+
+
+@admin_ns.route('/profile')
+class ProfileResource(Resource):
+    @cache_policy('no-store')
+    @jwt_required()
+    @admin_required
+    @admin_ns.doc('profile_worker', params={
+        'seconds': 'Duración del perfil en segundos (por defecto 10)',
+        'interval': 'Segundos entre muestras (por defecto 0.01)',
+        'format': 'json (por defecto) o collapsed (texto para flamegraph.pl / speedscope)',
+    })
+    def get(self):
+        """
+        Perfilar el worker que atiende la petición
+        ---
+        Este método muestrea durante unos segundos las pilas de los hilos del proceso que
+        recibe la petición y devuelve un perfil en formato collapsed, atribuido a cada endpoint
+        y con el tiempo de SQL separado. El resumen por endpoint incluye el tiempo medido de sus
+        peticiones (`time`) y de sus consultas (`sql_time`, `sql_share`): las muestras están
+        sesgadas hacia los puntos donde se libera el GIL, por lo que la parte de SQL se lee de
+        esas medidas y no de la proporción de muestras `[sql]`.
+
+        La petición espera el perfil, así que solo ve otras peticiones con workers de varios
+        hilos (gunicorn `gthread`); con workers `sync` usar POST /admin/profile.
+
+        Query Parameters:
+        - seconds: Duración del perfil (máximo PROFILER_MAX_SECONDS).
+        - interval: Segundos entre muestras.
+        - format: json o collapsed.
+
+        Responses:
+        - 200: Retorna el perfil.
+        - 403: Si el usuario no es administrador.
+        - 409: Si ya hay un perfil en curso en el worker.
+        """
+        seconds, interval = _profile_args()
+
+        # No retener una conexión del pool durante el perfil
+        db.session.remove()
+        try:
+            profile = profiler.profile(db.engine, seconds, interval)
+        except ProfileBusyError as e:
+            return {'message': str(e)}, 409
+
+        return _profile_response(profile)
+
+    @cache_policy('no-store')
+    @jwt_required()
+    @admin_required
+    @admin_ns.doc('start_worker_profile', params={
+        'seconds': 'Duración del perfil en segundos (por defecto 10)',
+        'interval': 'Segundos entre muestras (por defecto 0.01)',
+    })
+    def post(self):
+        """
+        Iniciar un perfil del worker en segundo plano
+        ---
+        Este método inicia el muestreo en un hilo del worker y responde de inmediato, de modo
+        que el worker sigue atendiendo peticiones mientras se perfila; funciona con cualquier
+        tipo de worker, también `sync`. El resultado se guarda en la carpeta de instancia y se
+        obtiene con GET /admin/profile/<id> desde cualquier worker de la máquina.
+
+        Query Parameters:
+        - seconds: Duración del perfil (máximo PROFILER_MAX_SECONDS).
+        - interval: Segundos entre muestras.
+
+        Responses:
+        - 202: El perfil se inició; retorna su ID.
+        - 403: Si el usuario no es administrador.
+        - 409: Si ya hay un perfil en curso en el worker.
+        """
+        seconds, interval = _profile_args()
+        profile_id = uuid.uuid4().hex
+        directory = os.path.join(current_app.instance_path, 'profiles')
+        try:
+            profiler.start(db.engine, seconds, interval,
+                           callback=lambda result: save_profile(directory, profile_id, result))
+        except ProfileBusyError as e:
+            return {'message': str(e)}, 409
+        return {'id': profile_id, 'pid': os.getpid(), 'seconds': seconds}, 202
+
+
+@admin_ns.route('/profile/<string:profile_id>')
+class ProfileResultResource(Resource):
+    @cache_policy('no-store')
+    @jwt_required()
+    @admin_required
+    @admin_ns.doc('get_worker_profile', params={
+        'format': 'json (por defecto) o collapsed (texto para flamegraph.pl / speedscope)',
+    })
+    def get(self, profile_id):
+        """
+        Obtener un perfil iniciado con POST /admin/profile
+        ---
+        Responses:
+        - 200: Retorna el perfil.
+        - 403: Si el usuario no es administrador.
+        - 404: Si el perfil no existe o aún no termina.
+        """
+        profile = load_profile(os.path.join(current_app.instance_path, 'profiles'), profile_id)
+        if profile is None:
+            return {'message': 'Profile not found or still running'}, 404
+        return _profile_response(profile)
+
+
+def _profile_args():
+    seconds = request.args.get('seconds', 10, type=float)
+    seconds = max(0.1, min(seconds, current_app.config['PROFILER_MAX_SECONDS']))
+    interval = max(request.args.get('interval', 0.01, type=float), current_app.config['PROFILER_MIN_INTERVAL'])
+    return seconds, interval
+
+
+def _profile_response(profile):
+    if request.args.get('format') == 'collapsed':
+        return Response('\n'.join(profile['collapsed']) + '\n', mimetype='text/plain')
+    return profile
+
+
+@admin_ns.route('/metrics')
+class MetricsResource(Resource):
+    @cache_policy('no-store')
+    @jwt_required()
+    @admin_required
+    @admin_ns.doc('worker_metrics')
+    def get(self):
+        """
+        Obtener las métricas del worker que atiende la petición
+        ---
+        Este método devuelve el estado de las estructuras en memoria del proceso: el conjunto
+        de entradas más nuevas del feed (tamaño, memoria, aciertos) y los aciertos de la caché.
+
+        Responses:
+        - 200: Retorna las métricas del worker.
+        - 403: Si el usuario no es administrador.
+        """
+        return {
+            'pid': os.getpid(),
+            'startup': current_app.extensions.get('startup'),
+            'hot_set': hot_set.info(),
+            'cache': dict(cache.stats),
+        }
+
+
+@admin_ns.route('/archive')
+class ArchiveResource(Resource):
+    @jwt_required()
+    @admin_required
+    @admin_ns.doc('archive_entries', params={
+        'older_than_days': 'Antigüedad mínima en días (por defecto ARCHIVE_AFTER_DAYS)',
+    })
+    def post(self):
+        """
+        Archivar las entradas antiguas
+        ---
+        Este método mueve en segundo plano, por lotes, las entradas más antiguas que
+        `older_than_days` a `entries_archive`. Equivale a `flask archive run`.
+
+        Query Parameters:
+        - older_than_days: Antigüedad mínima de las entradas a archivar.
+
+        Responses:
+        - 202: El archivo de entradas se inició en segundo plano.
+        - 403: Si el usuario no es administrador.
+        """
+        older_than_days = request.args.get('older_than_days', type=int)
+        background.submit(current_app._get_current_object(), ArchiveService.archive, older_than_days)
+        return {'message': 'Archiving started'}, 202
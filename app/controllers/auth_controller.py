@@ -1,8 +1,11 @@
 from flask import request, jsonify
 from flask_restx import Namespace, Resource, fields
 from app.services.user_service import UserService
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity
 from app import bcrypt
+from app.services.token_service import TokenService
+from app.utils import transaction
+from app.middlewares.rate_limit import rate_limit, concurrency_limit, by_ip, by_username
 
 # Crear un espacio de nombres (namespace) para la autenticación
 auth_ns = Namespace('auth', description='Operaciones de autenticación')
@@ -16,6 +19,9 @@ auth_model = auth_ns.model('Auth', {
 # Definir el controlador de autenticación
 @auth_ns.route('/login')
 class AuthResource(Resource):
+    @rate_limit('login_ip', by_ip)  # Limitar los intentos por IP
+    @rate_limit('login_username', by_username)  # Limitar los intentos por cuenta
+    @concurrency_limit('bcrypt')  # Limitar las verificaciones bcrypt simultáneas
     @auth_ns.doc('login_user')  # Documentar el endpoint en Swagger
     @auth_ns.expect(auth_model, validate=True)  # Esperar el modelo de autenticación en la solicitud y validarlo
     def post(self):
@@ -28,11 +34,51 @@ class AuthResource(Resource):
         
         # Verificar si el usuario existe y si la contraseña es correcta usando bcrypt
         if user and bcrypt.check_password_hash(user.password, data['password']):
-            # Si la autenticación es correcta, generar un token JWT
+            # Si la autenticación es correcta, generar un token de acceso de corta duración
+            # y un refresh token para renovarlo sin volver a verificar la contraseña
             access_token = create_access_token(identity=user.id_user)
+            refresh_token = create_refresh_token(identity=user.id_user)
             
-            # Devolver el token JWT como respuesta en formato JSON
-            return jsonify({'access_token': access_token})
+            # Devolver los tokens JWT como respuesta en formato JSON
+            return jsonify({'access_token': access_token, 'refresh_token': refresh_token})
         
         # Si la autenticación falla (usuario no encontrado o contraseña incorrecta), devolver un error 401
-        return jsonify({'message': 'Invalid credentials'}), 401
+        return {'message': 'Invalid credentials'}, 401
+
+
+@auth_ns.route('/refresh')
+class RefreshResource(Resource):
+    @jwt_required(refresh=True)
+    @auth_ns.doc('refresh_token')
+    def post(self):
+        """
+        Obtener un nuevo token de acceso
+        ---
+        Este método recibe un refresh token en la cabecera Authorization y devuelve un nuevo
+        token de acceso, sin verificar de nuevo la contraseña.
+
+        Responses:
+        - 200: Retorna el nuevo token de acceso.
+        - 401: Si el refresh token es inválido, caducó o fue revocado.
+        """
+        access_token = create_access_token(identity=get_jwt_identity())
+        return jsonify({'access_token': access_token})
+
+
+@auth_ns.route('/logout')
+class LogoutResource(Resource):
+    @jwt_required(verify_type=False)
+    @auth_ns.doc('logout_user')
+    def post(self):
+        """
+        Cerrar sesión revocando el token recibido
+        ---
+        Este método revoca el token (de acceso o refresh) enviado en la cabecera Authorization.
+
+        Responses:
+        - 200: Token revocado con éxito.
+        """
+        token = get_jwt()
+        TokenService.revoke_token(token['jti'], token['sub'], token['exp'])
+        transaction.commit()
+        return jsonify({'message': 'Token revoked successfully'})
@@ -1,7 +1,16 @@
-from flask import request, jsonify
+from functools import lru_cache
+from flask import request, jsonify, current_app
 from flask_restx import Namespace, Resource, fields
 from app.services.entry_service import EntryService
+from app.services.related_service import RelatedService
+from app.services.render_service import RenderService
+from app.services.category_service import CategoryService
+from app.services.duplicate_service import DuplicateService
+from app.models.entry import Entry
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.middlewares.rate_limit import rate_limit, concurrency_limit
+from app.middlewares.auth_middleware import admin_required
+from app.middlewares.http_cache import cache_policy, surrogate_keys
 
 # Crear un espacio de nombres (namespace) para las entradas de blog
 entry_ns = Namespace('entries', description='Operaciones relacionadas con las entradas de blog')
@@ -31,13 +40,119 @@ entry_response_model = entry_ns.model('EntryResponse', {
     'author': fields.String(attribute='user.name', description='Nombre del autor de la entrada'),
 })
 
+# Modelo de salida del detalle de una entrada, con el contenido ya renderizado
+entry_detail_model = entry_ns.inherit('EntryDetail', entry_response_model, {
+    'content_html': fields.String(description='Contenido renderizado a HTML (markdown con resaltado de sintaxis)'),
+})
+
+# Modelo de una entrada casi duplicada de otra
+entry_possible_duplicate_model = entry_ns.model('EntryPossibleDuplicate', {
+    'id_entry': fields.Integer(description='ID de la entrada casi duplicada'),
+    'similarity': fields.Float(description='Similitud de Jaccard entre los textos (1 = mismo texto)'),
+})
+
+# Modelo de salida de la creación de una entrada, con el aviso de casi duplicados
+entry_created_model = entry_ns.inherit('EntryCreated', entry_response_model, {
+    'possible_duplicates': fields.List(fields.Nested(entry_possible_duplicate_model),
+                                       description='Entradas existentes casi iguales a la nueva'),
+})
+
+# Modelo de salida de los casi duplicados de una entrada
+entry_duplicate_model = entry_ns.inherit('EntryDuplicate', entry_possible_duplicate_model, {
+    'title': fields.String(description='Título de la entrada'),
+    'author': fields.String(attribute='user.name', description='Nombre del autor de la entrada'),
+    'created_at': fields.DateTime(description='Fecha de creación de la entrada'),
+})
+
+# Modelo de salida de los resúmenes del feed
+entry_summary_model = entry_ns.model('EntrySummary', {
+    'id_entry': fields.Integer(description='ID de la entrada de blog'),
+    'cover_img': fields.String(description='Imagen de portada'),
+    'title': fields.String(description='Título de la entrada'),
+    'description': fields.String(description='Descripción corta de la entrada'),
+    'category': fields.String(description='Categoría del contenido publicado'),
+    'created_at': fields.DateTime(description='Fecha de creación de la entrada'),
+    'author': fields.String(description='Nombre del autor de la entrada'),
+})
+
+# Modelo de salida para las entradas relacionadas
+entry_related_model = entry_ns.model('EntryRelated', {
+    'id_entry': fields.Integer(description='ID de la entrada de blog'),
+    'cover_img': fields.String(description='Imagen de portada'),
+    'title': fields.String(description='Título de la entrada'),
+    'description': fields.String(description='Descripción corta de la entrada'),
+    'category': fields.String(description='Categoría del contenido publicado'),
+    'score': fields.Float(description='Similitud con la entrada consultada'),
+})
+
+# Modelo de salida de las facetas de categoría
+category_facet_model = entry_ns.model('CategoryFacet', {
+    'id_category': fields.Integer(description='ID de la categoría'),
+    'name': fields.String(description='Nombre de la categoría'),
+    'entry_count': fields.Integer(description='Número de entradas de la categoría'),
+})
+
+# Modelo de entrada para la creación de entradas en bloque
+entry_bulk_model = entry_ns.model('EntryBulk', {
+    'entries': fields.List(fields.Nested(entry_model), required=True, description='Entradas de blog a crear'),
+})
+
+# Modelo de salida con el resultado de cada entrada del bloque
+entry_bulk_result_model = entry_ns.model('EntryBulkResult', {
+    'index': fields.Integer(description='Posición de la entrada en el bloque'),
+    'status': fields.String(description='created o error'),
+    'id_entry': fields.Integer(description='ID de la entrada creada'),
+    'errors': fields.List(fields.String, description='Errores de validación de la entrada'),
+})
+
+# Campos requeridos para crear una entrada de blog
+ENTRY_REQUIRED_FIELDS = ['cover_img', 'title', 'content', 'category']
+
+
+@lru_cache(maxsize=None)
+def get_entry_validator():
+    """
+    Construir (una sola vez por proceso) el validador JSON Schema de `entry_model`.
+
+    `@entry_ns.expect(validate=True)` compila el esquema en cada petición; para los bloques
+    se reutiliza el mismo validador para todas las entradas. El esquema incluye la longitud
+    máxima de cada columna, para que una entrada demasiado larga se rechace individualmente
+    en lugar de hacer fallar el INSERT de todo el bloque.
+    """
+    from jsonschema import Draft4Validator, FormatChecker
+
+    properties = {
+        name: {**prop, 'maxLength': Entry.__table__.columns[name].type.length}
+        for name, prop in entry_model.__schema__['properties'].items()
+    }
+    schema = {**entry_model.__schema__, 'properties': properties, 'required': ENTRY_REQUIRED_FIELDS}
+    return Draft4Validator(schema, format_checker=FormatChecker())
+
+
+def parse_page_args():
+    """
+    Leer y validar los parámetros `limit` y `cursor` de la paginación por cursor.
+
+    Returns:
+        tuple: (limit acotado a ENTRY_PAGE_MAX_SIZE, cursor o None).
+    """
+    max_size = current_app.config['ENTRY_PAGE_MAX_SIZE']
+    limit = request.args.get('limit', str(max_size))
+    cursor = request.args.get('cursor')
+    if not limit.isdigit() or int(limit) < 1 or (cursor is not None and not cursor.isdigit()):
+        entry_ns.abort(400, 'limit and cursor must be positive integers')
+    return min(int(limit), max_size), (int(cursor) if cursor is not None else None)
+
+
 # Definir el controlador de entradas de blog con decoradores para la documentación
 @entry_ns.route('/')
 class EntryResource(Resource):
+    @rate_limit('write')
+    @concurrency_limit('write')
     @jwt_required()
     @entry_ns.doc('create_entry')
     @entry_ns.expect(entry_model, validate=True)  # Decorador para esperar el modelo en la petición
-    @entry_ns.marshal_with(entry_response_model, code=201)  # Serialización automática de la entrada creada
+    @entry_ns.marshal_with(entry_created_model, code=201)  # Serialización automática de la entrada creada
     def post(self):
         """
         Crear una nueva entrada de blog
@@ -56,7 +171,7 @@ class EntryResource(Resource):
         - id_user: ID del usuario asociado
 
         Responses:
-        - 201: Entrada de blog creada con éxito.
+        - 201: Entrada de blog creada con éxito; `possible_duplicates` lista las entradas casi iguales.
         - 400: Si ocurre un error durante la creación de la entrada de blog.
         """
         id_user = get_jwt_identity() #Obtiene el id_user del JWT
@@ -74,26 +189,119 @@ class EntryResource(Resource):
         # return jsonify({'message': 'Entry created successfully', 'Entry': entry.title})
         return entry
 
-    @entry_ns.doc('get_entries')
+    @cache_policy('list', keys=('entries:list',))
+    @entry_ns.doc('get_entries', params={
+        'limit': 'Entradas por página; activa la paginación por cursor',
+        'cursor': 'Cursor de la página siguiente (encabezado X-Next-Cursor)',
+    })
     @entry_ns.marshal_list_with(entry_response_model)  # Serialización automática de la lista de entradas
     def get(self):
         """
         Obtener todas las entradas de blog
         ---
         Este método permite obtener una lista de todas las entradas de blog registradas en la base de datos.
+        Con `limit` devuelve una página (de la más nueva a la más antigua) que incluye las entradas
+        archivadas, y el cursor de la página siguiente en el encabezado `X-Next-Cursor`.
+
+        Query Parameters:
+        - limit: Entradas por página (máximo ENTRY_PAGE_MAX_SIZE).
+        - cursor: Valor de `X-Next-Cursor` de la página anterior.
 
         Responses:
         - 200: Retorna una lista de títulos de entrada de blog (se podrá desplegar toda la info de cada entrada?).
+        - 400: Si `limit` o `cursor` no son enteros válidos.
         """
-        entries = EntryService.get_all_entries()  # Llama al servicio para obtener todas las entradas
+        if 'limit' in request.args or 'cursor' in request.args:
+            entries, next_cursor = EntryService.list_entries_page(*parse_page_args())
+            if next_cursor is None:
+                return entries
+            return entries, 200, {'X-Next-Cursor': str(next_cursor)}
+
+        entries = EntryService.list_entries()  # Llama al servicio (con caché) para obtener todas las entradas
         # Usamos jsonify para garantizar que la lista de entradas se retorne como un JSON válido.
         # return jsonify({'entries': [entry.title for entry in entries]})  # Retorna solo los títulos de las entradas
         return entries
 
 
+@entry_ns.route('/feed')
+class EntryFeedResource(Resource):
+    @cache_policy('list', keys=('entries:list',))
+    @entry_ns.doc('get_entry_feed', params={
+        'limit': 'Entradas por página (por defecto y como máximo ENTRY_PAGE_MAX_SIZE)',
+        'cursor': 'Cursor de la página siguiente (encabezado X-Next-Cursor)',
+    })
+    @entry_ns.marshal_list_with(entry_summary_model)
+    def get(self):
+        """
+        Obtener el feed de entradas de blog
+        ---
+        Este método devuelve los resúmenes de las entradas, de la más nueva a la más antigua,
+        con paginación por cursor. Las primeras páginas se sirven desde memoria, sin consultar
+        la base de datos.
+
+        Query Parameters:
+        - limit: Entradas por página.
+        - cursor: Valor de `X-Next-Cursor` de la página anterior.
+
+        Responses:
+        - 200: Retorna los resúmenes de la página y el cursor siguiente en `X-Next-Cursor`.
+        - 400: Si `limit` o `cursor` no son enteros válidos.
+        """
+        summaries, next_cursor = EntryService.list_feed(*parse_page_args())
+        if next_cursor is None:
+            return summaries
+        return summaries, 200, {'X-Next-Cursor': str(next_cursor)}
+
+
+@entry_ns.route('/categories')
+class EntryCategoriesResource(Resource):
+    @cache_policy('list', keys=('entries:list',))
+    @entry_ns.doc('get_entry_categories')
+    @entry_ns.marshal_list_with(category_facet_model)
+    def get(self):
+        """
+        Obtener las categorías con su número de entradas
+        ---
+        Este método devuelve las facetas de categoría para filtrar las entradas. Los números se
+        mantienen en cada escritura de entradas, por lo que no se recorre la tabla de entradas.
+
+        Responses:
+        - 200: Retorna las categorías con entradas, de mayor a menor número de entradas.
+        """
+        return CategoryService.list_facets()
+
+
 @entry_ns.route('/<id_entry>')
 @entry_ns.param('id_entry', 'El ID de la entrada de blog')
 class EntryDetailResource(Resource):
+    @cache_policy('public', keys=('entry:{id_entry}',))
+    @entry_ns.doc('get_entry')
+    @entry_ns.response(404, 'Entrada no encontrada')
+    @entry_ns.marshal_with(entry_detail_model)
+    def get(self, id_entry):
+        """
+        Obtener una entrada de blog
+        ---
+        Este método devuelve una entrada junto con su contenido renderizado a HTML. El render
+        se genera al crear o actualizar la entrada, por lo que la lectura no renderiza.
+
+        Path Parameters:
+        - id_entry: El ID de la entrada de blog.
+
+        Responses:
+        - 200: Retorna la entrada con `content_html`.
+        - 404: Si la entrada de blog no se encuentra.
+        """
+        result = RenderService.get_entry_with_html(id_entry)
+        if result is None:
+            entry_ns.abort(404, 'Blog entry not found')
+        entry, html = result
+        surrogate_keys(f'user:{entry.id_user}')  # El detalle muestra el nombre del autor
+        entry.content_html = html
+        return entry
+
+    @rate_limit('write')
+    @concurrency_limit('write')
     @jwt_required()
     @entry_ns.doc('delete_entry')
     def delete(self, id_entry):
@@ -120,6 +328,8 @@ class EntryDetailResource(Resource):
         # Usamos jsonify para enviar un mensaje de éxito en formato JSON.
         return jsonify({'message': 'Entry deleted successfully'})
 
+    @rate_limit('write')
+    @concurrency_limit('write')
     @jwt_required()
     @entry_ns.doc('update_entry')
     @entry_ns.expect(entry_model, validate=True)
@@ -159,3 +369,129 @@ class EntryDetailResource(Resource):
         #return jsonify({'message': 'Entry updated successfully', 'Entry': entry}, 200)
         return updated_entry, 200
 
+
+@entry_ns.route('/bulk')
+class EntryBulkResource(Resource):
+    @rate_limit('write')
+    @concurrency_limit('write')
+    @jwt_required()
+    @entry_ns.doc('create_entries_bulk')
+    @entry_ns.expect(entry_bulk_model)
+    @entry_ns.response(201, 'Todas las entradas fueron creadas', [entry_bulk_result_model])
+    @entry_ns.response(207, 'Algunas entradas no pasaron la validación', [entry_bulk_result_model])
+    def post(self):
+        """
+        Crear varias entradas de blog en una sola petición
+        ---
+        Este método valida cada entrada contra el modelo de entrada de blog, crea todas las
+        entradas válidas en una sola transacción y devuelve el resultado de cada una.
+
+        Body Parameters:
+        - entries: Lista de entradas con los mismos campos que la creación individual
+          (también se acepta la lista directamente como cuerpo de la solicitud).
+
+        Responses:
+        - 201: Todas las entradas fueron creadas.
+        - 207: Algunas entradas fueron creadas y otras tienen errores de validación.
+        - 400: Ninguna entrada es válida o el cuerpo de la solicitud es incorrecto.
+        """
+        id_user = get_jwt_identity() #Obtiene el id_user del JWT
+        data = request.get_json(silent=True)
+        items = data.get('entries') if isinstance(data, dict) else data
+        max_items = current_app.config['ENTRY_BULK_MAX_ITEMS']
+        if not isinstance(items, list) or not items:
+            return {'error': 'El cuerpo debe ser una lista no vacía de entradas o un objeto con el campo entries'}, 400
+        if len(items) > max_items:
+            return {'error': f'Se permiten como máximo {max_items} entradas por petición'}, 400
+
+        # Validar cada entrada con el validador compilado una sola vez
+        validator = get_entry_validator()
+        results, valid_items, valid_results = [], [], []
+        for index, item in enumerate(items):
+            errors = sorted(error.message for error in validator.iter_errors(item))
+            result = {'index': index, 'status': 'error' if errors else 'created', 'id_entry': None, 'errors': errors}
+            results.append(result)
+            if not errors:
+                valid_items.append({key: item[key] for key in entry_model if key in item})
+                valid_results.append(result)
+
+        if not valid_items:
+            return {'created': 0, 'failed': len(results), 'results': results}, 400
+
+        try:
+            ids = EntryService.create_entries(valid_items, id_user)
+        except ValueError as e:
+            return {'error': str(e)}, 404
+
+        for result, id_entry in zip(valid_results, ids):
+            result['id_entry'] = id_entry
+
+        failed = len(results) - len(ids)
+        return {'created': len(ids), 'failed': failed, 'results': results}, 207 if failed else 201
+
+
+@entry_ns.route('/<id_entry>/duplicates')
+@entry_ns.param('id_entry', 'El ID de la entrada de blog')
+class EntryDuplicatesResource(Resource):
+    @cache_policy('no-store')
+    @jwt_required()
+    @admin_required
+    @entry_ns.doc('get_entry_duplicates')
+    @entry_ns.response(404, 'Entrada no encontrada')
+    @entry_ns.marshal_list_with(entry_duplicate_model)
+    def get(self, id_entry):
+        """
+        Obtener las entradas casi duplicadas de una entrada de blog (solo administradores)
+        ---
+        Este método busca en el índice de firmas MinHash las entradas cuyo texto difiere en
+        pocas palabras del de la entrada, con unas pocas consultas indexadas.
+
+        Path Parameters:
+        - id_entry: El ID de la entrada de blog.
+
+        Responses:
+        - 200: Retorna los casi duplicados, del más parecido al menos.
+        - 403: Si el usuario no es administrador.
+        - 404: Si la entrada de blog no se encuentra.
+        """
+        duplicates = DuplicateService.get_duplicates(id_entry)
+        if duplicates is None:
+            entry_ns.abort(404, 'Blog entry not found')
+        return [{
+            'id_entry': entry.id_entry,
+            'similarity': similarity,
+            'title': entry.title,
+            'user': entry.user,
+            'created_at': entry.created_at,
+        } for entry, similarity in duplicates]
+
+
+@entry_ns.route('/<id_entry>/related')
+@entry_ns.param('id_entry', 'El ID de la entrada de blog')
+class EntryRelatedResource(Resource):
+    @cache_policy('public', keys=('entry:{id_entry}', 'entries:list'))
+    @entry_ns.doc('get_related_entries')
+    @entry_ns.marshal_list_with(entry_related_model)
+    def get(self, id_entry):
+        """
+        Obtener las entradas relacionadas de una entrada de blog
+        ---
+        Este método devuelve las entradas más similares (por título, descripción y categoría),
+        precalculadas en segundo plano cuando se crea la entrada. Las entradas archivadas
+        conservan sus relacionadas y siguen apareciendo como relacionadas de las demás.
+
+        Path Parameters:
+        - id_entry: El ID de la entrada de blog.
+
+        Responses:
+        - 200: Retorna la lista de entradas relacionadas (vacía si aún no se calcularon).
+        """
+        related = RelatedService.get_related(id_entry)
+        return [{
+            'id_entry': entry.id_entry,
+            'cover_img': entry.cover_img,
+            'title': entry.title,
+            'description': entry.description,
+            'category': entry.category,
+            'score': score,
+        } for entry, score in related]
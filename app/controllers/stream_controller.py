@@ -0,0 +1,91 @@
+import json
+import queue
+from flask import request, jsonify, current_app, Response
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required
+from app import db
+from app.utils.pubsub import broker
+from app.middlewares.http_cache import cache_policy
+
+# Crear un espacio de nombres (namespace) para el stream de eventos
+stream_ns = Namespace('stream', description='Notificaciones en tiempo real (Server-Sent Events)')
+
+
+def format_event(event):
+    """Serializar un evento (secuencia, tipo, datos) en el formato de texto de SSE."""
+    seq, event_type, data = event
+    return f"id: {broker.format_id(seq)}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@stream_ns.route('')
+class StreamResource(Resource):
+    @cache_policy('no-store')
+    @jwt_required()
+    @stream_ns.doc('stream_entries', params={
+        'authors': 'IDs de usuario separados por comas para filtrar los eventos (opcional)',
+    })
+    def get(self):
+        """
+        Suscribirse a las nuevas entradas de blog
+        ---
+        Este método mantiene abierta una conexión Server-Sent Events y envía un evento
+        `entry.created` por cada nueva entrada publicada. Si el cliente se reconecta con la
+        cabecera `Last-Event-ID`, recibe los eventos que se perdió mientras sigan en el buffer.
+        Si el ID pertenece a otro worker o a un proceso anterior a un reinicio, la conexión se
+        trata como una suscripción nueva (sin reenvío de eventos antiguos).
+
+        Query Parameters:
+        - authors: IDs de los autores a seguir, separados por comas (opcional).
+
+        Responses:
+        - 200: Stream de eventos (text/event-stream).
+        - 503: Si el worker alcanzó el límite de conexiones.
+        """
+        try:
+            authors = {int(a) for a in request.args.get('authors', '').split(',') if a.strip()}
+        except ValueError:
+            return jsonify({'message': 'Invalid authors'}), 400
+        resume_from = broker.resume_point(request.headers.get('Last-Event-ID'))
+
+        subscription = broker.subscribe()
+        if subscription is None:
+            response = jsonify({'message': 'Too many open streams, retry later'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(current_app.config['STREAM_RETRY_SECONDS'])
+            return response
+
+        heartbeat = current_app.config['STREAM_HEARTBEAT_SECONDS']
+        retry_ms = current_app.config['STREAM_RETRY_SECONDS'] * 1000
+
+        # La conexión puede quedar abierta durante horas: liberar la sesión para no retener
+        # una conexión del pool de la base de datos mientras se esperan eventos
+        db.session.remove()
+
+        def generate():
+            # Sin un punto de reanudación válido solo se envían los eventos recibidos en la cola
+            last_id = resume_from or 0
+            try:
+                yield f"retry: {retry_ms}\n\n"
+                # Reenviar los eventos perdidos desde el buffer circular
+                pending = broker.events_since(last_id) if resume_from is not None else []
+                while not subscription.closed:
+                    for event in pending:
+                        if event[0] <= last_id:
+                            continue
+                        last_id = event[0]
+                        if not authors or event[2].get('id_user') in authors:
+                            yield format_event(event)
+                    try:
+                        pending = [subscription.get(timeout=heartbeat)]
+                    except queue.Empty:
+                        # Comentario SSE: mantiene viva la conexión a través de proxies
+                        pending = []
+                        yield ": heartbeat\n\n"
+            finally:
+                broker.unsubscribe(subscription)
+
+        return Response(
+            generate(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
@@ -1,7 +1,9 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_restx import Namespace, Resource, fields
 from app.services.user_service import UserService
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.middlewares.rate_limit import rate_limit, concurrency_limit
+from app.middlewares.http_cache import cache_policy, surrogate_keys
 
 # Crear un espacio de nombres (namespace) para los usuarios
 user_ns = Namespace('users', description='Operaciones relacionadas con los usuarios')
@@ -28,9 +30,40 @@ user_response_model = user_ns.model('UserResponse', {
     'member_since': fields.String(description='Fecha en que el usuario se unió al sistema'),
 })
 
+# Modelo de salida con los datos públicos de un usuario (sin correo ni contraseña)
+user_public_model = user_ns.model('UserPublic', {
+    'id_user': fields.Integer(description='ID del usuario'),
+    'username': fields.String(description='Nombre de usuario de identificación'),
+    'name': fields.String(description='Nombre del usuario'),
+    'bio': fields.String(description='Biografía del usuario'),
+    'profile_pic': fields.String(description='Foto de perfil del usuario'),
+    'member_since': fields.String(description='Fecha en que el usuario se unió al sistema'),
+})
+
+# Modelo de salida para el resumen de las últimas entradas del perfil
+profile_entry_model = user_ns.model('ProfileEntry', {
+    'id_entry': fields.Integer(description='ID de la entrada de blog'),
+    'cover_img': fields.String(description='Imagen de portada'),
+    'title': fields.String(description='Título de la entrada'),
+    'description': fields.String(description='Descripción corta de la entrada'),
+    'category': fields.String(description='Categoría del contenido publicado'),
+    'created_at': fields.DateTime(description='Fecha de creación de la entrada'),
+})
+
+# Modelo de salida para el perfil de un autor
+user_profile_model = user_ns.model('UserProfile', {
+    'user': fields.Nested(user_public_model, description='Datos públicos del usuario'),
+    'entry_count': fields.Integer(attribute='user.entry_count', description='Número de entradas publicadas'),
+    'follower_count': fields.Integer(attribute='user.follower_count', description='Número de seguidores'),
+    'following_count': fields.Integer(attribute='user.following_count', description='Número de usuarios seguidos'),
+    'latest_entries': fields.List(fields.Nested(profile_entry_model), description='Últimas entradas del autor'),
+})
+
 # Definir el controlador de usuarios con decoradores para la documentación
 @user_ns.route('/')
 class UserResource(Resource):
+    @rate_limit('write')
+    @concurrency_limit('bcrypt')
     @user_ns.doc('create_user')
     @user_ns.expect(user_model, validate=True)  # Decorador para esperar el modelo en la petición
     @user_ns.marshal_with(user_response_model, code=201)  # Serialización automática del usuario creado
@@ -66,6 +99,7 @@ class UserResource(Resource):
         #return jsonify({'message': 'User created successfully', 'user': user.username})
         return user
 
+    @cache_policy('list', keys=('users:list',))
     @user_ns.doc('get_users')
     def get(self):
         """
@@ -76,14 +110,82 @@ class UserResource(Resource):
         Responses:
         - 200: Retorna una lista de nombres de usuarios.
         """
-        users = UserService.get_all_users()  # Llama al servicio para obtener todos los usuarios
+        usernames = UserService.list_usernames()  # Llama al servicio (con caché) para obtener los nombres de usuario
         # Usamos jsonify para garantizar que la lista de usuarios se retorne como un JSON válido.
-        return jsonify({'users': [user.username for user in users]})  # Retorna solo los nombres de usuario
+        return jsonify({'users': usernames})  # Retorna solo los nombres de usuario
+
+
+@user_ns.route('/available')
+class UserAvailabilityResource(Resource):
+    @cache_policy('no-store')
+    @user_ns.doc('check_availability', params={
+        'username': 'Nombre de usuario a verificar',
+        'email': 'Correo electrónico a verificar',
+    })
+    def get(self):
+        """
+        Verificar la disponibilidad de un nombre de usuario y/o correo electrónico
+        ---
+        Este método permite al formulario de registro comprobar si un nombre de usuario o un
+        correo ya están en uso. La mayoría de las respuestas "disponible" se resuelven con un
+        filtro en memoria, sin consultar la base de datos.
+
+        Query Parameters:
+        - username: Nombre de usuario a verificar (opcional).
+        - email: Correo electrónico a verificar (opcional).
+
+        Responses:
+        - 200: Retorna la disponibilidad de cada valor recibido.
+        - 400: Si no se envía ningún valor a verificar.
+        """
+        username = request.args.get('username')
+        email = request.args.get('email')
+        if not username and not email:
+            return jsonify({'error': 'Se requiere el parámetro username o email'}), 400
+
+        availability = UserService.check_availability(username=username or None, email=email or None)
+        return jsonify({field: {'value': request.args[field], 'available': available}
+                        for field, available in availability.items()})
+
+
+@user_ns.route('/<username>/profile')
+@user_ns.param('username', 'El nombre de usuario')
+class UserProfileResource(Resource):
+    @cache_policy('public')
+    @user_ns.doc('get_user_profile', params={'limit': 'Número de entradas recientes a incluir'})
+    @user_ns.marshal_with(user_profile_model)
+    def get(self, username):
+        """
+        Obtener el perfil público de un autor
+        ---
+        Este método devuelve los datos públicos del usuario, sus contadores de entradas,
+        seguidores y seguidos, y sus últimas entradas publicadas.
+
+        Path Parameters:
+        - username: El nombre del usuario.
+
+        Query Parameters:
+        - limit: Número de entradas recientes a incluir (opcional).
+
+        Responses:
+        - 200: Retorna el perfil del usuario.
+        - 404: Si el usuario no se encuentra.
+        """
+        limit = request.args.get('limit', current_app.config['PROFILE_LATEST_ENTRIES'], type=int)
+        limit = max(0, min(limit, current_app.config['PROFILE_MAX_ENTRIES']))
+
+        profile = UserService.get_profile(username, limit)
+        if not profile:
+            user_ns.abort(404, 'User not found')
+        surrogate_keys(f"user:{profile['user'].id_user}")
+        return profile
 
 
 @user_ns.route('/<username>')
 @user_ns.param('username', 'El nombre de usuario')
 class UserDetailResource(Resource):
+    @rate_limit('write')
+    @concurrency_limit('write')
     @jwt_required()
     @user_ns.doc('delete_user')
     def delete(self, username):
@@ -110,6 +212,8 @@ class UserDetailResource(Resource):
         # Usamos jsonify para enviar un mensaje de éxito en formato JSON.
         return jsonify({'message': 'User deleted successfully'})
 
+    @rate_limit('write')
+    @concurrency_limit('bcrypt')
     @jwt_required()
     @user_ns.doc('update_user')
     @user_ns.expect(user_model, validate=True)
@@ -1,6 +1,6 @@
 from flask_jwt_extended import get_jwt_identity
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, current_app
 from app.services.user_service import UserService
 from app.models.user import User
 
@@ -28,3 +28,24 @@ from app.models.user import User
         return func(*args, **kwargs)
     
     return wrapper  # Retorna la función decorada con las verificaciones de autenticación """
+
+
+def admin_required(func):
+    """
+    Middleware para restringir un endpoint a los administradores.
+
+    Los administradores son los usuarios cuyo ID está en `ADMIN_USER_IDS`. Debe usarse
+    junto con `@jwt_required()` (aplicado antes que este decorador).
+
+    Returns:
+        Función decoradora que responde 403 si el usuario autenticado no es administrador.
+    """
+    @wraps(func)  # Mantiene el nombre y la docstring original de la función decorada
+    def wrapper(*args, **kwargs):
+        # Obtener el id del usuario autenticado a partir del token JWT
+        id_user = get_jwt_identity()
+        if id_user not in current_app.config['ADMIN_USER_IDS']:
+            return {'message': 'Admin privileges required'}, 403
+        return func(*args, **kwargs)
+
+    return wrapper
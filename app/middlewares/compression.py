@@ -0,0 +1,113 @@
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/event-stream', 'text/html', 'text/plain', 'text/csv'}
+
+
+class CompressedCache:
+    """
+    Caché LRU acotada de cuerpos comprimidos, indexada por (ETag, codificación).
+
+    Una respuesta repetida (mismo ETag) reutiliza los bytes ya comprimidos en lugar de
+    volver a comprimirlos.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+def _compressor(encoding, level):
+    # wbits 31 = contenedor gzip, 15 = contenedor zlib ("deflate" en HTTP)
+    return zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == 'gzip' else 15)
+
+
+def _compress_stream(chunks, encoding, level):
+    """Comprimir un cuerpo en streaming bloque a bloque, sin acumularlo en memoria."""
+    compressor = _compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk)
+            # Z_SYNC_FLUSH entrega cada bloque al cliente de inmediato (necesario para SSE)
+            yield data + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_app(app):
+    """
+    Registrar la compresión negociada (gzip/deflate) de las respuestas de la aplicación.
+
+    - Elige la codificación a partir de la cabecera `Accept-Encoding`.
+    - No comprime respuestas menores a `COMPRESS_MIN_SIZE` bytes.
+    - Las respuestas en streaming se comprimen bloque a bloque.
+    - Las respuestas GET reciben un ETag, responden 304 a `If-None-Match` y guardan el cuerpo
+      comprimido junto al ETag para no recomprimir en las siguientes peticiones.
+    """
+    cache = CompressedCache(app.config['COMPRESS_CACHE_SIZE'])
+    app.extensions['compressed_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(['gzip', 'deflate'])
+        level = app.config['COMPRESS_LEVEL']
+
+        if response.is_streamed:
+            if encoding:
+                response.response = _compress_stream(response.response, encoding, level)
+                response.headers['Content-Encoding'] = encoding
+                response.headers.pop('Content-Length', None)
+            return response
+
+        if request.method == 'GET' and response.status_code == 200:
+            # ETag débil del cuerpo sin comprimir: válido para todas las codificaciones
+            if not response.get_etag()[0]:
+                response.add_etag(weak=True)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if not encoding or (response.content_length or 0) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        etag = response.get_etag()[0]
+        body = cache.get((etag, encoding)) if etag else None
+        if body is None:
+            compressor = _compressor(encoding, level)
+            body = compressor.compress(response.get_data()) + compressor.flush()
+            if etag:
+                cache.set((etag, encoding), body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,62 @@
+from functools import wraps
+from flask import g, request
+
+
+def cache_policy(name, keys=()):
+    """
+    Decorador que declara la política de caché HTTP de un método de un Resource.
+
+    La política se define en `HTTP_CACHE_POLICIES[name]` (el valor de `Cache-Control`). Las
+    claves se formatean con los parámetros de la ruta (por ejemplo 'entry:{id_entry}') y se
+    envían en la cabecera de surrogate keys, con la que el proxy purga las respuestas.
+
+    Args:
+        name (str): Nombre de la política en la configuración.
+        keys (tuple): Plantillas de las surrogate keys de la respuesta.
+    """
+    def decorator(func):
+        @wraps(func)  # Mantiene el nombre y la docstring original de la función decorada
+        def wrapper(*args, **kwargs):
+            g.cache_policy = name
+            surrogate_keys(*(key.format(**kwargs) for key in keys))
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def surrogate_keys(*keys):
+    """
+    Agregar surrogate keys a la respuesta en curso.
+
+    Se usa dentro de la vista para las claves que solo se conocen después de consultar los
+    datos (por ejemplo, el autor de una entrada).
+    """
+    g.setdefault('surrogate_keys', set()).update(keys)
+
+
+def init_app(app):
+    """
+    Registrar las cabeceras de caché HTTP de las respuestas con una política declarada.
+
+    - Las respuestas 200 a GET/HEAD reciben el `Cache-Control` de su política y sus surrogate
+      keys; las demás (errores, validación) se marcan `no-store`.
+    - Todas llevan `Vary: Authorization`, de modo que el proxy nunca sirve a un cliente la
+      respuesta obtenida con las credenciales de otro.
+    - Las respuestas sin política no se modifican.
+    """
+    @app.after_request
+    def add_cache_headers(response):
+        policy = g.pop('cache_policy', None)
+        keys = g.pop('surrogate_keys', None)
+        if policy is None or not app.config['HTTP_CACHE_ENABLED'] or request.method not in ('GET', 'HEAD'):
+            return response
+
+        response.vary.add('Authorization')
+        if response.status_code != 200:
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        if 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = app.config['HTTP_CACHE_POLICIES'][policy]
+        if keys:
+            response.headers[app.config['HTTP_CACHE_SURROGATE_HEADER']] = ' '.join(sorted(keys))
+        return response
@@ -0,0 +1,281 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps, lru_cache
+from flask import request, jsonify, current_app
+
+# Segundos de cada periodo aceptado en los límites ("20/minute")
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_limit(limit):
+    """
+    Convertir un límite como "20/minute" en (capacidad, tokens por segundo).
+
+    Args:
+        limit (str): Número de peticiones y periodo separados por "/".
+
+    Returns:
+        tuple: (capacidad del bucket, velocidad de recarga en tokens por segundo).
+    """
+    amount, period = limit.split('/')
+    capacity = int(amount)
+    return capacity, capacity / PERIODS[period.strip().rstrip('s')]
+
+
+class _BucketStore:
+    """Buckets de un límite, del usado hace más tiempo al más reciente."""
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+
+class MemoryBackend:
+    """
+    Buckets de tokens en memoria, propios de cada proceso.
+
+    Cada límite tiene su propio almacén, ordenado por la última actualización: como todos sus
+    buckets se recargan a la misma velocidad, los del principio son los primeros en llenarse.
+    En cada consumo se descartan los del principio que ya están llenos (equivalen a no tener
+    bucket), con un costo amortizado O(1), y si aun así se supera `max_keys` se descarta el
+    usado hace más tiempo. Los límites más estrictos no pierden sus buckets por los demás.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def consume(self, name, key, capacity, rate):
+        """
+        Consumir un token del bucket `key` del límite `name`.
+
+        Returns:
+            tuple: (permitido, segundos hasta que haya un token disponible).
+        """
+        store = self._stores.get(name)
+        if store is None:
+            with self._lock:
+                store = self._stores.setdefault(name, _BucketStore())
+
+        now = time.monotonic()
+        with store.lock:
+            buckets = store.buckets
+            tokens, updated = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+            self._evict(buckets, now, capacity, rate)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def _evict(self, buckets, now, capacity, rate):
+        while buckets:
+            tokens, updated = next(iter(buckets.values()))
+            if tokens + (now - updated) * rate < capacity:
+                break
+            buckets.popitem(last=False)
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+
+
+class SQLiteBackend:
+    """
+    Buckets de tokens compartidos entre procesos en un archivo SQLite local.
+
+    Cada consumo se hace dentro de una transacción `BEGIN IMMEDIATE`, de modo que varios
+    workers de la misma máquina comparten los límites sin un servicio externo.
+
+    Las claves pueden venir del cliente (nombres de usuario en el login), así que cada
+    `prune_every` consumos se eliminan los buckets sin usar durante más de `max_idle`
+    segundos: ya están llenos y equivalen a no tener bucket.
+    """
+
+    def __init__(self, path, max_idle=86400, prune_every=1000):
+        self.path = path
+        self.max_idle = max_idle
+        self.prune_every = prune_every
+        self._calls = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_rate_buckets_updated ON rate_buckets (updated)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def consume(self, name, key, capacity, rate):
+        """
+        Consumir un token del bucket `key` del límite `name`.
+
+        Returns:
+            tuple: (permitido, segundos hasta que haya un token disponible).
+        """
+        key = f'{name}:{key}'
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0, now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        # El contador es aproximado entre hilos: solo decide cuándo limpiar
+        self._calls += 1
+        if self._calls >= self.prune_every:
+            self._calls = 0
+            self.prune(now)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def prune(self, now=None):
+        """
+        Eliminar los buckets sin usar durante más de `max_idle` segundos.
+
+        Returns:
+            int: Buckets eliminados.
+        """
+        now = time.time() if now is None else now
+        return self._connect().execute('DELETE FROM rate_buckets WHERE updated < ?', (now - self.max_idle,)).rowcount
+
+
+class RateLimiter:
+    """
+    Limitador de peticiones por cliente (token bucket) y de peticiones concurrentes por endpoint.
+
+    El backend de los buckets se elige con `RATELIMIT_STORAGE`: 'memory' (por proceso) o
+    'sqlite:///ruta/al/archivo.db' (compartido entre los procesos de la máquina).
+    """
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configurar el backend a partir de la configuración de la aplicación."""
+        storage = app.config.get('RATELIMIT_STORAGE', 'memory')
+        if storage.startswith('sqlite:///'):
+            # Un bucket sin usar durante el periodo de recarga más largo está lleno en todos los límites
+            limits = [parse_limit(limit) for limit in app.config['RATE_LIMITS'].values() if limit]
+            self.backend = SQLiteBackend(
+                storage[len('sqlite:///'):],
+                max_idle=max((capacity / rate for capacity, rate in limits), default=0),
+                prune_every=app.config['RATELIMIT_SQLITE_PRUNE_EVERY'],
+            )
+        else:
+            self.backend = MemoryBackend()
+        app.extensions['rate_limiter'] = self
+
+    def acquire(self, name):
+        """Reservar un lugar de concurrencia en el grupo `name`; devuelve False si está lleno."""
+        limit = current_app.config['CONCURRENCY_LIMITS'].get(name)
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(name, 0)
+            if limit is not None and in_flight >= limit:
+                return False
+            self._in_flight[name] = in_flight + 1
+            return True
+
+    def release(self, name):
+        """Liberar un lugar de concurrencia del grupo `name`."""
+        with self._in_flight_lock:
+            self._in_flight[name] -= 1
+
+
+# Instancia global, inicializada en `create_app` igual que el resto de extensiones
+limiter = RateLimiter()
+
+
+def by_ip():
+    """
+    Clave de rate limiting: dirección IP del cliente.
+
+    Detrás de un proxy inverso, `remote_addr` es la del cliente solo si `TRUSTED_PROXY_COUNT`
+    indica cuántos proxies añaden X-Forwarded-For (ver `create_app`).
+    """
+    return request.remote_addr
+
+
+def by_username():
+    """Clave de rate limiting: nombre de usuario enviado en el cuerpo (login)."""
+    data = request.get_json(silent=True)
+    username = data.get('username') if isinstance(data, dict) else None
+    return username.lower() if isinstance(username, str) else None
+
+
+def _reject(message, status, retry_after):
+    response = jsonify({'message': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def rate_limit(name, key_func=by_ip):
+    """
+    Decorador que limita las peticiones por cliente con un token bucket.
+
+    El límite se define en `RATE_LIMITS[name]` (por ejemplo "10/minute"). Si el cliente
+    no tiene tokens disponibles se responde 429 con la cabecera Retry-After.
+
+    Args:
+        name (str): Nombre del límite en la configuración.
+        key_func (callable): Función que devuelve la clave del cliente (IP, usuario...).
+    """
+    def decorator(func):
+        @wraps(func)  # Mantiene el nombre y la docstring original de la función decorada
+        def wrapper(*args, **kwargs):
+            limit = current_app.config['RATE_LIMITS'].get(name)
+            key = key_func()
+            if current_app.config['RATELIMIT_ENABLED'] and limit and key is not None:
+                capacity, rate = parse_limit(limit)
+                allowed, retry_after = limiter.backend.consume(name, key, capacity, rate)
+                if not allowed:
+                    return _reject('Too many requests', 429, retry_after)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def concurrency_limit(name):
+    """
+    Decorador que limita las peticiones en curso de un grupo de endpoints en este worker.
+
+    Cuando hay `CONCURRENCY_LIMITS[name]` peticiones en curso, las nuevas se rechazan
+    inmediatamente con 503 y Retry-After en lugar de encolarse, de modo que una ráfaga
+    de peticiones costosas (bcrypt) no deja sin CPU al resto de endpoints.
+
+    Args:
+        name (str): Nombre del grupo de concurrencia en la configuración.
+    """
+    def decorator(func):
+        @wraps(func)  # Mantiene el nombre y la docstring original de la función decorada
+        def wrapper(*args, **kwargs):
+            if not current_app.config['RATELIMIT_ENABLED']:
+                return func(*args, **kwargs)
+            if not limiter.acquire(name):
+                return _reject('Server busy, retry later', 503, current_app.config['CONCURRENCY_RETRY_AFTER'])
+            try:
+                return func(*args, **kwargs)
+            finally:
+                limiter.release(name)
+        return wrapper
+    return decorator
@@ -0,0 +1,23 @@
+from app import db
+
+
+class Category(db.Model):
+    """
+    Modelo que representa una categoría de entradas de blog.
+
+    Las entradas referencian su categoría por un identificador entero pequeño. El número
+    de entradas de cada categoría se mantiene de forma incremental en cada escritura de
+    entradas, por lo que las facetas no requieren un `GROUP BY` sobre `entries`.
+
+    Atributos:
+        id_category (int): Identificador único de la categoría (clave primaria).
+        name (str): Nombre de la categoría, único.
+        entry_count (int): Número de entradas de la categoría, mantenido por `EntryService`.
+    """
+
+    __tablename__ = 'categories'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla
+    id_category = db.Column(db.SmallInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)  # Clave primaria (INTEGER en SQLite para el autoincremento)
+    name = db.Column(db.String(15), unique=True, nullable=False)  # Nombre de la categoría
+    entry_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Entradas de la categoría
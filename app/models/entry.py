@@ -1,6 +1,7 @@
 from datetime import datetime
 from app import db
 from app.models.user import User
+from app.models.category import Category
 
 
 class Entry(db.Model):
@@ -21,9 +22,15 @@ class Entry(db.Model):
         github_link (str): link del repositorio de github
         created_at (datetime): Fecha de creación de la entrada.
         id_user (int): Relación con el modelo User que indica el autor de la entrada.
+        content_hash (str): Hash del contenido, clave de su HTML renderizado (`EntryRender`).
+        id_category (int): Relación con el modelo Category (la columna `category` se conserva por compatibilidad).
     """
     
     __tablename__ = 'entries'  # Especifica el nombre de la tabla en la base de datos
+    __table_args__ = (
+        # Índice para obtener las últimas entradas de un autor (perfil) sin recorrer la tabla
+        db.Index('ix_entries_id_user_created_at', 'id_user', 'created_at'),
+    )
 
     # Definición de columnas de la tabla
     id_entry = db.Column(db.Integer, primary_key=True)  # Clave primaria de la tabla
@@ -34,8 +41,10 @@ class Entry(db.Model):
     category = db.Column(db.String(15), nullable=False) # Categoría, no puede ser nula
     source_file = db.Column(db.String(100)) #Archivo de código fuente
     github_link = db.Column(db.String(100)) #Link al repositorio de github
-    created_at = db.Column(db.DateTime, default=datetime.now()) # Fecha de creación de la entrada
+    created_at = db.Column(db.DateTime, default=datetime.now) # Fecha de creación de la entrada
     id_user = db.Column(db.Integer, db.ForeignKey('users.id_user', ondelete='CASCADE'), nullable=False) # Clave foránea hacia la tabla "users"
+    content_hash = db.Column(db.String(64), index=True) # Hash del contenido, clave del HTML renderizado
+    id_category = db.Column(db.SmallInteger, db.ForeignKey('categories.id_category', name='fk_entries_id_category'), index=True) # Clave foránea hacia la tabla "categories"
 
     # Relación con el modelo User
     # user = db.relationship('User', backref='entries') # Define la relación con el modelo User y permite acceso inverso desde User a Entry
@@ -0,0 +1,48 @@
+from datetime import datetime
+from app import db
+
+
+class EntryArchive(db.Model):
+    """
+    Modelo que representa una entrada de blog archivada.
+
+    Las entradas más antiguas que `ARCHIVE_AFTER_DAYS` se mueven desde `entries` a esta tabla
+    en lotes (`ArchiveService`), de modo que la tabla de entradas y sus índices solo contienen
+    las entradas recientes. Las columnas son las mismas que las de `Entry` y conservan su ID,
+    por lo que los servicios pueden usar ambos modelos de la misma forma.
+
+    Atributos:
+        id_entry (int): ID original de la entrada de blog (clave primaria).
+        cover_img (str): Imagen de portada
+        title (str): Título de la entrada
+        description (str): Descripción corta de la entrada - resumen.
+        content (str): Contenido de la entrada.
+        category (str): Categoría de la entrada de blog.
+        source_file (str): archivo de código fuente
+        github_link (str): link del repositorio de github
+        created_at (datetime): Fecha de creación de la entrada.
+        id_user (int): Autor de la entrada.
+        content_hash (str): Hash del contenido, clave de su HTML renderizado.
+        id_category (int): Categoría normalizada de la entrada.
+        archived_at (datetime): Fecha en que se archivó la entrada.
+    """
+
+    __tablename__ = 'entries_archive'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla (las mismas que `entries`)
+    id_entry = db.Column(db.Integer, primary_key=True, autoincrement=False)  # ID original de la entrada
+    cover_img = db.Column(db.String(200), nullable=False)  # Imagen de portada
+    title = db.Column(db.String(100), nullable=False)  # Título
+    description = db.Column(db.String(500))  # Descripción
+    content = db.Column(db.String(200), nullable=False)  # Contenido de la entrada
+    category = db.Column(db.String(15), nullable=False)  # Categoría
+    source_file = db.Column(db.String(100))  # Archivo de código fuente
+    github_link = db.Column(db.String(100))  # Link al repositorio de github
+    created_at = db.Column(db.DateTime)  # Fecha de creación de la entrada
+    id_user = db.Column(db.Integer, db.ForeignKey('users.id_user', ondelete='CASCADE'), nullable=False, index=True)  # Autor
+    content_hash = db.Column(db.String(64))  # Hash del contenido, clave del HTML renderizado
+    id_category = db.Column(db.SmallInteger, db.ForeignKey('categories.id_category', name='fk_entries_archive_id_category'))  # Categoría normalizada
+    archived_at = db.Column(db.DateTime, default=datetime.now)  # Fecha de archivo
+
+    # Relación con el modelo User (autor)
+    user = db.relationship('User')
@@ -0,0 +1,24 @@
+from app import db
+
+
+class EntryFingerprintBand(db.Model):
+    """
+    Modelo que representa una banda de la firma MinHash de una entrada de blog.
+
+    Cada entrada tiene `DUPLICATE_BANDS` filas, una por banda de su firma. Las entradas
+    casi duplicadas comparten al menos una banda con alta probabilidad, de modo que los
+    candidatos se buscan por la clave primaria (banda, valor) en lugar de comparar con
+    todas las entradas.
+
+    Atributos:
+        band (int): Número de la banda.
+        value (int): Hash de los valores de la firma en la banda.
+        id_entry (int): Entrada de blog.
+    """
+
+    __tablename__ = 'entry_fingerprint_bands'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla
+    band = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)  # Número de banda
+    value = db.Column(db.BigInteger, primary_key=True, autoincrement=False)  # Hash de la banda
+    id_entry = db.Column(db.Integer, db.ForeignKey('entries.id_entry', ondelete='CASCADE'), primary_key=True, index=True)  # Entrada
@@ -0,0 +1,27 @@
+from app import db
+
+
+class EntryRelated(db.Model):
+    """
+    Modelo que representa una entrada relacionada (vecina por similitud TF-IDF) de otra entrada.
+
+    Las filas se precalculan fuera de las peticiones (`RelatedService`), de modo que obtener
+    las entradas relacionadas es una sola consulta por la clave primaria. No hay claves
+    foráneas a `entries`: las filas se conservan al archivar una entrada (cualquiera de los
+    dos lados puede estar en `entries_archive`) y `RelatedService.forget` las elimina junto
+    con la entrada.
+
+    Atributos:
+        id_entry (int): Entrada de blog de origen.
+        rank (int): Posición del vecino (0 = el más similar).
+        id_related (int): Entrada de blog relacionada.
+        score (float): Similitud coseno entre ambas entradas.
+    """
+
+    __tablename__ = 'entry_related'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla
+    id_entry = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Entrada de origen
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)  # Posición del vecino
+    id_related = db.Column(db.Integer, nullable=False, index=True)  # Entrada relacionada
+    score = db.Column(db.Float, nullable=False)  # Similitud coseno
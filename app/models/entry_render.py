@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+
+class EntryRender(db.Model):
+    """
+    Modelo que representa el HTML renderizado del contenido markdown de una entrada.
+
+    Las filas se indexan por el hash del contenido sin renderizar, por lo que un mismo
+    contenido se renderiza una sola vez aunque lo compartan varias entradas. El render se
+    genera al escribir la entrada (`RenderService`), no al leerla.
+
+    Atributos:
+        content_hash (str): Hash SHA-256 del contenido markdown (clave primaria).
+        renderer_version (int): Versión del renderizador que generó el HTML.
+        html (str): HTML renderizado.
+        created_at (datetime): Fecha del render.
+    """
+
+    __tablename__ = 'entry_renders'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla
+    content_hash = db.Column(db.String(64), primary_key=True)  # Hash del contenido sin renderizar
+    renderer_version = db.Column(db.Integer, nullable=False)  # Versión del renderizador
+    html = db.Column(db.Text, nullable=False)  # HTML renderizado
+    created_at = db.Column(db.DateTime, default=datetime.now)  # Fecha del render
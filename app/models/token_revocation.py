@@ -0,0 +1,31 @@
+from datetime import datetime
+from app import db
+
+
+class TokenRevocation(db.Model):
+    """
+    Modelo que representa una revocación de tokens JWT.
+
+    Una fila revoca un token concreto (por su `jti`) o todos los tokens de un usuario
+    emitidos antes de un instante (`revoked_before`), por ejemplo al eliminar la cuenta o
+    cambiar la contraseña. Cada proceso sincroniza la tabla en memoria de forma incremental
+    (por `id`), así que verificar un token no requiere consultas por petición.
+
+    Atributos:
+        id (int): Identificador incremental de la revocación (clave primaria).
+        jti (str): Identificador único del token revocado.
+        id_user (int): Usuario cuyos tokens se revocan.
+        revoked_before (int): Timestamp (epoch, en milisegundos) antes del cual los tokens del usuario no son válidos.
+        expires_at (int): Timestamp (epoch) a partir del cual la revocación ya no es necesaria.
+        created_at (datetime): Fecha de la revocación.
+    """
+
+    __tablename__ = 'token_revocations'  # Especifica el nombre de la tabla en la base de datos
+
+    # Definición de columnas de la tabla
+    id = db.Column(db.Integer, primary_key=True)  # Clave primaria, usada para la sincronización incremental
+    jti = db.Column(db.String(36), index=True)  # Token revocado
+    id_user = db.Column(db.Integer, index=True)  # Usuario cuyos tokens se revocan
+    revoked_before = db.Column(db.BigInteger)  # Tokens emitidos antes de este instante (ms) no son válidos
+    expires_at = db.Column(db.Integer, nullable=False)  # Momento en que los tokens afectados ya caducaron
+    created_at = db.Column(db.DateTime, default=datetime.now)  # Fecha de la revocación
@@ -17,6 +17,9 @@ class User(db.Model):
         bio (str): Biografía del usuario.
         profile_pic (blob): Foto de perfil del usuario.
         member_since (date): Fecha en que el usuario se unió al sistema.
+        entry_count (int): Número de entradas publicadas, mantenido por `EntryService`.
+        follower_count (int): Número de seguidores del usuario.
+        following_count (int): Número de usuarios que sigue.
     """
 
     __tablename__ = 'users'  # Especifica el nombre de la tabla en la base de datos
@@ -31,6 +34,11 @@ class User(db.Model):
     profile_pic = db.Column(db.String(300))  # Foto de perfil del usuario
     member_since = db.Column(db.DateTime, default=datetime.now())  # Fecha en que el usuario se unió al sistema
 
+    # Contadores desnormalizados para el perfil, actualizados de forma atómica en cada escritura
+    entry_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Entradas publicadas
+    follower_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Seguidores
+    following_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Usuarios seguidos
+
     # Relación con el modelo entry (para habilitar eliminación en cascada)
     entries = db.relationship('Entry', backref='user', cascade='all, delete-orphan') #Configuración para eliminación en cascada
 
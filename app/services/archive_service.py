@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, insert, delete, func, literal
+from app import db
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.models.entry_fingerprint_band import EntryFingerprintBand
+from app.utils.cache import cache
+from app.utils.purge import purger
+from app.utils import transaction
+
+# Columnas copiadas de `entries` a `entries_archive`
+ARCHIVED_COLUMNS = [column.name for column in Entry.__table__.columns]
+
+
+class ArchiveService:
+    @staticmethod
+    def archive(older_than_days=None, batch_size=None, progress=None):
+        """
+        Mover a `entries_archive` las entradas creadas hace más de `older_than_days` días.
+
+        Cada lote de `batch_size` entradas (las más antiguas primero) se copia con un
+        `INSERT ... SELECT`, se elimina de `entries` y se confirma con un commit propio, de
+        modo que ninguna transacción bloquea la tabla por mucho tiempo. Los contadores de
+        autor y categoría no cambian: las entradas archivadas siguen existiendo.
+
+        Args:
+            older_than_days (int, opcional): Antigüedad mínima (por defecto ARCHIVE_AFTER_DAYS).
+            batch_size (int, opcional): Entradas por lote (por defecto ARCHIVE_BATCH_SIZE).
+            progress (callable, opcional): Función llamada con el total archivado tras cada lote.
+
+        Returns:
+            int: Número de entradas archivadas.
+        """
+        if older_than_days is None:
+            older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+        if batch_size is None:
+            batch_size = current_app.config['ARCHIVE_BATCH_SIZE']
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+
+        count = 0
+        while True:
+            ids = db.session.scalars(
+                select(Entry.id_entry).where(Entry.created_at < cutoff).order_by(Entry.id_entry).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            columns = [Entry.__table__.c[name] for name in ARCHIVED_COLUMNS]
+            db.session.execute(
+                insert(EntryArchive.__table__).from_select(
+                    ARCHIVED_COLUMNS + ['archived_at'],
+                    select(*columns, literal(datetime.now())).where(Entry.id_entry.in_(ids)),
+                )
+            )
+            # Las filas de `entry_related` se conservan: `RelatedService.get_related` busca las
+            # vecinas archivadas en `entries_archive`
+            # Las entradas archivadas no participan en la detección de casi duplicados
+            db.session.execute(delete(EntryFingerprintBand).where(EntryFingerprintBand.id_entry.in_(ids)))
+            db.session.execute(delete(Entry).where(Entry.id_entry.in_(ids)).execution_options(synchronize_session=False))
+            transaction.commit()
+            # El lote ya está confirmado: invalidar ahora los listados y el límite del archivo
+            # (las lecturas entre lotes no deben saltarse las entradas recién archivadas)
+            cache.bump('entries')
+            purger.purge('entries:list')
+
+            count += len(ids)
+            if progress:
+                progress(count)
+        return count
+
+    @staticmethod
+    def boundary():
+        """
+        Obtener el mayor ID archivado, a través de la caché compartida.
+
+        Las páginas del listado solo consultan el archivo cuando llegan a este ID.
+
+        Returns:
+            int: Mayor ID de `entries_archive` (0 si está vacía).
+        """
+        return cache.get_or_set(
+            'entries:archive_boundary',
+            lambda: db.session.scalar(select(func.max(EntryArchive.id_entry))) or 0,
+            namespace='entries',
+        )
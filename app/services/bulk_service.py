@@ -0,0 +1,142 @@
+import csv
+import json
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import select, insert, update, func, Integer, DateTime, Date
+from app import db, bcrypt
+from app.models.user import User
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.services.category_service import CategoryService
+from app.utils.cache import cache
+from app.utils.purge import purger
+from app.utils import transaction
+
+# Tablas que se pueden exportar/importar en bloque
+TABLES = {
+    'users': User.__table__,
+    'entries': Entry.__table__,
+}
+
+
+class BulkService:
+    @staticmethod
+    def export_rows(table_name, stream, fmt='jsonl', chunk_size=1000):
+        """
+        Exportar todas las filas de una tabla a un archivo JSONL o CSV.
+
+        Las filas se leen con un cursor del lado del servidor (`stream_results`) en bloques
+        de `chunk_size`, por lo que la memoria usada no depende del tamaño de la tabla.
+
+        Args:
+            table_name (str): 'users' o 'entries'.
+            stream (file): Archivo de texto de salida.
+            fmt (str): 'jsonl' o 'csv'.
+            chunk_size (int): Filas leídas del cursor en cada bloque.
+
+        Returns:
+            int: Número de filas exportadas.
+        """
+        table = TABLES[table_name]
+        columns = [column.name for column in table.columns]
+        query = select(table).order_by(*table.primary_key.columns)
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+
+        if fmt == 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(columns)
+            write = lambda row: writer.writerow(['' if value is None else BulkService._to_text(value) for value in row])
+        else:
+            write = lambda row: stream.write(json.dumps(dict(zip(columns, row)), default=BulkService._to_text) + '\n')
+
+        count = 0
+        for row in result:
+            write(row)
+            count += 1
+        result.close()
+        return count
+
+    @staticmethod
+    def import_rows(table_name, stream, fmt='jsonl', chunk_size=1000, prehashed=False, progress=None):
+        """
+        Importar filas JSONL o CSV a una tabla con INSERTs en bloque.
+
+        Cada bloque de `chunk_size` filas se inserta con un único executemany (que el driver
+        convierte en un INSERT multi-fila) y se confirma con un solo commit.
+
+        Args:
+            table_name (str): 'users' o 'entries'.
+            stream (file): Archivo de texto de entrada.
+            fmt (str): 'jsonl' o 'csv'.
+            chunk_size (int): Filas por INSERT/commit.
+            prehashed (bool): Si las contraseñas de los usuarios ya vienen hasheadas con bcrypt.
+            progress (callable, opcional): Función llamada con (filas, segundos) después de cada bloque.
+
+        Returns:
+            tuple: (filas importadas, segundos transcurridos).
+        """
+        table = TABLES[table_name]
+        if fmt == 'csv':
+            rows = csv.DictReader(stream)
+        else:
+            rows = (json.loads(line) for line in stream if line.strip())
+
+        count = 0
+        start = time.perf_counter()
+        while True:
+            chunk = [BulkService._coerce(table, row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                break
+            if table_name == 'users' and not prehashed:
+                for row in chunk:
+                    row['password'] = bcrypt.generate_password_hash(row['password']).decode('utf-8')
+
+            db.session.execute(insert(table), chunk)
+            transaction.commit()
+
+            count += len(chunk)
+            if progress:
+                progress(count, time.perf_counter() - start)
+
+        if table_name == 'entries':
+            BulkService.recount_entries()
+            CategoryService.recount()
+        cache.bump(table_name)
+        purger.purge(f'{table_name}:list')
+        return count, time.perf_counter() - start
+
+    @staticmethod
+    def recount_entries():
+        """Recalcular `users.entry_count` después de insertar entradas sin pasar por `EntryService`."""
+        # Las entradas archivadas también cuentan
+        entry_count = (
+            select(func.count(Entry.id_entry)).where(Entry.id_user == User.id_user).scalar_subquery()
+            + select(func.count(EntryArchive.id_entry)).where(EntryArchive.id_user == User.id_user).scalar_subquery()
+        )
+        db.session.execute(update(User).values(entry_count=entry_count))
+        transaction.commit()
+
+    @staticmethod
+    def _coerce(table, row):
+        """Convertir los valores de texto de una fila al tipo de cada columna de la tabla."""
+        values = {}
+        for column in table.columns:
+            if column.name not in row:
+                continue
+            value = row[column.name]
+            if value == '' and column.nullable:
+                value = None
+            elif isinstance(value, str) and isinstance(column.type, Integer):
+                value = int(value)
+            elif isinstance(value, str) and isinstance(column.type, (DateTime, Date)):
+                value = datetime.fromisoformat(value)
+            values[column.name] = value
+        return values
+
+    @staticmethod
+    def _to_text(value):
+        """Serializar valores no JSON (fechas) como texto."""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
@@ -0,0 +1,142 @@
+import threading
+from collections import Counter
+from sqlalchemy import select, update, func, case
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.category import Category
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.utils.cache import cache
+from app.utils import transaction
+
+# IDs de categoría ya conocidos por el proceso (nombre -> id_category); nunca cambian
+_category_ids = {}
+_category_ids_lock = threading.Lock()
+
+
+class CategoryService:
+    @staticmethod
+    def resolve_ids(names):
+        """
+        Obtener el ID de cada categoría, creando las que aún no existen.
+
+        Los IDs se recuerdan en memoria del proceso, por lo que solo las categorías nuevas
+        (o aún no vistas por el proceso) requieren una consulta.
+
+        Args:
+            names (Iterable[str]): Nombres de categoría.
+
+        Returns:
+            dict: Nombre -> id_category.
+        """
+        names = set(names)
+        ids = {name: _category_ids[name] for name in names if name in _category_ids}
+        missing = names - ids.keys()
+        if missing:
+            found = dict(db.session.execute(
+                select(Category.name, Category.id_category).where(Category.name.in_(missing))
+            ).tuples().all())
+            # Solo se recuerdan las categorías ya confirmadas: una creada en esta transacción
+            # podría desaparecer con un rollback
+            with _category_ids_lock:
+                _category_ids.update(found)
+            ids.update(found)
+            for name in missing - found.keys():
+                ids[name] = CategoryService._create(name)
+        return ids
+
+    @staticmethod
+    def _create(name):
+        # Otra petición puede haber creado la misma categoría al mismo tiempo
+        try:
+            with transaction.savepoint():
+                category = Category(name=name, entry_count=0)
+                db.session.add(category)
+            return category.id_category
+        except IntegrityError:
+            return db.session.scalar(select(Category.id_category).where(Category.name == name))
+
+    @staticmethod
+    def adjust_counts(deltas):
+        """
+        Incrementar o decrementar de forma atómica el número de entradas de varias categorías.
+
+        Se ejecuta un único `UPDATE ... SET entry_count = entry_count + CASE ...` en la
+        transacción actual, que se confirma junto con la escritura que lo originó.
+
+        Args:
+            deltas (dict): id_category -> diferencia de entradas.
+        """
+        deltas = {id_category: delta for id_category, delta in deltas.items() if id_category is not None and delta}
+        if not deltas:
+            return
+        db.session.execute(
+            update(Category)
+            .where(Category.id_category.in_(deltas))
+            .values(entry_count=Category.entry_count + case(deltas, value=Category.id_category, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def release_user_entries(id_user):
+        """
+        Descontar de sus categorías las entradas de un usuario que se va a eliminar.
+
+        Args:
+            id_user (int): ID del usuario.
+        """
+        deltas = Counter()
+        for model in (Entry, EntryArchive):
+            counts = db.session.execute(
+                select(model.id_category, func.count()).where(model.id_user == id_user).group_by(model.id_category)
+            ).tuples()
+            deltas.update({id_category: -count for id_category, count in counts})
+        CategoryService.adjust_counts(deltas)
+
+    @staticmethod
+    def list_facets():
+        """
+        Obtener las categorías con su número de entradas, a través de la caché compartida.
+
+        Los números se leen de la columna `entry_count`, por lo que el costo depende solo del
+        número de categorías.
+
+        Returns:
+            List[dict]: Categorías con entradas, de mayor a menor número de entradas.
+        """
+        return cache.get_or_set('categories:facets', CategoryService._load_facets, namespace='entries')
+
+    @staticmethod
+    def _load_facets():
+        rows = db.session.execute(
+            select(Category.id_category, Category.name, Category.entry_count)
+            .where(Category.entry_count > 0)
+            .order_by(Category.entry_count.desc(), Category.name)
+        )
+        return [{'id_category': row.id_category, 'name': row.name, 'entry_count': row.entry_count} for row in rows]
+
+    @staticmethod
+    def recount():
+        """
+        Asignar la categoría a las entradas sin `id_category` y recalcular los contadores.
+
+        Se usa después de insertar entradas sin pasar por `EntryService` (importación en bloque).
+        """
+        names = db.session.scalars(
+            select(Entry.category).where(Entry.id_category.is_(None)).distinct()
+        ).all()
+        if names:
+            CategoryService.resolve_ids(names)
+            category_id = select(Category.id_category).where(Category.name == Entry.category).scalar_subquery()
+            db.session.execute(
+                update(Entry).where(Entry.id_category.is_(None)).values(id_category=category_id)
+                .execution_options(synchronize_session=False)
+            )
+
+        # Las entradas archivadas también cuentan
+        entry_count = (
+            select(func.count(Entry.id_entry)).where(Entry.id_category == Category.id_category).scalar_subquery()
+            + select(func.count(EntryArchive.id_entry)).where(EntryArchive.id_category == Category.id_category).scalar_subquery()
+        )
+        db.session.execute(update(Category).values(entry_count=entry_count).execution_options(synchronize_session=False))
+        transaction.commit()
@@ -0,0 +1,172 @@
+from flask import current_app
+from sqlalchemy import select, delete, insert, and_, or_
+from app import db
+from app.models.entry import Entry
+from app.models.entry_fingerprint_band import EntryFingerprintBand
+from app.utils import minhash
+from app.utils import transaction
+
+
+class DuplicateService:
+    @staticmethod
+    def shingles(entry):
+        """
+        Obtener los shingles del título, la descripción y el contenido de una entrada.
+
+        Args:
+            entry (Entry): La entrada de blog.
+
+        Returns:
+            set: Shingles de la entrada.
+        """
+        return minhash.shingles(f"{entry.title or ''} {entry.description or ''} {entry.content or ''}")
+
+    @staticmethod
+    def band_values(items):
+        """
+        Calcular los valores de las bandas LSH de un conjunto de shingles.
+
+        Returns:
+            List[int]: Valor de cada banda (vacía si no hay shingles).
+        """
+        count, rows = current_app.config['DUPLICATE_BANDS'], current_app.config['DUPLICATE_BAND_ROWS']
+        values = minhash.signature(items, count * rows)
+        return minhash.bands(values, count, rows) if values else []
+
+    @staticmethod
+    def index(entries):
+        """
+        Guardar (o reemplazar) las bandas de varias entradas y buscar sus casi duplicados.
+
+        Se llama en la misma transacción que crea o modifica las entradas, después del flush
+        (las entradas ya tienen ID).
+
+        Args:
+            entries (List[Entry]): Entradas a indexar.
+
+        Returns:
+            dict: ID de cada entrada -> List[tuple] de (id_entry, similitud) de sus casi duplicados.
+        """
+        if not current_app.config['DUPLICATE_DETECTION_ENABLED'] or not entries:
+            return {}
+
+        shingles = {entry.id_entry: DuplicateService.shingles(entry) for entry in entries}
+        bands = {id_entry: DuplicateService.band_values(items) for id_entry, items in shingles.items()}
+        # Buscar antes de insertar: las entradas del mismo lote no se reportan entre sí
+        candidates = {
+            id_entry: DuplicateService.find_candidates(shingles[id_entry], bands[id_entry], exclude_id=id_entry)
+            for id_entry in shingles
+        }
+
+        DuplicateService._replace_bands(bands)
+        return candidates
+
+    @staticmethod
+    def find_candidates(items, band_values, exclude_id=None):
+        """
+        Buscar las entradas casi iguales a un texto.
+
+        Los candidatos salen de una consulta por la clave primaria de las bandas; luego se
+        calcula la similitud de Jaccard exacta solo con ellos y se descartan los que no llegan
+        a `DUPLICATE_MIN_SIMILARITY`.
+
+        Args:
+            items (set): Shingles del texto.
+            band_values (List[int]): Valores de sus bandas.
+            exclude_id (int, opcional): Entrada a excluir (la propia).
+
+        Returns:
+            List[tuple]: (id_entry, similitud) de los casi duplicados, del más parecido al menos.
+        """
+        if not band_values:
+            # Texto sin palabras: no hay con qué comparar
+            return []
+        query = select(EntryFingerprintBand.id_entry).distinct().where(
+            or_(*(and_(EntryFingerprintBand.band == band, EntryFingerprintBand.value == value)
+                  for band, value in enumerate(band_values)))
+        )
+        if exclude_id is not None:
+            query = query.where(EntryFingerprintBand.id_entry != exclude_id)
+        ids = db.session.scalars(query).all()
+        if not ids:
+            return []
+
+        min_similarity = current_app.config['DUPLICATE_MIN_SIMILARITY']
+        rows = db.session.execute(
+            select(Entry.id_entry, Entry.title, Entry.description, Entry.content).where(Entry.id_entry.in_(ids))
+        )
+        candidates = []
+        for row in rows:
+            similarity = minhash.jaccard(items, DuplicateService.shingles(row))
+            if similarity >= min_similarity:
+                candidates.append((row.id_entry, round(similarity, 3)))
+        return sorted(candidates, key=lambda item: (-item[1], item[0]))
+
+    @staticmethod
+    def get_duplicates(id_entry):
+        """
+        Obtener las entradas casi duplicadas de una entrada.
+
+        Args:
+            id_entry (int): ID de la entrada de blog.
+
+        Returns:
+            List[tuple]: (Entry, similitud) de sus casi duplicados, o None si la entrada no existe.
+        """
+        entry = db.session.get(Entry, id_entry)
+        if entry is None:
+            return None
+        # Las bandas se calculan de nuevo: la entrada puede no estar indexada todavía
+        items = DuplicateService.shingles(entry)
+        candidates = dict(DuplicateService.find_candidates(items, DuplicateService.band_values(items), exclude_id=entry.id_entry))
+        if not candidates:
+            return []
+        entries = db.session.scalars(select(Entry).where(Entry.id_entry.in_(candidates))).all()
+        return sorted(((duplicate, candidates[duplicate.id_entry]) for duplicate in entries),
+                      key=lambda item: (-item[1], item[0].id_entry))
+
+    @staticmethod
+    def fingerprint_all(batch_size=500, rebuild=False, progress=None):
+        """
+        Calcular las bandas de las entradas existentes, por lotes con un commit por lote.
+
+        Args:
+            batch_size (int): Entradas por lote.
+            rebuild (bool): Recalcular también las entradas ya indexadas (por ejemplo, después
+                de cambiar `DUPLICATE_BANDS` o `DUPLICATE_BAND_ROWS`).
+            progress (callable, opcional): Función llamada con el total de entradas procesadas.
+
+        Returns:
+            int: Número de entradas procesadas.
+        """
+        indexed = select(EntryFingerprintBand.id_entry).where(EntryFingerprintBand.id_entry == Entry.id_entry)
+        count, last_id = 0, 0
+        while True:
+            query = select(Entry).where(Entry.id_entry > last_id).order_by(Entry.id_entry).limit(batch_size)
+            if not rebuild:
+                query = query.where(~indexed.exists())
+            entries = db.session.scalars(query).all()
+            if not entries:
+                break
+
+            DuplicateService._replace_bands({
+                entry.id_entry: DuplicateService.band_values(DuplicateService.shingles(entry)) for entry in entries
+            })
+            last_id = entries[-1].id_entry
+            transaction.commit()
+
+            count += len(entries)
+            if progress:
+                progress(count)
+        return count
+
+    @staticmethod
+    def _replace_bands(bands):
+        db.session.execute(delete(EntryFingerprintBand).where(EntryFingerprintBand.id_entry.in_(list(bands))))
+        rows = [
+            {'band': band, 'value': value, 'id_entry': id_entry}
+            for id_entry, values in bands.items()
+            for band, value in enumerate(values)
+        ]
+        if rows:
+            db.session.execute(insert(EntryFingerprintBand), rows)
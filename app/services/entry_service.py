@@ -1,6 +1,23 @@
+from collections import Counter
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
 from app import db, bcrypt
 from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
 from app.models.user import User
+from app.services.user_service import UserService
+from app.services.related_service import RelatedService
+from app.services.render_service import RenderService
+from app.services.category_service import CategoryService
+from app.services.archive_service import ArchiveService
+from app.services.duplicate_service import DuplicateService
+from app.utils.pubsub import broker
+from app.utils import background
+from app.utils.cache import cache
+from app.utils.purge import purger
+from app.utils.hot_set import hot_set, EntrySummary
+from app.utils import transaction
 
 class EntryService:
     @staticmethod
@@ -19,7 +36,7 @@ class EntryService:
             id_user (int): ID del usuario asociado
         
         Returns:
-            Entry: La entrada de blog creada.
+            Entry: La entrada de blog creada, con `possible_duplicates` (entradas casi duplicadas).
         
         Raises:
             ValueError: Si el usuario asociado no es encontrado.
@@ -30,16 +47,149 @@ class EntryService:
             # Si no se encuentra el usuario, lanzar una excepción
             raise ValueError('User not found')
         
-        # Crear un nuevo objeto Entry con el usuario asociado
+        # Crear un nuevo objeto Entry con el usuario asociado y el contenido ya renderizado
         entry_data = {**data, 'id_user': id_user}
         entry = Entry(**entry_data)
+        entry.content_hash = RenderService.ensure_rendered([entry.content])[0]
+        entry.id_category = CategoryService.resolve_ids([entry.category])[entry.category]
         
-        # Añadir la nueva entrada a la base de datos
+        # Añadir la nueva entrada a la base de datos y actualizar los contadores del autor y la categoría
         db.session.add(entry)
-        db.session.commit()
+        UserService.adjust_counters(id_user, entry_count=1)
+        CategoryService.adjust_counts({entry.id_category: 1})
+        db.session.flush()
+
+        # Indexar la firma del contenido y avisar de las entradas casi duplicadas
+        duplicates = DuplicateService.index([entry]).get(entry.id_entry, [])
+        entry.possible_duplicates = [{'id_entry': id_entry, 'similarity': similarity} for id_entry, similarity in duplicates]
+
+        transaction.commit()
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, 'entries:list', f'user:{id_user}')
+        transaction.after_commit(hot_set.add, [EntryService.summarize(entry, user.name)])
+
+        # Notificar a los clientes conectados al stream de eventos
+        EntryService.publish_created(entry)
+
+        # Calcular en segundo plano las entradas relacionadas de la nueva entrada
+        EntryService.schedule_related([entry.id_entry])
         
         return entry  # Retornar la entrada recién creada
     
+    @staticmethod
+    def create_entries(items, id_user):
+        """
+        Crear varias entradas de blog de un mismo usuario en una sola transacción.
+        
+        Se verifica el usuario una sola vez, las filas se insertan con una sola sentencia
+        (executemany con RETURNING; en MySQL, fila a fila en el mismo flush) y todo se confirma
+        en la misma transacción.
+        
+        Args:
+            items (List[dict]): Datos ya validados de cada entrada.
+            id_user (int): ID del usuario asociado
+        
+        Returns:
+            List[int]: IDs de las entradas creadas, en el mismo orden que `items`.
+        
+        Raises:
+            ValueError: Si el usuario asociado no es encontrado.
+        """
+        user = User.query.filter_by(id_user=id_user).first()
+        if not user:
+            raise ValueError('User not found')
+
+        if not items:
+            return []
+        # Renderizar el contenido del bloque (los contenidos repetidos se renderizan una vez)
+        hashes = RenderService.ensure_rendered([item.get('content') for item in items])
+        category_ids = CategoryService.resolve_ids(item.get('category') for item in items)
+        rows = [
+            {**item, 'id_user': id_user, 'content_hash': hash_, 'id_category': category_ids[item.get('category')]}
+            for item, hash_ in zip(items, hashes)
+        ]
+
+        if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+            # INSERT multi-fila con RETURNING: obtenemos los IDs en el orden de los parámetros
+            entries = db.session.scalars(
+                insert(Entry).returning(Entry, sort_by_parameter_order=True), rows
+            ).all()
+        else:
+            entries = EntryService._insert_without_returning(rows)
+        UserService.adjust_counters(id_user, entry_count=len(entries))
+        CategoryService.adjust_counts(Counter(row['id_category'] for row in rows))
+        DuplicateService.index(entries)
+
+        # Capturar los datos antes del commit, que expira los objetos y forzaría un SELECT por entrada
+        ids = [entry.id_entry for entry in entries]
+        events = [EntryService.entry_event(entry) for entry in entries]
+        summaries = [EntryService.summarize(entry, user.name) for entry in entries]
+        transaction.commit()
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, 'entries:list', f'user:{id_user}')
+        transaction.after_commit(hot_set.add, summaries)
+
+        for event in events:
+            transaction.after_commit(broker.publish, 'entry.created', event)
+        EntryService.schedule_related(ids)
+        return ids
+
+    @staticmethod
+    def _insert_without_returning(rows):
+        # Sin RETURNING (MySQL): el flush inserta fila a fila y toma el ID de cada una de su
+        # `lastrowid`, así que no depende de que los IDs de un INSERT multi-fila sean
+        # consecutivos (innodb_autoinc_lock_mode=2) ni del nivel de aislamiento
+        entries = [Entry(**row) for row in rows]
+        db.session.add_all(entries)
+        db.session.flush()
+        return entries
+
+    @staticmethod
+    def schedule_related(ids):
+        """
+        Programar el cálculo de las entradas relacionadas de entradas nuevas o editadas en
+        segundo plano, después del commit (la tarea usa su propia sesión y debe ver las entradas).
+        
+        Args:
+            ids (List[int]): IDs de las entradas nuevas o editadas.
+        """
+        if current_app.config['RELATED_ENABLED']:
+            transaction.after_commit(
+                background.submit, current_app._get_current_object(), RelatedService.compute_for_entries, ids
+            )
+
+    @staticmethod
+    def publish_created(entry):
+        """
+        Publicar un evento ligero de nueva entrada en el broker del stream (SSE) después del commit.
+        
+        Args:
+            entry (Entry): La entrada recién creada.
+        """
+        # Los datos se capturan ahora: después del commit la entrada está expirada
+        transaction.after_commit(broker.publish, 'entry.created', EntryService.entry_event(entry))
+
+    @staticmethod
+    def entry_event(entry):
+        """
+        Construir los datos ligeros de una entrada que se envían en los eventos del stream.
+        
+        Args:
+            entry (Entry): La entrada de blog.
+        
+        Returns:
+            dict: Datos serializables a JSON del evento.
+        """
+        return {
+            'id_entry': entry.id_entry,
+            'title': entry.title,
+            'description': entry.description,
+            'category': entry.category,
+            'id_user': entry.id_user,
+            'author': entry.user.name,
+            'created_at': entry.created_at.isoformat() if entry.created_at else None,
+        }
+
     @staticmethod
     def get_all_entries():
         """
@@ -51,19 +201,147 @@ class EntryService:
         # Recuperar todos los registros de la tabla User
         return Entry.query.all()
 
+    @staticmethod
+    def list_entries():
+        """
+        Obtener todas las entradas de blog serializadas, a través de la caché compartida.
+        
+        La lista se guarda como diccionarios (no objetos ORM) para poder compartirla entre
+        procesos; se invalida en cada escritura de entradas o usuarios. Incluye las entradas
+        archivadas, igual que las páginas de `list_entries_page`.
+        
+        Returns:
+            List[dict]: Entradas con los campos de `entry_response_model`.
+        """
+        return cache.get_or_set('entries:list', EntryService._load_entries, namespace='entries')
+
+    @staticmethod
+    def list_entries_page(limit, cursor=None):
+        """
+        Obtener una página de entradas (de la más nueva a la más antigua) con paginación por cursor.
+
+        Las páginas se leen de `entries` y continúan en `entries_archive` cuando alcanzan los IDs
+        archivados, sin que el cliente note el límite entre ambas tablas.
+
+        Args:
+            limit (int): Entradas por página.
+            cursor (int, opcional): ID de la última entrada de la página anterior.
+
+        Returns:
+            tuple: (List[dict] con los campos de `entry_response_model`, cursor de la página
+            siguiente o None si no hay más entradas).
+        """
+        entries = EntryService._merged_page(limit, cursor)
+        next_cursor = entries[-1].id_entry if len(entries) == limit else None
+        return [EntryService.serialize(entry) for entry in entries], next_cursor
+
+    @staticmethod
+    def list_feed(limit, cursor=None):
+        """
+        Obtener una página del feed de resúmenes de entradas (de la más nueva a la más antigua).
+
+        La primera página y las cercanas se sirven desde el conjunto en memoria de las entradas
+        más nuevas (`hot_set`); las demás, desde la base de datos como `list_entries_page`.
+
+        Args:
+            limit (int): Entradas por página.
+            cursor (int, opcional): ID de la última entrada de la página anterior.
+
+        Returns:
+            tuple: (List[EntrySummary], cursor de la página siguiente o None si no hay más entradas).
+        """
+        summaries = hot_set.page(limit, cursor, EntryService._load_hot_set)
+        if summaries is None:
+            summaries = [EntryService.summarize(entry) for entry in EntryService._merged_page(limit, cursor)]
+        next_cursor = summaries[-1].id_entry if len(summaries) == limit else None
+        return summaries, next_cursor
+
+    @staticmethod
+    def _load_hot_set(capacity):
+        return [EntryService.summarize(entry) for entry in EntryService._merged_page(capacity, None)]
+
+    @staticmethod
+    def _merged_page(limit, cursor):
+        entries = EntryService._page(Entry, limit, cursor)
+        # Los IDs archivados son <= boundary: solo se consulta el archivo si la página llega ahí
+        boundary = ArchiveService.boundary()
+        if boundary and (len(entries) < limit or entries[-1].id_entry <= boundary):
+            archived = EntryService._page(EntryArchive, limit, cursor)
+            entries = sorted(entries + archived, key=lambda entry: entry.id_entry, reverse=True)[:limit]
+        return entries
+
+    @staticmethod
+    def _page(model, limit, cursor):
+        # Paginación por clave (keyset): usa la clave primaria, sin OFFSET
+        query = model.query.options(joinedload(model.user)).order_by(model.id_entry.desc())
+        if cursor is not None:
+            query = query.filter(model.id_entry < cursor)
+        return query.limit(limit).all()
+
+    @staticmethod
+    def _load_entries():
+        # Cargar el autor en la misma consulta para evitar una consulta por entrada
+        entries = Entry.query.options(joinedload(Entry.user)).all()
+        archived = EntryArchive.query.options(joinedload(EntryArchive.user)).all()
+        entries = sorted(entries + archived, key=lambda entry: entry.id_entry)
+        return [EntryService.serialize(entry) for entry in entries]
+
+    @staticmethod
+    def summarize(entry, author=None):
+        """
+        Construir el resumen compacto de una entrada que se guarda en el feed en memoria.
+
+        Args:
+            entry (Entry | EntryArchive): La entrada de blog.
+            author (str, opcional): Nombre del autor, si ya se conoce (evita cargar `entry.user`).
+
+        Returns:
+            EntrySummary: Resumen de la entrada.
+        """
+        return EntrySummary(
+            entry.id_entry, entry.title, entry.description, entry.cover_img, entry.category,
+            author if author is not None else entry.user.name, entry.created_at,
+        )
+
+    @staticmethod
+    def serialize(entry):
+        """
+        Convertir una entrada en un diccionario con los campos de `entry_response_model`.
+        
+        Args:
+            entry (Entry): La entrada de blog.
+        
+        Returns:
+            dict: Datos de la entrada; el autor queda en `user.name`.
+        """
+        return {
+            'id_entry': entry.id_entry,
+            'cover_img': entry.cover_img,
+            'title': entry.title,
+            'description': entry.description,
+            'content': entry.content,
+            'category': entry.category,
+            'source_file': entry.source_file,
+            'github_link': entry.github_link,
+            'created_at': entry.created_at,
+            'id_user': entry.id_user,
+            'user': {'name': entry.user.name},
+        }
+
     @staticmethod
     def get_entry_by_id(id_entry):
         """
-        Obtener una entrada de blog por su id.
+        Obtener una entrada de blog por su id, buscándola también entre las archivadas.
         
         Args:
             id (int): Id de entrada de blog a buscar.
         
         Returns:
-            Entry: La entrada de blog encontrada o None si no existe.
+            Entry | EntryArchive: La entrada de blog encontrada o None si no existe.
         """
-        # Filtrar entradas de blog por su id (id_entry)
-        return Entry.query.filter_by(id_entry=id_entry).first()
+        # Filtrar entradas de blog por su id (id_entry); si no está, puede estar archivada
+        return (Entry.query.filter_by(id_entry=id_entry).first()
+                or EntryArchive.query.filter_by(id_entry=id_entry).first())
 
     @staticmethod
     def update_entry(id_entry, new_data):
@@ -86,13 +364,35 @@ class EntryService:
             # Si no se encuentra la entrada, lanzar una excepción
             raise ValueError('Blog Entry not found')
         
+        previous_category = entry.id_category
+        previous_text = (entry.title, entry.description)
+
         # Actualiza los atributos del objeto de entrada
         for key, value in new_data.items():
             if hasattr(entry, key): #Verifica si el atributo existe en el objeto
                 setattr(entry, key, value)
 
+        # Renderizar el contenido nuevo (si no cambió, el render existente se reutiliza)
+        entry.content_hash = RenderService.ensure_rendered([entry.content])[0]
+
+        # Mover la entrada de categoría si cambió
+        entry.id_category = CategoryService.resolve_ids([entry.category])[entry.category]
+        if entry.id_category != previous_category:
+            CategoryService.adjust_counts({previous_category: -1, entry.id_category: 1})
+
+        # Recalcular la firma del contenido (las entradas archivadas no se indexan)
+        if isinstance(entry, Entry):
+            DuplicateService.index([entry])
+
         # Guardar los cambios en la base de datos
-        db.session.commit()
+        transaction.commit()
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, f'entry:{entry.id_entry}', 'entries:list', f'user:{entry.id_user}')
+        transaction.after_commit(hot_set.replace, EntryService.summarize(entry))
+
+        # Recalcular en segundo plano los vecinos si cambió el texto con que se comparan
+        if isinstance(entry, Entry) and (entry.title, entry.description) != previous_text:
+            EntryService.schedule_related([entry.id_entry])
         return entry
 
     @staticmethod
@@ -115,6 +415,12 @@ class EntryService:
             # Si no se encuentra la entrada, lanzar una excepción
             raise ValueError('Blog entry not found')
 
-        # Eliminar la entrada de la base de datos
+        # Eliminar la entrada de la base de datos y actualizar los contadores del autor y la categoría
         db.session.delete(entry)
-        db.session.commit()
+        RelatedService.forget([entry.id_entry])
+        UserService.adjust_counters(entry.id_user, entry_count=-1)
+        CategoryService.adjust_counts({entry.id_category: -1})
+        transaction.commit()
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, f'entry:{entry.id_entry}', 'entries:list', f'user:{entry.id_user}')
+        transaction.after_commit(hot_set.remove, entry.id_entry)
@@ -0,0 +1,384 @@
+import re
+import threading
+import time
+import zlib
+from flask import current_app
+from sqlalchemy import select, delete, insert, or_
+from app import db
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.models.entry_related import EntryRelated
+from app.utils import transaction
+from app.utils.purge import purger
+
+# Palabras de al menos dos caracteres (incluye acentos y dígitos)
+TOKEN_RE = re.compile(r'\w{2,}', re.UNICODE)
+
+# Palabras vacías (español e inglés): aparecen en casi todas las entradas, no aportan a la
+# similitud y harían densa la matriz de similitudes
+STOPWORDS = frozenset('''
+    al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante
+    el ella ellas ellos en entre era es esa ese eso esta este esto estos estas fue ha hay la
+    las le les lo los mas más me mi muy no nos o otra otro para pero por porque que qué se
+    sea ser si sí sin sobre son su sus también te tiene todo todos tu un una uno unos y ya yo
+    about after all also an and any are as at be been but by can do does for from had has
+    have how if in into is it its more most no not of on or our so than that the their them
+    then there these they this to up us was we were what when which who will with you your
+'''.split())
+
+# Índice TF-IDF en memoria del proceso, usado para calcular los vecinos de entradas nuevas
+_index = None
+_index_lock = threading.Lock()
+
+
+class RelatedIndex:
+    """
+    Matriz TF-IDF normalizada (una fila por entrada) y los pesos IDF con que se construyó.
+
+    Atributos:
+        ids (ndarray): ID de la entrada de cada fila.
+        matrix (csr_matrix): Vectores TF-IDF con norma L2 igual a 1.
+        idf (ndarray): Peso IDF de cada característica.
+        built_at (float): Momento (monotónico) de construcción del índice.
+    """
+
+    def __init__(self, ids, matrix, idf):
+        self.ids = ids
+        self.matrix = matrix
+        self.idf = idf
+        self.built_at = time.monotonic()
+        self.rows = {int(id_entry): row for row, id_entry in enumerate(ids)}
+
+
+class RelatedService:
+    @staticmethod
+    def tokenize(title, description, category):
+        """
+        Obtener los términos de una entrada de blog, sin palabras vacías.
+
+        La categoría no se agrega como término: todas las entradas de una categoría
+        compartirían una columna y el producto de similitudes sería casi denso.
+
+        Returns:
+            List[str]: Términos de la entrada.
+        """
+        text = f"{title or ''} {description or ''}".lower()
+        return [token for token in TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+    @staticmethod
+    def vectorize(rows, idf=None):
+        """
+        Construir la matriz TF-IDF normalizada de un lote de entradas.
+
+        Los términos se asignan a columnas con hashing (crc32), por lo que no es necesario
+        guardar un vocabulario. La frecuencia de término es sublineal (1 + log tf). Los
+        términos presentes en más de `RELATED_MAX_DF` de las entradas reciben peso cero.
+
+        Args:
+            rows (List[tuple]): Filas (id_entry, title, description, category).
+            idf (ndarray, opcional): Pesos IDF existentes; si no se reciben se calculan del lote.
+
+        Returns:
+            tuple: (matriz csr normalizada, pesos idf).
+        """
+        import numpy as np
+        from scipy import sparse
+
+        n_features = current_app.config['RELATED_FEATURES']
+        indptr, indices = [0], []
+        for _, title, description, category in rows:
+            tokens = RelatedService.tokenize(title, description, category)
+            indices.extend(zlib.crc32(token.encode('utf-8')) % n_features for token in tokens)
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(rows), n_features),
+        )
+        matrix.sum_duplicates()
+        matrix.data = 1 + np.log(matrix.data)
+
+        if idf is None:
+            # Frecuencia de documento: tras sum_duplicates cada (fila, columna) aparece una vez
+            df = np.bincount(matrix.indices, minlength=n_features)
+            idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+            idf[df > current_app.config['RELATED_MAX_DF'] * len(rows)] = 0
+
+        matrix = matrix.multiply(idf).tocsr()
+        matrix.eliminate_zeros()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(matrix).tocsr(), idf
+
+    @staticmethod
+    def load_rows(ids=None):
+        """Leer (id_entry, title, description, category) de las entradas, en orden de ID."""
+        query = select(Entry.id_entry, Entry.title, Entry.description, Entry.category).order_by(Entry.id_entry)
+        if ids is not None:
+            query = query.where(Entry.id_entry.in_(ids))
+        return [tuple(row) for row in db.session.execute(query.execution_options(yield_per=5000))]
+
+    @staticmethod
+    def build_index():
+        """
+        Construir el índice TF-IDF de todas las entradas y guardarlo como índice del proceso.
+
+        Returns:
+            RelatedIndex: El índice construido.
+        """
+        import numpy as np
+        global _index
+
+        rows = RelatedService.load_rows()
+        matrix, idf = RelatedService.vectorize(rows)
+        index = RelatedIndex(np.array([row[0] for row in rows], dtype=np.int64), matrix, idf)
+        with _index_lock:
+            _index = index
+        return index
+
+    @staticmethod
+    def get_index():
+        """Obtener el índice del proceso, reconstruyéndolo si no existe o si caducó."""
+        index = _index
+        if index is None or time.monotonic() - index.built_at > current_app.config['RELATED_INDEX_TTL']:
+            index = RelatedService.build_index()
+        return index
+
+    @staticmethod
+    def rebuild(batch_size=500, progress=None):
+        """
+        Recalcular los vecinos de todas las entradas (proceso offline).
+
+        La similitud se calcula por lotes de `batch_size` filas como productos de matrices
+        dispersas contra bloques de `RELATED_CHUNK_SIZE` entradas (ver `_store_neighbours`), y
+        los vecinos de cada lote se guardan con un commit por lote.
+
+        Args:
+            batch_size (int): Entradas procesadas por lote.
+            progress (callable, opcional): Función llamada con (procesadas, total) tras cada lote.
+
+        Returns:
+            int: Número de entradas procesadas.
+        """
+        index = RelatedService.build_index()
+        total = len(index.ids)
+        for start in range(0, total, batch_size):
+            batch = index.matrix[start:start + batch_size]
+            RelatedService._store_neighbours(index.ids[start:start + batch_size], batch, index)
+            if progress:
+                progress(min(start + batch_size, total), total)
+        return total
+
+    @staticmethod
+    def compute_for_entries(ids):
+        """
+        Calcular los vecinos de entradas nuevas o modificadas y actualizar el índice del proceso.
+
+        Se ejecuta en segundo plano después de crear o editar entradas (ver `EntryService`).
+        El vector de una entrada ya indexada se reemplaza por el de su texto actual. Además de
+        guardar el top-N de cada entrada, se agrega a las listas de las entradas con las que
+        tiene similitud, y se purgan del proxy las respuestas de las entradas afectadas (la
+        escritura que programó el cálculo ya purgó antes de que existieran los vecinos).
+
+        Args:
+            ids (List[int]): IDs de las entradas nuevas o modificadas.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        index = RelatedService.get_index()
+        rows = RelatedService.load_rows(ids)
+        if not rows:
+            return
+        # Las entradas usan los pesos IDF del índice existente
+        vectors, _ = RelatedService.vectorize(rows, idf=index.idf)
+        new_ids = [row[0] for row in rows]
+        with _index_lock:
+            # La matriz se reemplaza (no se modifica) porque otros cálculos pueden estar leyéndola
+            matrix = index.matrix
+            stale = [index.rows[id_entry] for id_entry in new_ids if id_entry in index.rows]
+            if stale:
+                # La fila anterior queda vacía: sin términos no es vecina de ninguna entrada
+                matrix = matrix.copy()
+                for row in stale:
+                    matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]] = 0
+                matrix.eliminate_zeros()
+            offset = len(index.ids)
+            index.matrix = sparse.vstack([matrix, vectors]).tocsr()
+            index.ids = np.concatenate([index.ids, np.array(new_ids, dtype=np.int64)])
+            index.rows.update({id_entry: offset + i for i, id_entry in enumerate(new_ids)})
+
+        changed = RelatedService._store_neighbours(np.array(new_ids, dtype=np.int64), vectors, index, reverse=True)
+        purger.purge(*(f'entry:{id_entry}' for id_entry in changed))
+
+    @staticmethod
+    def _store_neighbours(batch_ids, batch, index, reverse=False):
+        """
+        Calcular el top-N de un lote contra todo el índice y reemplazar sus filas en la tabla.
+
+        El producto se hace por bloques de columnas (entradas del índice), conservando solo el
+        top-N de cada fila entre bloques, de modo que la memoria usada depende del tamaño del
+        lote y del bloque, no del número total de entradas.
+
+        Con `reverse`, cada entrada del lote se agrega también a las listas de las entradas
+        con las que tiene similitud (ver `_merge_reverse`).
+
+        Returns:
+            Set[int]: IDs de las entradas cuyas listas de vecinos se escribieron.
+        """
+        import numpy as np
+
+        top_n = current_app.config['RELATED_TOP_N']
+        min_score = current_app.config['RELATED_MIN_SCORE']
+        chunk_size = current_app.config['RELATED_CHUNK_SIZE']
+        # Las entradas nuevas pueden reemplazar la matriz del índice mientras tanto
+        matrix, ids = index.matrix, index.ids
+
+        best = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in batch_ids]
+        # Similitudes (entrada del índice -> [(entrada del lote, score)]) para las listas inversas
+        incoming = {}
+        for chunk_start in range(0, len(ids), chunk_size):
+            similarities = batch.dot(matrix[chunk_start:chunk_start + chunk_size].T).tocsr()
+            chunk_ids = ids[chunk_start:chunk_start + chunk_size]
+            for row, id_entry in enumerate(batch_ids):
+                start, end = similarities.indptr[row], similarities.indptr[row + 1]
+                if start == end:
+                    continue
+                candidates = chunk_ids[similarities.indices[start:end]]
+                scores = similarities.data[start:end]
+                keep = (candidates != id_entry) & (scores >= min_score)
+                if reverse:
+                    for candidate, score in zip(candidates[keep], scores[keep]):
+                        incoming.setdefault(int(candidate), []).append((int(id_entry), float(score)))
+                candidates = np.concatenate([best[row][0], candidates[keep]])
+                scores = np.concatenate([best[row][1], scores[keep]])
+                if len(scores) > top_n:
+                    top = np.argpartition(-scores, top_n)[:top_n]
+                    candidates, scores = candidates[top], scores[top]
+                best[row] = (candidates, scores)
+
+        neighbours = []
+        for id_entry, (candidates, scores) in zip(batch_ids, best):
+            order = np.argsort(-scores, kind='stable')
+            neighbours.append((int(id_entry), candidates[order], scores[order]))
+
+        # El índice puede contener entradas ya eliminadas: solo se guardan las que existen
+        candidate_ids = {int(c) for _, candidates, _ in neighbours for c in candidates}
+        existing = set(db.session.scalars(
+            select(Entry.id_entry).where(Entry.id_entry.in_(candidate_ids))
+        )) if candidate_ids else set()
+
+        values = []
+        for id_entry, candidates, scores in neighbours:
+            ranked = [(int(c), float(s)) for c, s in zip(candidates, scores) if int(c) in existing]
+            values.extend({'id_entry': id_entry, 'rank': rank, 'id_related': id_related, 'score': score}
+                          for rank, (id_related, score) in enumerate(ranked))
+
+        written = {n[0] for n in neighbours}
+        db.session.execute(delete(EntryRelated).where(EntryRelated.id_entry.in_(written)))
+        if values:
+            db.session.execute(insert(EntryRelated), values)
+        if reverse:
+            written |= RelatedService._merge_reverse(written, incoming, top_n)
+        transaction.commit()
+        return written
+
+    @staticmethod
+    def _merge_reverse(batch_ids, incoming, top_n):
+        """
+        Agregar las entradas del lote a las listas de vecinos de otras entradas.
+
+        Solo se reescriben las listas en las que alguna entrada del lote entra en el top-N, y
+        las que ya contenían alguna (su score anterior dejó de ser válido si la entrada cambió).
+
+        Args:
+            batch_ids (Set[int]): IDs de las entradas recién calculadas.
+            incoming (dict): Entrada del índice -> [(entrada del lote, score)].
+            top_n (int): Vecinos guardados por entrada.
+
+        Returns:
+            Set[int]: IDs de las entradas cuyas listas se reescribieron.
+        """
+        referencing = set(db.session.scalars(
+            select(EntryRelated.id_entry).where(EntryRelated.id_related.in_(batch_ids))
+        ))
+        targets = (set(incoming) | referencing) - batch_ids
+        if not targets:
+            return set()
+
+        current = {}
+        for id_entry, id_related, score in db.session.execute(
+            select(EntryRelated.id_entry, EntryRelated.id_related, EntryRelated.score)
+            .where(EntryRelated.id_entry.in_(targets))
+            .order_by(EntryRelated.id_entry, EntryRelated.rank)
+        ):
+            current.setdefault(id_entry, []).append((id_related, score))
+
+        # Solo las entradas que existen (el índice puede contener entradas eliminadas)
+        existing = set(db.session.scalars(select(Entry.id_entry).where(Entry.id_entry.in_(targets))))
+
+        rewritten, values = set(), []
+        for id_entry in targets & existing:
+            ranked = current.get(id_entry, [])
+            offers = incoming.get(id_entry, [])
+            # Una entrada del lote solo cambia la lista si ya estaba o si supera al último vecino
+            if id_entry not in referencing and len(ranked) >= top_n and all(score <= ranked[-1][1] for _, score in offers):
+                continue
+            merged = [pair for pair in ranked if pair[0] not in batch_ids] + offers
+            merged.sort(key=lambda pair: -pair[1])
+            rewritten.add(id_entry)
+            values.extend({'id_entry': id_entry, 'rank': rank, 'id_related': id_related, 'score': score}
+                          for rank, (id_related, score) in enumerate(merged[:top_n]))
+
+        if rewritten:
+            db.session.execute(delete(EntryRelated).where(EntryRelated.id_entry.in_(rewritten)))
+            if values:
+                db.session.execute(insert(EntryRelated), values)
+        return rewritten
+
+    @staticmethod
+    def get_related(id_entry):
+        """
+        Obtener las entradas relacionadas precalculadas de una entrada.
+
+        Las filas se conservan al archivar (ver `ArchiveService.archive`): tanto la entrada de
+        origen como sus vecinas pueden estar en `entries_archive`, y las vecinas archivadas se
+        buscan allí. Las filas que apuntan a entradas ya eliminadas se omiten.
+
+        Args:
+            id_entry (int): ID de la entrada de blog.
+
+        Returns:
+            List[tuple]: Pares (Entry | EntryArchive, score) ordenados por similitud.
+        """
+        rows = db.session.execute(
+            select(EntryRelated.id_related, EntryRelated.score)
+            .where(EntryRelated.id_entry == id_entry)
+            .order_by(EntryRelated.rank)
+        ).all()
+        if not rows:
+            return []
+        ids = [row.id_related for row in rows]
+        entries = {entry.id_entry: entry for entry in Entry.query.filter(Entry.id_entry.in_(ids))}
+        missing = set(ids) - set(entries)
+        if missing:
+            # Solo se consulta el archivo si alguna vecina no está entre las entradas activas
+            entries.update((entry.id_entry, entry) for entry in EntryArchive.query.filter(EntryArchive.id_entry.in_(missing)))
+        return [(entries[row.id_related], row.score) for row in rows if row.id_related in entries]
+
+    @staticmethod
+    def forget(ids):
+        """
+        Eliminar las filas de vecinos de las entradas indicadas, en ambos sentidos.
+
+        Sustituye al `ON DELETE CASCADE`: `entry_related` no tiene claves foráneas a `entries`
+        para conservar las filas de las entradas archivadas. Se llama al eliminar entradas, en
+        la misma transacción.
+
+        Args:
+            ids (Iterable[int] | Select): IDs de las entradas eliminadas.
+        """
+        db.session.execute(
+            delete(EntryRelated).where(or_(EntryRelated.id_entry.in_(ids), EntryRelated.id_related.in_(ids)))
+        )
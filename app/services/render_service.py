@@ -0,0 +1,152 @@
+from sqlalchemy import select, update, delete, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.models.entry_render import EntryRender
+from app.utils.markdown_renderer import RENDERER_VERSION, content_hash, render
+from app.utils import transaction
+
+
+class RenderService:
+    @staticmethod
+    def ensure_rendered(contents):
+        """
+        Renderizar los contenidos que aún no tienen un HTML vigente guardado.
+
+        Los contenidos se identifican por su hash: un contenido ya renderizado con la versión
+        actual del renderizador no se vuelve a renderizar, aunque pertenezca a otra entrada.
+        Las filas se agregan a la unidad de trabajo de quien llama.
+
+        Args:
+            contents (List[str]): Contenidos markdown.
+
+        Returns:
+            List[str]: Hash de cada contenido, en el mismo orden.
+        """
+        hashes = [content_hash(content) for content in contents]
+        pending = dict(zip(hashes, contents))
+        existing = {
+            render_row.content_hash: render_row
+            for render_row in db.session.scalars(select(EntryRender).where(EntryRender.content_hash.in_(pending)))
+        }
+
+        for hash_, content in pending.items():
+            render_row = existing.get(hash_)
+            if render_row is None:
+                RenderService._insert(hash_, render(content))
+            elif render_row.renderer_version != RENDERER_VERSION:
+                render_row.html = render(content)
+                render_row.renderer_version = RENDERER_VERSION
+        return hashes
+
+    @staticmethod
+    def _insert(hash_, html):
+        # Otra petición puede haber guardado el mismo contenido al mismo tiempo
+        try:
+            with transaction.savepoint():
+                db.session.add(EntryRender(content_hash=hash_, renderer_version=RENDERER_VERSION, html=html))
+        except IntegrityError:
+            pass
+
+    @staticmethod
+    def get_entry_with_html(id_entry):
+        """
+        Obtener una entrada (con su autor) y el HTML renderizado de su contenido en una sola consulta.
+
+        Si el render falta o es de una versión anterior (por ejemplo, entradas importadas en
+        bloque aún no procesadas por `flask render rebuild`), se genera en memoria sin
+        guardarlo: una lectura no escribe en la base de datos. Los renders se guardan al crear
+        o modificar la entrada y con `flask render rebuild`. Las entradas archivadas también
+        se encuentran.
+
+        Args:
+            id_entry (int): ID de la entrada de blog.
+
+        Returns:
+            tuple: (Entry | EntryArchive, html) o None si la entrada no existe.
+        """
+        # La entrada puede estar archivada: se busca primero en `entries` y luego en el archivo
+        for model in (Entry, EntryArchive):
+            row = db.session.execute(
+                select(model, EntryRender)
+                .outerjoin(EntryRender, EntryRender.content_hash == model.content_hash)
+                .options(joinedload(model.user))
+                .where(model.id_entry == id_entry)
+            ).first()
+            if row is not None:
+                break
+        else:
+            return None
+
+        entry, render_row = row
+        if render_row is None or render_row.renderer_version != RENDERER_VERSION:
+            return entry, render(entry.content)
+        return entry, render_row.html
+
+    @staticmethod
+    def rebuild(chunk_size=500, progress=None):
+        """
+        Renderizar el contenido de todas las entradas, activas y archivadas, con la versión
+        actual del renderizador.
+
+        Las entradas se recorren por rangos de clave primaria de `chunk_size` filas, con un
+        commit por bloque; solo se renderizan los contenidos sin render vigente. Al final se
+        eliminan los renders que ya no usa ninguna entrada.
+
+        Args:
+            chunk_size (int): Entradas por bloque y por commit.
+            progress (callable, opcional): Función llamada con las entradas procesadas tras cada bloque.
+
+        Returns:
+            tuple: (entradas procesadas, renders eliminados).
+        """
+        count = 0
+        for model in (Entry, EntryArchive):
+            count = RenderService._rebuild_model(model, chunk_size, count, progress)
+
+        pruned = db.session.execute(
+            delete(EntryRender).where(
+                EntryRender.content_hash.not_in(select(Entry.content_hash).where(Entry.content_hash.is_not(None))),
+                # Las entradas archivadas siguen mostrando su HTML
+                EntryRender.content_hash.not_in(
+                    select(EntryArchive.content_hash).where(EntryArchive.content_hash.is_not(None))
+                ),
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        transaction.commit()
+        return count, pruned
+
+    @staticmethod
+    def _rebuild_model(model, chunk_size, count, progress):
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(model.id_entry, model.content, model.content_hash)
+                .where(model.id_entry > last_id)
+                .order_by(model.id_entry)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            hashes = RenderService.ensure_rendered([row.content for row in rows])
+            changed = [
+                {'b_id_entry': row.id_entry, 'b_content_hash': hash_}
+                for row, hash_ in zip(rows, hashes) if row.content_hash != hash_
+            ]
+            if changed:
+                db.session.execute(
+                    update(model.__table__)
+                    .where(model.__table__.c.id_entry == bindparam('b_id_entry'))
+                    .values(content_hash=bindparam('b_content_hash')),
+                    changed,
+                )
+            transaction.commit()
+
+            last_id = rows[-1].id_entry
+            count += len(rows)
+            if progress:
+                progress(count)
+        return count
@@ -0,0 +1,138 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models.token_revocation import TokenRevocation
+from app.utils import transaction
+
+# Revocaciones sincronizadas en memoria del proceso
+_revoked_jtis = {}  # jti -> expiración (epoch)
+_user_cutoffs = {}  # id_user -> (revoked_before en milisegundos, expiración)
+_last_synced_id = 0
+_synced_ids = set()  # IDs ya aplicados dentro de la ventana de solapamiento
+_synced_at = 0
+_sync_lock = threading.Lock()
+
+
+class TokenService:
+    @staticmethod
+    def is_token_revoked(jwt_header, jwt_payload):
+        """
+        Verificar si un token JWT fue revocado (callback `token_in_blocklist_loader`).
+
+        La verificación es una búsqueda en memoria; la tabla de revocaciones solo se consulta
+        de forma incremental cada `TOKEN_REVOCATION_SYNC_SECONDS` para incorporar las
+        revocaciones hechas en otros procesos.
+
+        Args:
+            jwt_header (dict): Cabecera del token.
+            jwt_payload (dict): Contenido del token (jti, sub, iat...).
+
+        Returns:
+            bool: True si el token no debe aceptarse.
+        """
+        TokenService.sync()
+        if jwt_payload['jti'] in _revoked_jtis:
+            return True
+        cutoff = _user_cutoffs.get(jwt_payload['sub'])
+        # `iat` tiene precisión de segundos; `iat_ms` distingue los tokens emitidos en el mismo
+        # segundo antes y después de la revocación (los tokens sin él se comparan por `iat`)
+        issued_ms = jwt_payload.get('iat_ms', jwt_payload['iat'] * 1000)
+        return cutoff is not None and issued_ms < cutoff[0]
+
+    @staticmethod
+    def additional_claims(identity):
+        """
+        Claims agregados a cada token emitido (callback `additional_claims_loader`).
+
+        Returns:
+            dict: `iat_ms`, el instante de emisión en milisegundos.
+        """
+        return {'iat_ms': int(time.time() * 1000)}
+
+    @staticmethod
+    def sync(force=False):
+        """
+        Traer a memoria las revocaciones nuevas.
+
+        Con transacciones concurrentes (auto-increment de MySQL) una fila con un ID menor puede
+        confirmarse después de otra con un ID mayor, así que cada sincronización vuelve a leer los
+        últimos `TOKEN_REVOCATION_SYNC_OVERLAP` IDs y omite los que ya se aplicaron.
+        """
+        global _last_synced_id, _synced_ids, _synced_at
+        interval = current_app.config['TOKEN_REVOCATION_SYNC_SECONDS']
+        if not force and time.monotonic() - _synced_at < interval:
+            return
+        if not _sync_lock.acquire(blocking=False):
+            # Otro hilo ya está sincronizando
+            return
+        try:
+            now = int(time.time())
+            window_start = max(_last_synced_id - current_app.config['TOKEN_REVOCATION_SYNC_OVERLAP'], 0)
+            rows = db.session.execute(
+                select(TokenRevocation.id, TokenRevocation.jti, TokenRevocation.id_user,
+                       TokenRevocation.revoked_before, TokenRevocation.expires_at)
+                .where(TokenRevocation.id > window_start)
+                .order_by(TokenRevocation.id)
+            ).all()
+            for revocation in rows:
+                if revocation.id in _synced_ids:
+                    continue
+                TokenService._remember(revocation.jti, revocation.id_user, revocation.revoked_before, revocation.expires_at)
+                _synced_ids.add(revocation.id)
+                _last_synced_id = max(_last_synced_id, revocation.id)
+            window_start = max(_last_synced_id - current_app.config['TOKEN_REVOCATION_SYNC_OVERLAP'], 0)
+            _synced_ids = {id_ for id_ in _synced_ids if id_ > window_start}
+
+            # Olvidar las revocaciones de tokens que ya caducaron por sí mismos
+            for jti in [jti for jti, expires_at in _revoked_jtis.items() if expires_at < now]:
+                _revoked_jtis.pop(jti, None)
+            for id_user in [id_user for id_user, (_, expires_at) in _user_cutoffs.items() if expires_at < now]:
+                _user_cutoffs.pop(id_user, None)
+            _synced_at = time.monotonic()
+        finally:
+            _sync_lock.release()
+
+    @staticmethod
+    def revoke_token(jti, id_user, expires_at):
+        """
+        Revocar un token concreto (por ejemplo al cerrar sesión).
+
+        La revocación se agrega a la unidad de trabajo actual y se aplica en memoria tras el commit.
+
+        Args:
+            jti (str): Identificador único del token.
+            id_user (int): Usuario dueño del token.
+            expires_at (int): Expiración del token (epoch).
+        """
+        revocation = TokenRevocation(jti=jti, id_user=id_user, expires_at=expires_at)
+        db.session.add(revocation)
+        transaction.after_commit(TokenService._remember, jti, id_user, None, expires_at)
+
+    @staticmethod
+    def revoke_user_tokens(id_user):
+        """
+        Revocar todos los tokens emitidos hasta ahora para un usuario.
+
+        Se usa al eliminar un usuario o cambiar su contraseña, dentro de la misma unidad de trabajo.
+
+        Args:
+            id_user (int): ID del usuario.
+        """
+        now = time.time()
+        revoked_before = int(now * 1000)
+        # Basta con recordarla mientras pueda existir algún refresh token emitido antes
+        expires_at = int(now) + int(current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds())
+        revocation = TokenRevocation(id_user=id_user, revoked_before=revoked_before, expires_at=expires_at)
+        db.session.add(revocation)
+        transaction.after_commit(TokenService._remember, None, id_user, revoked_before, expires_at)
+
+    @staticmethod
+    def _remember(jti, id_user, revoked_before, expires_at):
+        if jti:
+            _revoked_jtis[jti] = expires_at
+        if revoked_before:
+            current = _user_cutoffs.get(id_user)
+            if current is None or current[0] < revoked_before:
+                _user_cutoffs[id_user] = (revoked_before, expires_at)
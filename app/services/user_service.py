@@ -1,12 +1,35 @@
+import threading
+import time
+from collections import Counter
 from datetime import datetime
+from flask import current_app
+from sqlalchemy import or_, select, update, delete
+from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.utils.bloom import CountingBloomFilter
+from app.utils.cache import cache
+from app.utils.purge import purger
+from app.utils import background, transaction
+from app.services.token_service import TokenService
+from app.services.category_service import CategoryService
+from app.services.related_service import RelatedService
 from app import db, bcrypt
 
+# Filtro de Bloom (por proceso) con los nombres de usuario y correos ya registrados
+_taken_filter = None
+_taken_filter_loaded_at = 0
+_taken_filter_lock = threading.Lock()  # Protege el filtro, sus contadores y el estado de abajo
+_taken_filter_building = False
+_local_keys = Counter()  # Claves agregadas por este proceso desde la última construcción
+_added_during_build = []  # Claves agregadas mientras se construye el filtro siguiente
+
 class UserService:
     @staticmethod
     def create_user(data):
-        if User.query.filter_by(email=data['email']).first() or User.query.filter_by(username=data['username']).first():
+        # Una sola consulta para verificar la unicidad del correo y del nombre de usuario
+        if UserService.find_conflicts(email=data['email'], username=data['username']):
             raise ValueError('Email or username already in use')
         
         # Crear una nueva instancia del usuario con los datos proporcionados
@@ -14,9 +37,180 @@ class UserService:
         new_user = User(**user_data)
 
         # Agregar el nuevo usuario a la sesión de la base de datos y confirmar los cambios
-        db.session.add(new_user)
-        db.session.commit()
+        try:
+            with transaction.savepoint():
+                db.session.add(new_user)
+        except IntegrityError:
+            # Otra petición registró el mismo correo o nombre de usuario entre la consulta y el INSERT
+            raise ValueError('Email or username already in use')
+        transaction.commit()
+
+        transaction.after_commit(UserService.mark_taken, username=data['username'], email=data['email'])
+        transaction.after_commit(cache.bump, 'users')
+        transaction.after_commit(purger.purge, 'users:list')
         return new_user
+
+    @staticmethod
+    def find_conflicts(email=None, username=None, exclude_id=None):
+        """
+        Buscar usuarios que ya usan un correo o nombre de usuario, en una sola consulta.
+        
+        Args:
+            email (str, opcional): Correo electrónico a verificar.
+            username (str, opcional): Nombre de usuario a verificar.
+            exclude_id (int, opcional): ID del usuario que se está actualizando.
+        
+        Returns:
+            dict: {'email': bool, 'username': bool} indicando qué valores ya están en uso.
+        """
+        conditions = []
+        if email is not None:
+            conditions.append(User.email == email)
+        if username is not None:
+            conditions.append(User.username == username)
+        if not conditions:
+            return {}
+
+        query = select(User.email, User.username).where(or_(*conditions)).limit(2)
+        if exclude_id is not None:
+            query = query.where(User.id_user != exclude_id)
+
+        conflicts = {}
+        for row in db.session.execute(query):
+            if email is not None and row.email == email:
+                conflicts['email'] = True
+            if username is not None and row.username == username:
+                conflicts['username'] = True
+        return conflicts
+
+    @staticmethod
+    def check_availability(username=None, email=None):
+        """
+        Verificar si un nombre de usuario y/o correo están disponibles.
+        
+        Primero se consulta el filtro de Bloom en memoria: si responde que el valor no está,
+        el valor está disponible sin consultar la base de datos. Solo los posibles
+        positivos se confirman con una consulta (todos, mientras el filtro no esté construido).
+        
+        Args:
+            username (str, opcional): Nombre de usuario a verificar.
+            email (str, opcional): Correo electrónico a verificar.
+        
+        Returns:
+            dict: {'username': bool, 'email': bool} con la disponibilidad de cada valor recibido.
+        """
+        taken = UserService.get_taken_filter()
+        candidates = {}
+        if username is not None:
+            candidates['username'] = taken is None or UserService._filter_key('username', username) in taken
+        if email is not None:
+            candidates['email'] = taken is None or UserService._filter_key('email', email) in taken
+
+        to_confirm = {field: value for field, value in (('username', username), ('email', email))
+                      if candidates.get(field)}
+        conflicts = UserService.find_conflicts(**to_confirm) if to_confirm else {}
+        return {field: not conflicts.get(field, False) for field in candidates}
+
+    @staticmethod
+    def get_taken_filter():
+        """
+        Obtener el filtro de Bloom de valores en uso.
+
+        El filtro se construye al arrancar (warm-up) y se reconstruye en segundo plano cada
+        `AVAILABILITY_FILTER_TTL` segundos para incorporar los registros hechos en otros
+        procesos; mientras tanto se sigue usando el anterior. Ninguna petición espera la
+        construcción.
+
+        Returns:
+            CountingBloomFilter: Filtro con los nombres de usuario y correos registrados, o
+            None si aún no se construyó.
+        """
+        global _taken_filter_building
+        ttl = current_app.config['AVAILABILITY_FILTER_TTL']
+        if _taken_filter is None or time.monotonic() - _taken_filter_loaded_at >= ttl:
+            with _taken_filter_lock:
+                if _taken_filter_building:
+                    return _taken_filter
+                _taken_filter_building = True
+            background.submit(current_app._get_current_object(), UserService.build_taken_filter)
+        return _taken_filter
+
+    @staticmethod
+    def build_taken_filter():
+        """Construir el filtro de Bloom desde la base de datos y reemplazar el actual."""
+        global _taken_filter, _taken_filter_loaded_at, _taken_filter_building, _local_keys, _added_during_build
+        with _taken_filter_lock:
+            _taken_filter_building = True
+            _added_during_build = []
+        try:
+            taken = CountingBloomFilter(
+                capacity=current_app.config['AVAILABILITY_FILTER_CAPACITY'],
+                error_rate=current_app.config['AVAILABILITY_FILTER_ERROR_RATE'],
+            )
+            query = select(User.username, User.email).execution_options(yield_per=5000)
+            for row in db.session.execute(query):
+                taken.add(UserService._filter_key('username', row.username))
+                taken.add(UserService._filter_key('email', row.email))
+
+            with _taken_filter_lock:
+                # Las claves agregadas durante la lectura pueden no estar en ella: se agregan de
+                # nuevo (una de más solo deja un falso positivo)
+                for key in _added_during_build:
+                    taken.add(key)
+                _local_keys = Counter(_added_during_build)
+                _taken_filter, _taken_filter_loaded_at = taken, time.monotonic()
+        finally:
+            with _taken_filter_lock:
+                _taken_filter_building = False
+                _added_during_build = []
+
+    @staticmethod
+    def mark_taken(username=None, email=None):
+        """Registrar en el filtro de Bloom valores que pasan a estar en uso."""
+        keys = UserService._filter_keys(username, email)
+        with _taken_filter_lock:
+            if _taken_filter_building:
+                _added_during_build.extend(keys)
+            if _taken_filter is None:
+                return
+            for key in keys:
+                _taken_filter.add(key)
+                _local_keys[key] += 1
+
+    @staticmethod
+    def mark_released(username=None, email=None):
+        """
+        Quitar del filtro de Bloom valores que dejan de estar en uso.
+
+        Solo se quitan las claves que este proceso agregó: quitar una que el filtro no vio
+        (registrada en otro proceso después de construirlo) decrementaría contadores de otras
+        claves y produciría falsos negativos. Las demás quedan como falsos positivos (una
+        consulta de confirmación) hasta la siguiente reconstrucción.
+        """
+        keys = UserService._filter_keys(username, email)
+        with _taken_filter_lock:
+            if _taken_filter is None:
+                return
+            for key in keys:
+                if _local_keys[key] > 0:
+                    _taken_filter.remove(key)
+                    _local_keys[key] -= 1
+                if not _local_keys[key]:
+                    del _local_keys[key]
+
+    @staticmethod
+    def _filter_keys(username=None, email=None):
+        keys = []
+        if username is not None:
+            keys.append(UserService._filter_key('username', username))
+        if email is not None:
+            keys.append(UserService._filter_key('email', email))
+        return keys
+
+    @staticmethod
+    def _filter_key(field, value):
+        # Sin distinguir mayúsculas: un falso positivo solo cuesta una consulta de confirmación
+        return f'{field}:{value.lower()}'
     
     @staticmethod
     def get_all_users():
@@ -29,6 +223,63 @@ class UserService:
         # Recuperar todos los registros de la tabla User
         return User.query.all()
 
+    @staticmethod
+    def adjust_counters(id_user, **deltas):
+        """
+        Incrementar o decrementar de forma atómica los contadores de un usuario.
+        
+        Se ejecuta un `UPDATE ... SET col = col + delta` en la transacción actual, por lo que
+        el contador se confirma junto con la escritura que lo originó.
+        
+        Args:
+            id_user (int): ID del usuario.
+            **deltas: Diferencia para cada contador, por ejemplo `entry_count=1`.
+        """
+        values = {name: getattr(User, name) + delta for name, delta in deltas.items() if delta}
+        if values:
+            db.session.execute(update(User).where(User.id_user == id_user).values(**values))
+
+    @staticmethod
+    def get_profile(username, limit):
+        """
+        Obtener el perfil público de un usuario con sus últimas entradas.
+        
+        Los contadores se leen de las columnas desnormalizadas de `users`, por lo que el
+        perfil completo se obtiene con dos consultas indexadas.
+        
+        Args:
+            username (str): Nombre de usuario.
+            limit (int): Número de entradas recientes a incluir.
+        
+        Returns:
+            dict: {'user': User, 'latest_entries': List[Entry]} o None si el usuario no existe.
+        """
+        user = UserService.get_user_by_username(username)
+        if not user:
+            return None
+
+        latest_entries = (
+            Entry.query.filter_by(id_user=user.id_user)
+            .order_by(Entry.created_at.desc(), Entry.id_entry.desc())
+            .limit(limit)
+            .all()
+        )
+        return {'user': user, 'latest_entries': latest_entries}
+
+    @staticmethod
+    def list_usernames():
+        """
+        Obtener los nombres de usuario de todos los usuarios, a través de la caché compartida.
+        
+        Returns:
+            List[str]: Nombres de usuario.
+        """
+        return cache.get_or_set(
+            'users:usernames',
+            lambda: list(db.session.scalars(select(User.username).order_by(User.id_user))),
+            namespace='users',
+        )
+
     @staticmethod
     def get_user_by_username(username):
         """
@@ -51,28 +302,51 @@ class UserService:
             # Si no se encuentra el usuario, lanzar una excepción
             raise ValueError('User not found')
 
-        # Actualizar los campos del usuario solo si se proporcionan nuevos valores
-        if 'username' in newdata:
-            existing_user = User.query.filter_by(username=newdata['username']).first()
-            if existing_user:
-                # Si se encuentra un usuario existente, lanzar una excepción
-                raise ValueError('Username already exists')
+        # Verificar en una sola consulta que el nuevo nombre de usuario y correo no estén en uso
+        conflicts = UserService.find_conflicts(
+            email=newdata.get('email'), username=newdata.get('username'), exclude_id=user.id_user
+        )
+        if conflicts.get('username'):
+            # Si se encuentra un usuario existente, lanzar una excepción
+            raise ValueError('Username already exists')
+        if conflicts.get('email'):
+            # Si se encuentra un usuario existente, lanzar una excepción
+            raise ValueError('Email already linked to an account')
 
-        if 'email' in newdata:
-            existing_email = User.query.filter_by(email=newdata['email']).first()
-            if existing_email:
-                # Si se encuentra un usuario existente, lanzar una excepción
-                raise ValueError('Email already linked to an account')
+        old_username, old_email = user.username, user.email
 
         if 'password' in newdata:
             user.password = bcrypt.generate_password_hash(newdata['password']).decode('utf-8')
+            # Un cambio de contraseña invalida todas las sesiones abiertas
+            TokenService.revoke_user_tokens(user.id_user)
 
-        for key, value in newdata.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
+        try:
+            # Otra petición puede haber tomado el correo o nombre de usuario después de la consulta
+            with transaction.savepoint():
+                for key, value in newdata.items():
+                    # La contraseña ya se guardó hasheada
+                    if key != 'password' and hasattr(user, key):
+                        setattr(user, key, value)
+        except IntegrityError:
+            raise ValueError('Email or username already in use')
+
+        new_username, new_email = user.username, user.email
 
         # Confirmar los cambios en la base de datos
-        db.session.commit()
+        transaction.commit()
+
+        # El nombre del usuario aparece como autor en la lista de entradas
+        transaction.after_commit(cache.bump, 'users')
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, f'user:{user.id_user}', 'users:list', 'entries:list')
+
+        # Mantener actualizado el filtro de disponibilidad
+        if new_username != old_username:
+            transaction.after_commit(UserService.mark_released, username=old_username)
+            transaction.after_commit(UserService.mark_taken, username=new_username)
+        if new_email != old_email:
+            transaction.after_commit(UserService.mark_released, email=old_email)
+            transaction.after_commit(UserService.mark_taken, email=new_email)
         return user
 
     @staticmethod
@@ -84,6 +358,20 @@ class UserService:
             raise ValueError('User not found')
 
         # Eliminar el usuario de la base de datos y confirmar los cambios
+        id_user, username, email = user.id_user, user.username, user.email
+        # Sus entradas se eliminan en cascada: descontarlas de sus categorías
+        CategoryService.release_user_entries(user.id_user)
+        RelatedService.forget(select(Entry.id_entry).where(Entry.id_user == user.id_user))
+        RelatedService.forget(select(EntryArchive.id_entry).where(EntryArchive.id_user == user.id_user))
+        db.session.execute(delete(EntryArchive).where(EntryArchive.id_user == user.id_user))
         db.session.delete(user)
-        db.session.commit()
+        # Los tokens emitidos para el usuario eliminado dejan de ser válidos
+        TokenService.revoke_user_tokens(user.id_user)
+        transaction.commit()
+
+        transaction.after_commit(UserService.mark_released, username=username, email=email)
+        # La eliminación en cascada también borra sus entradas
+        transaction.after_commit(cache.bump, 'users')
+        transaction.after_commit(cache.bump, 'entries')
+        transaction.after_commit(purger.purge, f'user:{id_user}', 'users:list', 'entries:list')
         return True
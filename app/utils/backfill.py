@@ -0,0 +1,246 @@
+import logging
+import time
+from datetime import datetime
+import sqlalchemy as sa
+from alembic import op
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Utilidades para migraciones en línea sobre tablas grandes, usadas desde `migrations/versions/`:
+# DDL sin bloqueo, backfills por rangos de clave primaria reanudables y triggers de doble escritura
+
+# Puntos de control de los backfills; la tabla no es un modelo porque solo la usan las migraciones
+metadata = sa.MetaData()
+checkpoints = sa.Table(
+    'backfill_checkpoints', metadata,
+    sa.Column('name', sa.String(100), primary_key=True),  # Nombre del backfill
+    sa.Column('last_id', sa.BigInteger, nullable=False),  # Última clave primaria procesada
+    sa.Column('max_id', sa.BigInteger, nullable=False),  # Clave primaria máxima al empezar
+    sa.Column('rows', sa.BigInteger, nullable=False),  # Filas modificadas hasta ahora
+    sa.Column('updated_at', sa.DateTime),  # Fecha del último bloque
+    sa.Column('completed_at', sa.DateTime),  # Fecha de finalización
+)
+
+
+def backfill(name, table, pk, values=None, transform=None, where=None, chunk_size=None, throttle=None,
+             bind=None, progress=None):
+    """
+    Modificar las filas de una tabla por rangos de clave primaria, con un commit por bloque.
+
+    Cada bloque `(last_id, last_id + chunk_size]` se procesa en su propia transacción junto
+    con la actualización de su punto de control, por lo que un backfill interrumpido se
+    reanuda desde el último bloque confirmado y uno ya terminado no se repite. Las filas
+    insertadas después de empezar quedan fuera del rango: deben escribirlas la aplicación o
+    un trigger de doble escritura.
+
+    Dentro de una migración, el backfill se ejecuta en un `autocommit_block` de Alembic, de
+    modo que los bloques no quedan dentro de la transacción de la migración.
+
+    Args:
+        name (str): Nombre único del backfill (por ejemplo, '<revision>_<tabla>_<columna>').
+        table (Table): Tabla a modificar.
+        pk (Column): Columna entera de clave primaria de `table`.
+        values (dict, opcional): Valores (o expresiones SQL) del `UPDATE` de cada bloque.
+        transform (callable, opcional): Función (conexión, desde, hasta) -> filas modificadas,
+            para transformaciones que no son un único `UPDATE`.
+        where (ClauseElement, opcional): Condición adicional del `UPDATE`.
+        chunk_size (int, opcional): Rango de claves por bloque (por defecto BACKFILL_CHUNK_SIZE).
+        throttle (float, opcional): Segundos de pausa entre bloques (por defecto BACKFILL_THROTTLE).
+        bind (Engine, opcional): Motor a usar fuera de una migración.
+        progress (callable, opcional): Función llamada con (última clave, clave máxima, filas).
+
+    Returns:
+        int: Filas modificadas por esta ejecución.
+    """
+    if (values is None) == (transform is None):
+        raise ValueError('backfill requires exactly one of values or transform')
+    if chunk_size is None:
+        chunk_size = current_app.config['BACKFILL_CHUNK_SIZE']
+    if throttle is None:
+        throttle = current_app.config['BACKFILL_THROTTLE']
+    if transform is None:
+        def transform(conn, start, end):
+            query = table.update().where(pk > start, pk <= end).values(**values)
+            if where is not None:
+                query = query.where(where)
+            return conn.execute(query).rowcount
+
+    if bind is not None:
+        return _run(bind, name, pk, transform, chunk_size, throttle, progress)
+    with op.get_context().autocommit_block():
+        return _run(op.get_bind().engine, name, pk, transform, chunk_size, throttle, progress)
+
+
+def _run(engine, name, pk, transform, chunk_size, throttle, progress):
+    metadata.create_all(engine, checkfirst=True)
+    with engine.begin() as conn:
+        checkpoint = conn.execute(sa.select(checkpoints).where(checkpoints.c.name == name)).first()
+        if checkpoint is None:
+            first_id, max_id = conn.execute(sa.select(sa.func.min(pk), sa.func.max(pk))).first()
+            checkpoint = {'name': name, 'last_id': (first_id or 1) - 1, 'max_id': max_id or 0, 'rows': 0}
+            conn.execute(checkpoints.insert().values(**checkpoint, updated_at=datetime.now()))
+        elif checkpoint.completed_at is not None:
+            return 0
+        else:
+            checkpoint = checkpoint._asdict()
+
+    last_id, max_id, rows = checkpoint['last_id'], checkpoint['max_id'], 0
+    while last_id < max_id:
+        end = min(last_id + chunk_size, max_id)
+        with engine.begin() as conn:
+            count = transform(conn, last_id, end) or 0
+            conn.execute(
+                checkpoints.update().where(checkpoints.c.name == name)
+                .values(last_id=end, rows=checkpoints.c.rows + count, updated_at=datetime.now())
+            )
+        last_id, rows = end, rows + count
+        if progress:
+            progress(last_id, max_id, rows)
+        if throttle and last_id < max_id:
+            # Dejar respirar a la base de datos (y a las réplicas) entre bloques
+            time.sleep(throttle)
+
+    with engine.begin() as conn:
+        conn.execute(checkpoints.update().where(checkpoints.c.name == name).values(completed_at=datetime.now()))
+    return rows
+
+
+def reset(name, bind=None):
+    """
+    Eliminar el punto de control de un backfill para que vuelva a ejecutarse desde el principio.
+
+    Sin `bind` se usa la conexión de la migración (por ejemplo, en el `downgrade`).
+    """
+    query = checkpoints.delete().where(checkpoints.c.name == name)
+    if bind is None:
+        conn = op.get_bind()
+        metadata.create_all(conn, checkfirst=True)
+        conn.execute(query)
+        return
+    metadata.create_all(bind, checkfirst=True)
+    with bind.begin() as conn:
+        conn.execute(query)
+
+
+# Los helpers de DDL no hacen nada si el objeto ya existe: MySQL y SQLite (en Alembic) no
+# deshacen el DDL de una migración interrumpida, y al volver a ejecutarla debe llegar hasta el
+# backfill para reanudarlo desde su punto de control
+
+def has_table(table_name):
+    """Indicar si la tabla existe en la base de datos de la migración."""
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def add_column(table_name, column):
+    """Agregar una columna sin bloquear la tabla (MySQL: `ALGORITHM=INPLACE, LOCK=NONE`)."""
+    bind = op.get_bind()
+    if column.name in {c['name'] for c in sa.inspect(bind).get_columns(table_name)}:
+        return
+    if bind.dialect.name == 'mysql':
+        ddl = sa.schema.CreateColumn(column).compile(dialect=bind.dialect)
+        op.execute(f'ALTER TABLE {table_name} ADD COLUMN {ddl}, ALGORITHM=INPLACE, LOCK=NONE')
+    else:
+        op.add_column(table_name, column)
+
+
+def create_index(index_name, table_name, columns):
+    """Crear un índice sin bloquear las escrituras de la tabla."""
+    bind = op.get_bind()
+    if index_name in {index['name'] for index in sa.inspect(bind).get_indexes(table_name)}:
+        return
+    if bind.dialect.name == 'mysql':
+        op.execute(f'CREATE INDEX {index_name} ON {table_name} ({", ".join(columns)}) ALGORITHM=INPLACE LOCK=NONE')
+    elif bind.dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True)
+    else:
+        op.create_index(index_name, table_name, columns)
+
+
+def create_foreign_key(constraint_name, source_table, referent_table, local_cols, remote_cols):
+    """
+    Crear una clave foránea sin copiar la tabla.
+
+    En MySQL se crea con `foreign_key_checks=0` (requisito de `ALGORITHM=INPLACE`): las filas
+    existentes no se validan, por lo que la columna debe llenarse después con valores válidos.
+    SQLite no admite agregar restricciones y recrea la tabla (modo batch).
+    """
+    bind = op.get_bind()
+    if constraint_name in {fk['name'] for fk in sa.inspect(bind).get_foreign_keys(source_table)}:
+        return
+    if bind.dialect.name == 'mysql':
+        op.execute('SET foreign_key_checks = 0')
+        op.execute(
+            f'ALTER TABLE {source_table} ADD CONSTRAINT {constraint_name} FOREIGN KEY ({", ".join(local_cols)}) '
+            f'REFERENCES {referent_table} ({", ".join(remote_cols)}), ALGORITHM=INPLACE, LOCK=NONE'
+        )
+        op.execute('SET foreign_key_checks = 1')
+    elif bind.dialect.name == 'sqlite':
+        with op.batch_alter_table(source_table, schema=None) as batch_op:
+            batch_op.create_foreign_key(constraint_name, referent_table, local_cols, remote_cols)
+    else:
+        op.create_foreign_key(constraint_name, source_table, referent_table, local_cols, remote_cols)
+
+
+def create_dual_write_trigger(table_name, pk, target, expression, sources):
+    """
+    Mantener `target` calculada a partir de otras columnas en cada INSERT o UPDATE.
+
+    Se usa al mover o transformar una columna: mientras haya instancias de la aplicación que
+    solo escriben la columna anterior, el trigger escribe también la nueva, y el backfill se
+    encarga de las filas existentes.
+
+    Args:
+        table_name (str): Tabla.
+        pk (str): Columna de clave primaria (necesaria en SQLite).
+        target (str): Columna que mantiene el trigger.
+        expression (str): Expresión SQL del nuevo valor; las columnas de la fila se leen como `NEW.<columna>`.
+        sources (List[str]): Columnas de las que depende la expresión.
+
+    En otros dialectos no se crea el trigger (se registra una advertencia): las filas escritas
+    durante el despliegue se completan al aplicar la migración que lo elimina.
+    """
+    bind = op.get_bind()
+    name = _trigger_name(table_name, target)
+    if bind.dialect.name in ('sqlite', 'mysql', 'postgresql'):
+        # Recrear el trigger si quedó de una ejecución interrumpida
+        drop_dual_write_trigger(table_name, target)
+    if bind.dialect.name == 'sqlite':
+        # SQLite no permite modificar NEW: la fila se actualiza después de escribirse
+        body = f'UPDATE {table_name} SET {target} = {expression} WHERE {pk} = NEW.{pk};'
+        op.execute(f'CREATE TRIGGER {name}_ins AFTER INSERT ON {table_name} BEGIN {body} END')
+        op.execute(f'CREATE TRIGGER {name}_upd AFTER UPDATE OF {", ".join(sources)} ON {table_name} BEGIN {body} END')
+    elif bind.dialect.name == 'mysql':
+        body = f'SET NEW.{target} = {expression}'
+        op.execute(f'CREATE TRIGGER {name}_ins BEFORE INSERT ON {table_name} FOR EACH ROW {body}')
+        op.execute(f'CREATE TRIGGER {name}_upd BEFORE UPDATE ON {table_name} FOR EACH ROW {body}')
+    elif bind.dialect.name == 'postgresql':
+        op.execute(
+            f'CREATE FUNCTION {name}() RETURNS trigger AS $$ BEGIN NEW.{target} := {expression}; '
+            f'RETURN NEW; END; $$ LANGUAGE plpgsql'
+        )
+        op.execute(
+            f'CREATE TRIGGER {name} BEFORE INSERT OR UPDATE OF {", ".join(sources)} ON {table_name} '
+            f'FOR EACH ROW EXECUTE FUNCTION {name}()'
+        )
+    else:
+        logger.warning('Dual-write triggers are not supported on %s: %s.%s is not maintained until the trigger '
+                       'drop migration backfills it', bind.dialect.name, table_name, target)
+
+
+def drop_dual_write_trigger(table_name, target):
+    """Eliminar el trigger creado con `create_dual_write_trigger`."""
+    bind = op.get_bind()
+    name = _trigger_name(table_name, target)
+    if bind.dialect.name == 'postgresql':
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table_name}')
+        op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+    else:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}_ins')
+        op.execute(f'DROP TRIGGER IF EXISTS {name}_upd')
+
+
+def _trigger_name(table_name, target):
+    return f'dual_write_{table_name}_{target}'
@@ -0,0 +1,37 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Un solo hilo por proceso: las tareas en segundo plano se ejecutan en orden y no compiten
+# con las peticiones por conexiones del pool
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='codenet-background')
+
+
+def submit(app, func, *args, **kwargs):
+    """
+    Ejecutar una función fuera de la petición, dentro de un contexto de aplicación propio.
+
+    Si `BACKGROUND_TASKS_ASYNC` es False la función se ejecuta inmediatamente (útil en
+    pruebas y en comandos de la CLI).
+
+    Args:
+        app (Flask): La aplicación (usar `current_app._get_current_object()`).
+        func (callable): Función a ejecutar.
+    """
+    if not app.config['BACKGROUND_TASKS_ASYNC']:
+        return _run(app, func, *args, **kwargs)
+    return _executor.submit(_run, app, func, *args, **kwargs)
+
+
+def _run(app, func, *args, **kwargs):
+    from app import db
+
+    with app.app_context():
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            logger.exception('Background task %s failed', func.__name__)
+            db.session.rollback()
+        finally:
+            db.session.remove()
@@ -0,0 +1,47 @@
+import hashlib
+import math
+from array import array
+
+
+class CountingBloomFilter:
+    """
+    Filtro de Bloom con contadores, que permite agregar y también eliminar elementos.
+
+    Responde "no está" con certeza y "puede estar" con una probabilidad de falso
+    positivo cercana a `error_rate` mientras no se superen `capacity` elementos.
+
+    Atributos:
+        size (int): Número de contadores del filtro.
+        hashes (int): Número de funciones hash usadas por elemento.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._counters = array('B', bytes(self.size))
+
+    def _positions(self, key):
+        """Calcular las posiciones de un elemento con doble hashing sobre un solo digest."""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Agregar un elemento al filtro."""
+        for position in self._positions(key):
+            if self._counters[position] < 255:
+                self._counters[position] += 1
+
+    def remove(self, key):
+        """Eliminar un elemento previamente agregado."""
+        positions = self._positions(key)
+        if not all(self._counters[position] for position in positions):
+            return
+        for position in positions:
+            # Un contador saturado ya no se puede decrementar con seguridad
+            if self._counters[position] < 255:
+                self._counters[position] -= 1
+
+    def __contains__(self, key):
+        return all(self._counters[position] for position in self._positions(key))
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class TieredCache:
+    """
+    Caché de dos niveles para la capa de servicios.
+
+    - L1: LRU en memoria del proceso.
+    - L2: archivo SQLite local compartido por todos los workers de la máquina.
+
+    Cada clave pertenece a un espacio de nombres ('entries', 'users') con un número de
+    versión guardado en L2. Las escrituras llaman a `bump(namespace)`, lo que invalida a la
+    vez las copias de todos los procesos. Además:
+
+    - Una sola petición por clave recalcula el valor (single-flight): dentro del proceso con
+      un lock por clave y entre procesos con un lease en L2; el resto espera o sirve el
+      valor anterior.
+    - El valor se refresca de forma probabilística antes de caducar (XFetch), de modo que
+      las claves muy consultadas no caducan en todos los workers al mismo tiempo.
+
+    Los valores se guardan en L2 como JSON (con las fechas etiquetadas), nunca con pickle:
+    leer el archivo no puede ejecutar código. Las claves y versiones de L2 llevan como prefijo
+    un hash de `SQLALCHEMY_DATABASE_URI`, de modo que dos aplicaciones con bases de datos
+    distintas no comparten valores aunque usen el mismo archivo.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.l1_size = 1024
+        self.default_ttl = 30
+        self.beta = 1.0
+        self.version_check_interval = 1.0
+        self.lock_timeout = 5.0
+        self.l2_path = None
+        self.prefix = ''
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._key_locks = {}
+        self._versions = {}
+        self._local = threading.local()
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+
+    def init_app(self, app):
+        """Configurar la caché a partir de la configuración de la aplicación."""
+        self.enabled = app.config['CACHE_ENABLED']
+        self.l1_size = app.config['CACHE_L1_SIZE']
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        self.beta = app.config['CACHE_EARLY_REFRESH_BETA']
+        self.version_check_interval = app.config['CACHE_VERSION_CHECK_INTERVAL']
+        self.lock_timeout = app.config['CACHE_LOCK_TIMEOUT']
+        self.l2_path = app.config['CACHE_L2_PATH'] or None
+        self.prefix = hashlib.sha256(app.config['SQLALCHEMY_DATABASE_URI'].encode('utf-8')).hexdigest()[:16] + ':'
+        self._local = threading.local()
+        if self.l2_path:
+            if not os.path.isabs(self.l2_path):
+                # Las rutas relativas van en la carpeta de instancia, privada de la aplicación
+                os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+                self.l2_path = os.path.join(app.instance_path, self.l2_path)
+            # Abrir el archivo antes de SQLite para crearlo solo con permisos del dueño
+            os.close(os.open(self.l2_path, os.O_RDWR | os.O_CREAT, 0o600))
+            with self._l2() as conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS cache_items (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                             'version INTEGER NOT NULL, expires_at REAL NOT NULL, delta REAL NOT NULL)')
+                conn.execute('CREATE TABLE IF NOT EXISTS cache_versions (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+                conn.execute('CREATE TABLE IF NOT EXISTS cache_leases (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)')
+        app.extensions['cache'] = self
+
+    def get_or_set(self, key, loader, namespace, ttl=None):
+        """
+        Obtener un valor de la caché o calcularlo con `loader` si no existe o caducó.
+
+        Args:
+            key (str): Clave del valor.
+            loader (callable): Función sin argumentos que calcula el valor.
+            namespace (str): Espacio de nombres cuya versión invalida la clave.
+            ttl (int, opcional): Segundos de validez (por defecto CACHE_DEFAULT_TTL).
+
+        Returns:
+            El valor cacheado o recién calculado.
+        """
+        if not self.enabled:
+            return loader()
+
+        ttl = ttl or self.default_ttl
+        version = self.version(namespace)
+        item = self._l1_get(key)
+        if item and item[0] == version and not self._should_refresh(item):
+            self.stats['l1_hits'] += 1
+            return item[3]
+
+        l2_item = self._l2_get(key) if self.l2_path else None
+        if l2_item and l2_item[0] == version:
+            item = l2_item
+            self._l1_set(key, item)
+            if not self._should_refresh(item):
+                self.stats['l2_hits'] += 1
+                return item[3]
+
+        stale = item[3] if item and item[0] == version else None
+        return self._refresh(key, loader, namespace, ttl, version, stale, item is not None and item[0] == version)
+
+    def bump(self, namespace):
+        """
+        Invalidar todas las claves de un espacio de nombres en todos los procesos.
+
+        Args:
+            namespace (str): Espacio de nombres a invalidar.
+        """
+        if not self.enabled:
+            return
+        if self.l2_path:
+            with self._l2() as conn:
+                key = self.prefix + namespace
+                conn.execute('INSERT OR IGNORE INTO cache_versions (namespace, version) VALUES (?, 0)', (key,))
+                conn.execute('UPDATE cache_versions SET version = version + 1 WHERE namespace = ?', (key,))
+                version = conn.execute('SELECT version FROM cache_versions WHERE namespace = ?', (key,)).fetchone()[0]
+        else:
+            version = self._versions.get(namespace, (0, 0))[0] + 1
+        self._versions[namespace] = (version, time.monotonic())
+
+    def version(self, namespace):
+        """Versión actual de un espacio de nombres, consultada en L2 como máximo cada intervalo."""
+        version, checked_at = self._versions.get(namespace, (0, -math.inf))
+        if self.l2_path and time.monotonic() - checked_at >= self.version_check_interval:
+            row = self._l2().execute('SELECT version FROM cache_versions WHERE namespace = ?',
+                                     (self.prefix + namespace,)).fetchone()
+            version = row[0] if row else 0
+            self._versions[namespace] = (version, time.monotonic())
+        return version
+
+    def _refresh(self, key, loader, namespace, ttl, version, stale, has_stale):
+        # Single-flight dentro del proceso: un lock por clave
+        with self._l1_lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=not has_stale):
+            # Otro hilo ya está refrescando la clave: servir el valor anterior
+            return stale
+        try:
+            item = self._l1_get(key)
+            if item and item[0] == version and item[2] > time.time() and not has_stale:
+                return item[3]
+
+            # Single-flight entre procesos: un lease en L2
+            leased = bool(self.l2_path) and self._acquire_lease(key)
+            if self.l2_path and not leased:
+                if has_stale:
+                    return stale
+                item = self._wait_for_value(key, version)
+                if item:
+                    self._l1_set(key, item)
+                    return item[3]
+
+            try:
+                self.stats['misses'] += 1
+                started = time.monotonic()
+                value = loader()
+                # El costo del cálculo (delta) pondera el refresco anticipado
+                item = (version, time.monotonic() - started, time.time() + ttl, value)
+                self._l1_set(key, item)
+                if self.l2_path:
+                    self._l2_set(key, item)
+            finally:
+                if leased:
+                    self._release_lease(key)
+            return value
+        finally:
+            lock.release()
+
+    def _should_refresh(self, item):
+        # XFetch: refrescar antes de caducar con probabilidad creciente según el costo del cálculo
+        _, delta, expires_at, _ = item
+        return time.time() - delta * self.beta * math.log(1 - random.random()) >= expires_at
+
+    def _wait_for_value(self, key, version):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            item = self._l2_get(key)
+            if item and item[0] == version and item[2] > time.time():
+                return item
+        return None
+
+    def _l1_get(self, key):
+        with self._l1_lock:
+            item = self._l1.get(key)
+            if item is not None:
+                self._l1.move_to_end(key)
+            return item
+
+    def _l1_set(self, key, item):
+        with self._l1_lock:
+            self._l1[key] = item
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def _l2(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.l2_path, timeout=self.lock_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _l2_get(self, key):
+        row = self._l2().execute('SELECT version, delta, expires_at, value FROM cache_items WHERE key = ?',
+                                 (self.prefix + key,)).fetchone()
+        if row is None:
+            return None
+        return (row[0], row[1], row[2], json.loads(row[3], object_hook=_decode))
+
+    def _l2_set(self, key, item):
+        version, delta, expires_at, value = item
+        self._l2().execute('INSERT OR REPLACE INTO cache_items (key, value, version, expires_at, delta) VALUES (?, ?, ?, ?, ?)',
+                           (self.prefix + key, json.dumps(value, default=_encode), version, expires_at, delta))
+
+    def _acquire_lease(self, key):
+        now = time.time()
+        conn = self._l2()
+        conn.execute('DELETE FROM cache_leases WHERE key = ? AND expires_at < ?', (self.prefix + key, now))
+        cursor = conn.execute('INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)',
+                              (self.prefix + key, now + self.lock_timeout))
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key):
+        self._l2().execute('DELETE FROM cache_leases WHERE key = ?', (self.prefix + key,))
+
+
+def _encode(value):
+    # Las fechas (por ejemplo `created_at` de las entradas) se guardan etiquetadas para recuperarlas como datetime
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f'Cache values must be JSON serializable, got {type(value).__name__}')
+
+
+def _decode(obj):
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+# Instancia global, inicializada en `create_app` igual que el resto de extensiones
+cache = TieredCache()
@@ -0,0 +1,178 @@
+import sys
+import threading
+import time
+from app.utils.cache import cache
+
+
+class EntrySummary:
+    """
+    Resumen compacto de una entrada para el feed.
+
+    Usa `__slots__` (sin `__dict__` por instancia), por lo que cada resumen ocupa una
+    fracción de lo que ocupa un objeto `Entry` del ORM.
+
+    Atributos:
+        id_entry (int): ID de la entrada de blog.
+        title (str): Título de la entrada.
+        description (str): Descripción corta de la entrada.
+        cover_img (str): Imagen de portada.
+        category (str): Categoría de la entrada.
+        author (str): Nombre del autor.
+        created_at (datetime): Fecha de creación de la entrada.
+    """
+
+    __slots__ = ('id_entry', 'title', 'description', 'cover_img', 'category', 'author', 'created_at')
+
+    def __init__(self, id_entry, title, description, cover_img, category, author, created_at):
+        self.id_entry = id_entry
+        self.title = title
+        self.description = description
+        self.cover_img = cover_img
+        self.category = category
+        self.author = author
+        self.created_at = created_at
+
+
+class HotSet:
+    """
+    Conjunto acotado, propio de cada proceso, de los resúmenes de las entradas más nuevas.
+
+    Contiene siempre las `capacity` entradas con mayor ID (o todas, si hay menos), ordenadas
+    de la más nueva a la más antigua, por lo que la primera página del feed y las siguientes
+    páginas cercanas se sirven sin consultar la base de datos.
+
+    Las escrituras de este proceso lo actualizan en el lugar. Para detectar las escrituras
+    de otros workers se compara la versión del espacio de nombres 'entries' de la caché
+    compartida con la esperada: cada actualización local corresponde a un `bump` de este
+    proceso; cualquier otra diferencia (otro worker, una importación, un cambio de autor)
+    marca el conjunto para recargarse en la siguiente lectura. Con la caché desactivada
+    (desarrollo, un solo proceso) solo se aplican las escrituras locales.
+
+    Además, el conjunto se recarga siempre que tenga más de `ttl` segundos, de modo que un
+    cambio que no pasa por la versión (un `bump` perdido, SQL directo, la caché desactivada
+    con varios workers) deja de verse como mucho tras ese tiempo.
+    """
+
+    def __init__(self):
+        self.capacity = 0
+        self.ttl = 60.0
+        self._items = []  # EntrySummary, de la más nueva a la más antigua
+        self._complete = False  # Si contiene todas las entradas existentes
+        self._loaded = False
+        self._version = None  # Versión de 'entries' esperada
+        self._loaded_at = 0.0  # time.monotonic() de la última recarga
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'reloads': 0}
+
+    def init_app(self, app):
+        self.capacity = app.config['HOT_SET_SIZE']
+        self.ttl = app.config['HOT_SET_TTL']
+        self._items, self._complete, self._loaded = [], False, False
+
+    @property
+    def enabled(self):
+        return self.capacity > 0
+
+    def page(self, limit, cursor, loader):
+        """
+        Obtener una página del feed desde el conjunto.
+
+        Args:
+            limit (int): Entradas por página.
+            cursor (int, opcional): ID de la última entrada de la página anterior.
+            loader (callable): Función (limit) -> List[EntrySummary] que carga las entradas más
+                nuevas cuando el conjunto está vacío o desactualizado.
+
+        Returns:
+            List[EntrySummary] o None si la página no está completa en el conjunto.
+        """
+        if not self.enabled:
+            return None
+        if self._is_stale():
+            self.load(loader)
+
+        items = self._items
+        start = 0
+        if cursor is not None:
+            start = next((i for i, item in enumerate(items) if item.id_entry < cursor), len(items))
+        page = items[start:start + limit]
+        if len(page) < limit and not self._complete:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return page
+
+    def load(self, loader):
+        """Cargar las entradas más nuevas con `loader` (al arrancar o al detectar cambios)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._is_stale():
+                return  # Otro hilo ya lo recargó
+            version = cache.version('entries') if cache.enabled else None
+            items = loader(self.capacity)
+            self._items = list(items)
+            self._complete = len(self._items) < self.capacity
+            self._version, self._loaded, self._loaded_at = version, True, time.monotonic()
+            self.stats['reloads'] += 1
+
+    def _is_stale(self):
+        if not self._loaded or time.monotonic() - self._loaded_at >= self.ttl:
+            return True
+        return cache.enabled and cache.version('entries') != self._version
+
+    def add(self, summaries):
+        """Agregar entradas nuevas (una escritura local, seguida de su `bump`)."""
+        def apply(items):
+            new_ids = {summary.id_entry for summary in summaries}
+            items = [item for item in items if item.id_entry not in new_ids] + list(summaries)
+            items.sort(key=lambda item: item.id_entry, reverse=True)
+            if len(items) > self.capacity:
+                self._complete = False
+                del items[self.capacity:]
+            return items
+        self._apply(apply)
+
+    def replace(self, summary):
+        """Reemplazar el resumen de una entrada modificada, si está en el conjunto."""
+        self._apply(lambda items: [summary if item.id_entry == summary.id_entry else item for item in items])
+
+    def remove(self, id_entry):
+        """
+        Quitar una entrada eliminada. Las restantes siguen siendo las más nuevas, aunque el
+        conjunto queda con una menos hasta la siguiente recarga.
+        """
+        self._apply(lambda items: [item for item in items if item.id_entry != id_entry])
+
+    def _apply(self, func):
+        if not self.enabled or not self._loaded:
+            return
+        with self._lock:
+            # Las listas no se modifican: las lecturas en curso siguen usando la anterior
+            self._items = func(self._items)
+            if self._version is not None:
+                self._version += 1
+
+    def memory(self):
+        """Bytes aproximados ocupados por los resúmenes (registros y sus valores)."""
+        items = self._items
+        total = sys.getsizeof(items)
+        for item in items:
+            total += sys.getsizeof(item)
+            total += sum(sys.getsizeof(getattr(item, name)) for name in EntrySummary.__slots__)
+        return total
+
+    def info(self):
+        """Estado del conjunto para las métricas."""
+        return {
+            'capacity': self.capacity,
+            'ttl': self.ttl,
+            'size': len(self._items),
+            'complete': self._complete,
+            'memory_bytes': self.memory(),
+            **self.stats,
+        }
+
+
+# Instancia global: un conjunto por proceso
+hot_set = HotSet()
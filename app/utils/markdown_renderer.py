@@ -0,0 +1,77 @@
+import hashlib
+import html
+import re
+import threading
+
+# Versión del renderizador: al cambiar extensiones u opciones se incrementa y
+# `flask render rebuild` vuelve a renderizar el contenido guardado
+RENDERER_VERSION = 1
+
+# Esquemas permitidos en enlaces e imágenes (las rutas relativas no tienen esquema)
+SAFE_SCHEMES = {'http', 'https', 'mailto'}
+
+# Espacios y caracteres de control, que los navegadores ignoran al leer el esquema de una URL
+_IGNORED_URL_CHARS = re.compile(r'[\x00-\x20\x7f-\x9f]+')
+# Esquema de una URL: lo que hay antes del primer ':' si no aparece antes '/', '?' o '#'
+_SCHEME_RE = re.compile(r'([^:/?#]*):')
+
+_local = threading.local()
+
+
+def content_hash(content):
+    """Hash SHA-256 (hex) del contenido sin renderizar, usado como clave del render."""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def render(content):
+    """
+    Renderizar el contenido markdown de una entrada a HTML, con resaltado de sintaxis.
+
+    El HTML embebido en el markdown se escapa y se eliminan los enlaces con esquemas no
+    seguros (por ejemplo `javascript:`).
+
+    Args:
+        content (str): Contenido markdown.
+
+    Returns:
+        str: HTML renderizado.
+    """
+    md = _markdown()
+    md.reset()
+    return md.convert(content or '')
+
+
+def _markdown():
+    # Las instancias de Markdown no son thread-safe: una por hilo, reutilizada entre llamadas
+    md = getattr(_local, 'md', None)
+    if md is None:
+        import markdown
+        from markdown.treeprocessors import Treeprocessor
+
+        class SafeLinksTreeprocessor(Treeprocessor):
+            def run(self, root):
+                for element in root.iter():
+                    for attribute in ('href', 'src'):
+                        value = element.get(attribute)
+                        if value is not None and not _is_safe_url(value):
+                            del element.attrib[attribute]
+
+        md = markdown.Markdown(
+            extensions=['fenced_code', 'codehilite', 'tables'],
+            extension_configs={'codehilite': {'guess_lang': False}},
+        )
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        md.treeprocessors.register(SafeLinksTreeprocessor(md), 'safe_links', 0)
+        _local.md = md
+    return md
+
+
+def _is_safe_url(url):
+    # El navegador decodifica las entidades del atributo (`javascript&#58;`, `&colon;`...)
+    # antes de interpretar la URL: se decodifican hasta que no cambien y se comprueba el resultado
+    previous = None
+    while url != previous:
+        previous, url = url, html.unescape(url)
+    scheme = _SCHEME_RE.match(_IGNORED_URL_CHARS.sub('', url).lower())
+    return scheme is None or scheme.group(1) in SAFE_SCHEMES
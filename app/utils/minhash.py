@@ -0,0 +1,73 @@
+import hashlib
+import random
+import re
+
+# Palabras de al menos dos caracteres (incluye acentos y dígitos)
+TOKEN_RE = re.compile(r'\w{2,}', re.UNICODE)
+
+# Primo de Mersenne usado en las permutaciones (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+
+# Coeficientes de las permutaciones, fijos para que las firmas sean comparables entre procesos
+_MAX_PERMUTATIONS = 256
+_rng = random.Random(20261019)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_MAX_PERMUTATIONS)]
+
+
+def shingles(text):
+    """
+    Obtener los shingles de un texto: pares de palabras consecutivas, o las palabras sueltas
+    si el texto tiene una sola.
+
+    Returns:
+        set: Shingles del texto.
+    """
+    tokens = TOKEN_RE.findall((text or '').lower())
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f'{a} {b}' for a, b in zip(tokens, tokens[1:])}
+
+
+def jaccard(a, b):
+    """Similitud de Jaccard entre dos conjuntos de shingles."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def signature(items, size):
+    """
+    Calcular la firma MinHash de un conjunto de shingles.
+
+    La probabilidad de que dos firmas coincidan en una posición es igual a la similitud de
+    Jaccard de los conjuntos.
+
+    Args:
+        items (set): Shingles del texto.
+        size (int): Número de permutaciones (valores de la firma).
+
+    Returns:
+        List[int]: Mínimo de cada permutación (vacía si no hay shingles).
+    """
+    if not items:
+        return []
+    hashes = [int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'big') for item in items]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS[:size]]
+
+
+def bands(values, count, rows):
+    """
+    Agrupar una firma en `count` bandas de `rows` valores y reducir cada banda a un entero.
+
+    Dos textos con similitud s comparten al menos una banda con probabilidad
+    1 - (1 - s^rows)^count: casi siempre si son casi iguales y casi nunca si no se parecen.
+
+    Returns:
+        List[int]: Valor (entero de 64 bits con signo) de cada banda.
+    """
+    result = []
+    for band in range(count):
+        chunk = values[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(b''.join(value.to_bytes(8, 'big') for value in chunk), digest_size=8).digest()
+        result.append(int.from_bytes(digest, 'big', signed=True))
+    return result
@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from flask import request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Nombre usado para las muestras tomadas fuera de una petición o sin endpoint
+NO_ENDPOINT = '<no endpoint>'
+
+# Identificadores de los perfiles guardados (evita rutas fuera de la carpeta de perfiles)
+PROFILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ProfileBusyError(Exception):
+    """Ya hay un perfil en curso en este proceso."""
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo de pilas del proceso que atiende la petición.
+
+    Mientras dura el perfil, un hilo en segundo plano toma cada `interval` segundos la pila
+    de los demás hilos (`sys._current_frames`) y la agrega en formato collapsed
+    (`marco;marco;marco cuenta`), compatible con flamegraph.pl y speedscope. Cada muestra se
+    atribuye al endpoint que atiende el hilo según un mapa hilo -> endpoint que se actualiza
+    al empezar y al terminar cada petición (`init_app`), de modo que también cuentan
+    `before_request`/`after_request` (JWT, commit, compresión), los decoradores y la
+    serialización de `marshal_with`. Fuera de un perfil, el costo por petición es escribir y
+    borrar una entrada del mapa.
+
+    Como el muestreo no ocupa el hilo de la petición, también funciona con workers de un
+    solo hilo (gunicorn `sync`) si el perfil se inicia con `start` y la petición termina:
+    el worker vuelve a atender peticiones mientras se muestrea. `profile` espera el resultado
+    en la petición, por lo que solo ve las demás peticiones con workers de varios hilos
+    (`gthread`, `--threads N`).
+
+    Sesgo del GIL: el hilo de muestreo solo toma la pila cuando obtiene el GIL, es decir,
+    cuando el hilo de la petición lo libera (E/S, consultas) o cuando el intérprete fuerza un
+    cambio de hilo cada `sys.getswitchinterval()` segundos. Durante el perfil ese intervalo
+    se reduce al de muestreo para que las muestras también caigan en código Python, pero la
+    proporción de muestras `[sql]` sigue sobrestimando el tiempo de SQL. La parte de SQL de
+    cada endpoint debe leerse de `sql_time` frente a `time` (tiempo medido de sus peticiones),
+    que se miden con eventos del motor y los hooks de la petición, no por muestreo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sql_started = {}  # id del hilo -> inicio de la consulta en curso
+        self._requests = {}  # id del hilo -> (endpoint, inicio) de la petición en curso
+        self._stats = None  # Estadísticas por endpoint del perfil en curso
+
+    def init_app(self, app):
+        """
+        Registrar los hooks que asocian cada hilo a la petición que atiende.
+
+        Se registran antes que los de las demás extensiones: el `before_request` se ejecuta
+        primero y el `teardown_request` al final, de modo que el tiempo de los otros hooks se
+        atribuye a la petición.
+        """
+        app.before_request_funcs.setdefault(None, []).insert(0, self._request_started)
+        app.teardown_request(self._request_finished)
+
+    def _request_started(self):
+        endpoint = f'{request.url_rule.endpoint}:{request.method}' if request.url_rule else NO_ENDPOINT
+        self._requests[threading.get_ident()] = (endpoint, time.perf_counter())
+
+    def _request_finished(self, exc):
+        current = self._requests.pop(threading.get_ident(), None)
+        stats = self._stats
+        if current is None or stats is None:
+            return
+        endpoint, started = current
+        with stats.lock:
+            stats.endpoints[endpoint]['requests'] += 1
+            stats.endpoints[endpoint]['time'] += time.perf_counter() - started
+
+    def _endpoint(self):
+        current = self._requests.get(threading.get_ident())
+        return current[0] if current else NO_ENDPOINT
+
+    def profile(self, engine, seconds, interval=0.01):
+        """
+        Muestrear el proceso durante `seconds` segundos y esperar el resultado.
+
+        El hilo que llama no se muestrea.
+
+        Args:
+            engine (Engine): Motor de SQLAlchemy cuyas consultas se miden.
+            seconds (float): Duración del perfil.
+            interval (float): Segundos entre muestras.
+
+        Returns:
+            dict: Muestras collapsed por pila y resumen por endpoint.
+
+        Raises:
+            ProfileBusyError: Si ya hay un perfil en curso en el proceso.
+        """
+        result = {}
+        thread = self.start(engine, seconds, interval, callback=result.update,
+                            exclude={threading.get_ident()})
+        thread.join()
+        return result
+
+    def start(self, engine, seconds, interval=0.01, callback=None, exclude=()):
+        """
+        Iniciar un perfil en un hilo en segundo plano, sin esperarlo.
+
+        Args:
+            engine (Engine): Motor de SQLAlchemy cuyas consultas se miden.
+            seconds (float): Duración del perfil.
+            interval (float): Segundos entre muestras.
+            callback (callable, opcional): Función llamada con el resultado al terminar.
+            exclude (set, opcional): IDs de hilos que no se muestrean.
+
+        Returns:
+            threading.Thread: El hilo del perfil.
+
+        Raises:
+            ProfileBusyError: Si ya hay un perfil en curso en el proceso.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfileBusyError('A profile is already running in this worker')
+        try:
+            thread = threading.Thread(
+                target=self._run, args=(engine, seconds, interval, callback, set(exclude)),
+                name='codenet-profiler', daemon=True,
+            )
+            thread.start()
+        except Exception:
+            self._lock.release()
+            raise
+        return thread
+
+    def _run(self, engine, seconds, interval, callback, exclude):
+        try:
+            result = self._sample(engine, seconds, interval, exclude | {threading.get_ident()})
+        finally:
+            self._lock.release()
+        if callback is not None:
+            try:
+                callback(result)
+            except Exception:
+                logger.exception('Profile callback %r failed', callback)
+
+    def _sample(self, engine, seconds, interval, exclude):
+        stacks = Counter()
+        stats = _ProfileStats()
+
+        def before_cursor_execute(*args):
+            self._sql_started[threading.get_ident()] = time.perf_counter()
+
+        def after_cursor_execute(*args):
+            started = self._sql_started.pop(threading.get_ident(), None)
+            if started is None:
+                return
+            elapsed, endpoint = time.perf_counter() - started, self._endpoint()
+            with stats.lock:
+                stats.endpoints[endpoint]['sql_time'] += elapsed
+                stats.endpoints[endpoint]['sql_queries'] += 1
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        # Forzar cambios de hilo al menos con la frecuencia del muestreo (ver el sesgo del GIL)
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, interval))
+        self._stats = stats
+        try:
+            started = time.perf_counter()
+            deadline = started + seconds
+            samples = 0
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    current = self._requests.get(thread_id)
+                    if thread_id in exclude or current is None:
+                        # Hilo sin petición en curso (worker ocioso, hilos de fondo)
+                        continue
+                    endpoint = current[0]
+                    frames = self._walk(frame)
+                    in_sql = thread_id in self._sql_started
+                    if in_sql:
+                        frames.append('[sql]')
+                    stacks[';'.join([endpoint] + frames)] += 1
+                    with stats.lock:
+                        stats.endpoints[endpoint]['samples'] += 1
+                        stats.endpoints[endpoint]['sql_samples'] += in_sql
+                samples += 1
+                time.sleep(interval)
+            duration = time.perf_counter() - started
+        finally:
+            self._stats = None
+            sys.setswitchinterval(switch_interval)
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', after_cursor_execute)
+            self._sql_started.clear()
+
+        endpoints = {}
+        for name, endpoint_stats in stats.endpoints.items():
+            endpoints[name] = {
+                **endpoint_stats,
+                'time': round(endpoint_stats['time'], 6),
+                'sql_time': round(endpoint_stats['sql_time'], 6),
+                # Parte de SQL medida (no muestreada) del tiempo de las peticiones terminadas
+                'sql_share': round(min(1.0, endpoint_stats['sql_time'] / endpoint_stats['time']), 4)
+                if endpoint_stats['time'] else None,
+            }
+        return {
+            'duration': duration,
+            'interval': interval,
+            'ticks': samples,
+            'endpoints': endpoints,
+            'collapsed': [f'{stack} {count}' for stack, count in stacks.most_common()],
+        }
+
+    @staticmethod
+    def _walk(frame):
+        """Obtener los marcos (de afuera hacia adentro) de la pila de un hilo."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+
+class _ProfileStats:
+    """Estadísticas por endpoint de un perfil, compartidas entre los hilos de las peticiones."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(lambda: {
+            'requests': 0, 'time': 0.0, 'samples': 0, 'sql_samples': 0, 'sql_time': 0.0, 'sql_queries': 0,
+        })
+
+
+def save_profile(directory, profile_id, result, keep=20):
+    """
+    Guardar el resultado de un perfil como JSON, visible para todos los workers de la máquina.
+
+    Solo se conservan los `keep` perfiles más recientes.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    path = os.path.join(directory, f'{profile_id}.json')
+    with open(path + '.tmp', 'w') as file:
+        json.dump({'pid': os.getpid(), **result}, file)
+    os.replace(path + '.tmp', path)
+
+    saved = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in saved[keep:]:
+        os.remove(entry.path)
+
+
+def load_profile(directory, profile_id):
+    """
+    Leer un perfil guardado con `save_profile`.
+
+    Returns:
+        dict: El perfil, o None si no existe (o aún no termina).
+    """
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(directory, f'{profile_id}.json')) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+# Instancia global: un solo perfil a la vez por proceso
+profiler = SamplingProfiler()
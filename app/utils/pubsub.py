@@ -0,0 +1,142 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+
+class EventBroker:
+    """
+    Pub/sub en memoria (por proceso) para notificar eventos a los clientes SSE.
+
+    Cada evento publicado recibe una secuencia incremental y se guarda en un buffer circular
+    acotado, de modo que un cliente que se reconecta con `Last-Event-ID` puede recibir
+    los eventos que se perdió mientras el evento siga en el buffer.
+
+    El ID que ve el cliente tiene la forma `<epoch>-<secuencia>`, donde el epoch identifica
+    a esta instancia del broker (se fija al arrancar el proceso). Así, un ID emitido por otro
+    worker o antes de un reinicio no se confunde con una secuencia local.
+
+    Atributos:
+        buffer_size (int): Número máximo de eventos guardados para reanudar conexiones.
+        max_subscribers (int): Límite de conexiones simultáneas por worker.
+        queue_size (int): Eventos pendientes por suscriptor antes de descartar a un cliente lento.
+    """
+
+    def __init__(self, buffer_size=1000, max_subscribers=1000, queue_size=100):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self.epoch = str(time.time_ns() // 1000)
+        self._ids = itertools.count(1)
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+
+    def init_app(self, app):
+        """Configurar el broker a partir de la configuración de la aplicación."""
+        self.buffer_size = app.config.get('STREAM_BUFFER_SIZE', self.buffer_size)
+        self.max_subscribers = app.config.get('STREAM_MAX_CONNECTIONS', self.max_subscribers)
+        self.queue_size = app.config.get('STREAM_QUEUE_SIZE', self.queue_size)
+        with self._lock:
+            self._buffer = deque(self._buffer, maxlen=self.buffer_size)
+        app.extensions['event_broker'] = self
+
+    def publish(self, event_type, data):
+        """
+        Publicar un evento a todos los suscriptores conectados.
+
+        Args:
+            event_type (str): Tipo del evento (por ejemplo 'entry.created').
+            data (dict): Datos serializables a JSON del evento.
+
+        Returns:
+            str: ID asignado al evento (`<epoch>-<secuencia>`).
+        """
+        with self._lock:
+            event = (next(self._ids), event_type, data)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # El cliente no consume sus eventos: se desconecta y podrá reanudar con Last-Event-ID
+                self.unsubscribe(subscriber)
+                subscriber.closed = True
+        return self.format_id(event[0])
+
+    def subscribe(self):
+        """
+        Registrar un nuevo suscriptor.
+
+        Returns:
+            Subscription: Cola de eventos del suscriptor, o None si se alcanzó el límite de conexiones.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(self.queue_size)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        """Eliminar un suscriptor del broker."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def format_id(self, seq):
+        """Construir el ID público (`<epoch>-<secuencia>`) de una secuencia de este broker."""
+        return f"{self.epoch}-{seq}"
+
+    def resume_point(self, last_event_id):
+        """
+        Traducir un `Last-Event-ID` recibido del cliente a una secuencia de este broker.
+
+        Args:
+            last_event_id (str): ID enviado por el cliente al reconectarse (puede ser None).
+
+        Returns:
+            int: Secuencia desde la que reanudar, o None si el ID no pertenece a esta instancia
+                (otro worker, un reinicio, un formato antiguo) o es posterior al último evento
+                publicado. En ese caso la conexión se trata como una suscripción nueva.
+        """
+        epoch, _, seq = (last_event_id or '').strip().partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._lock:
+            newest = self._buffer[-1][0] if self._buffer else 0
+        return seq if seq <= newest else None
+
+    def events_since(self, seq):
+        """
+        Obtener los eventos del buffer posteriores a la secuencia `seq`.
+
+        Args:
+            seq (int): Última secuencia recibida por el cliente (ver `resume_point`).
+
+        Returns:
+            List[tuple]: Eventos (secuencia, tipo, datos) pendientes, en orden.
+        """
+        with self._lock:
+            return [event for event in self._buffer if event[0] > seq]
+
+    @property
+    def subscriber_count(self):
+        """Número de conexiones activas en este worker."""
+        with self._lock:
+            return len(self._subscribers)
+
+
+class Subscription(queue.Queue):
+    """Cola de eventos de una conexión SSE."""
+
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.closed = False
+
+
+# Instancia global, inicializada en `create_app` igual que el resto de extensiones
+broker = EventBroker()
@@ -0,0 +1,181 @@
+import atexit
+import logging
+import queue
+import threading
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Claves de caché (surrogate keys) con las que se etiquetan las respuestas y se purga el proxy:
+# - 'entries:list': listados de entradas y facetas de categoría.
+# - 'entry:<id_entry>': detalle y entradas relacionadas de una entrada.
+# - 'user:<id_user>': perfil de un autor y detalle de sus entradas (muestran su nombre).
+# - 'users:list': listado de nombres de usuario.
+
+
+class NullPurger:
+    """Purger que no hace nada (sin proxy de caché delante de la API)."""
+
+    def purge(self, keys):
+        pass
+
+
+class MemoryPurger:
+    """Purger que guarda las claves purgadas en memoria, para pruebas y desarrollo."""
+
+    def __init__(self, max_items=1000):
+        self.purged = deque(maxlen=max_items)
+
+    def purge(self, keys):
+        self.purged.append(sorted(keys))
+
+
+class HTTPPurger:
+    """
+    Purger que envía una petición al proxy con las claves a invalidar.
+
+    Se envía como máximo una petición por commit, con las claves separadas por espacios en la
+    cabecera de surrogate keys (el formato de Fastly; en Varnish se configura un `ban` sobre
+    la misma cabecera).
+
+    Las peticiones se envían desde un hilo propio: una purga lenta no retrasa la respuesta de
+    la escritura. Las purgas acumuladas mientras se envía una se agrupan en la siguiente, y
+    las pendientes se envían antes de que termine el proceso (por ejemplo, un comando de la CLI).
+
+    Atributos:
+        url (str): URL de purga del proxy.
+        method (str): Método HTTP de la petición (PURGE, POST...).
+        header (str): Cabecera que lleva las claves.
+        timeout (float): Segundos máximos de espera de la respuesta del proxy.
+        asynchronous (bool): Enviar desde el hilo de purgas (False: en la llamada, como
+            `BACKGROUND_TASKS_ASYNC`).
+    """
+
+    def __init__(self, url, method='PURGE', header='Surrogate-Key', timeout=2.0, asynchronous=True):
+        self.url = url
+        self.method = method
+        self.header = header
+        self.timeout = timeout
+        self.asynchronous = asynchronous
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def purge(self, keys):
+        if not self.asynchronous:
+            self.send(keys)
+            return
+        self._queue.put(keys)
+        if self._worker is None:
+            # El hilo se crea en la primera purga, ya dentro del worker (después del fork)
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='codenet-purge', daemon=True)
+                    self._worker.start()
+                    atexit.register(self.join)
+
+    def join(self):
+        """Esperar a que se envíen las purgas pendientes."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            keys, count = set(self._queue.get()), 1
+            while True:
+                try:
+                    keys |= self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                count += 1
+            try:
+                self.send(keys)
+            finally:
+                for _ in range(count):
+                    self._queue.task_done()
+
+    def send(self, keys):
+        """Enviar la petición de purga de las claves al proxy."""
+        purge_request = urllib.request.Request(
+            self.url, method=self.method, headers={self.header: ' '.join(sorted(keys))}
+        )
+        try:
+            with urllib.request.urlopen(purge_request, timeout=self.timeout):
+                pass
+        except OSError:
+            # La respuesta cacheada expira sola por su TTL: un fallo de purga no rompe la escritura
+            logger.exception('Purge of %s failed', ' '.join(sorted(keys)))
+
+
+class Purger:
+    """
+    Punto de entrada de las purgas del proxy de caché, con un backend configurable.
+
+    `HTTP_CACHE_PURGER` elige el backend: vacío o 'null' (sin proxy), 'memory' (guarda las
+    claves) o la URL de purga del proxy. Los servicios lo llaman con
+    `transaction.after_commit(purger.purge, ...)` para no purgar cambios que terminan en rollback.
+    """
+
+    def __init__(self):
+        self.backend = NullPurger()
+
+    def init_app(self, app):
+        target = app.config['HTTP_CACHE_PURGER']
+        if not target or target == 'null':
+            self.backend = NullPurger()
+        elif target == 'memory':
+            self.backend = MemoryPurger()
+        else:
+            self.backend = HTTPPurger(
+                target,
+                method=app.config['HTTP_CACHE_PURGE_METHOD'],
+                header=app.config['HTTP_CACHE_SURROGATE_HEADER'],
+                timeout=app.config['HTTP_CACHE_PURGE_TIMEOUT'],
+                asynchronous=app.config['BACKGROUND_TASKS_ASYNC'],
+            )
+
+    def purge(self, *keys):
+        """
+        Invalidar en el proxy las respuestas etiquetadas con alguna de las claves.
+
+        Args:
+            *keys (str): Surrogate keys a purgar.
+        """
+        if keys:
+            self.backend.purge(set(keys))
+
+
+def serve_stand_in(host='127.0.0.1', port=8081, header='Surrogate-Key'):
+    """
+    Levantar en un hilo un servidor HTTP local que acepta las peticiones de `HTTPPurger`.
+
+    Sustituye al proxy en pruebas y en desarrollo: responde 200 a cualquier método y guarda
+    las claves recibidas en `server.received`.
+
+    Returns:
+        ThreadingHTTPServer: El servidor (detenerlo con `shutdown()`).
+    """
+    received = []
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def _purge(self):
+            keys = self.headers.get(header, '').split()
+            received.append({'method': self.command, 'path': self.path, 'keys': keys})
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        do_PURGE = do_POST = do_BAN = do_GET = _purge
+
+        def log_message(self, format, *args):
+            logger.info('stand-in purge: %s', format % args)
+
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.received = received
+    threading.Thread(target=server.serve_forever, name='codenet-purge-stand-in', daemon=True).start()
+    return server
+
+
+# Instancia global: los servicios purgan a través de ella
+purger = Purger()
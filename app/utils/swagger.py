@@ -0,0 +1,38 @@
+import json
+from flask_restx import Api
+from flask_restx.swagger import Swagger
+
+
+class StaticSpecApi(Api):
+    """
+    Api de Flask-RESTX que sirve una especificación Swagger pre-generada.
+
+    En lugar de construir el `swagger.json` a partir de los modelos de todos los namespaces
+    en la primera petición (incluida la primera validación con `expect(validate=True)`),
+    se carga el artefacto generado con `flask spec export`.
+    """
+
+    def __init__(self, *args, spec_path=None, **kwargs):
+        self.spec_path = spec_path
+        self._static_schema = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def __schema__(self):
+        if self._static_schema is None:
+            with open(self.spec_path, encoding='utf-8') as spec_file:
+                self._static_schema = json.load(spec_file)
+        return self._static_schema
+
+
+def build_spec(api):
+    """
+    Generar la especificación Swagger de la API a partir de sus modelos y recursos.
+
+    Args:
+        api (Api): La instancia de Flask-RESTX registrada en la aplicación.
+
+    Returns:
+        dict: Especificación Swagger 2.0.
+    """
+    return Swagger(api).as_dict()
@@ -0,0 +1,149 @@
+import logging
+from contextlib import contextmanager
+from flask import g, has_app_context
+from sqlalchemy import event
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """
+    Unidad de trabajo de una petición (o de un contexto de aplicación fuera de una petición).
+
+    Atributos:
+        deferred (bool): Si el commit se difiere al final de la petición.
+        callbacks (list): Funciones a ejecutar después del commit, con sus argumentos.
+    """
+
+    def __init__(self, deferred):
+        self.deferred = deferred
+        self.callbacks = []
+
+    def run_callbacks(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for func, args, kwargs in callbacks:
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                # Los datos ya se confirmaron: un efecto secundario fallido no debe romper la respuesta
+                logger.exception('after_commit callback %r failed', func)
+
+
+def init_app(app):
+    """
+    Registrar una transacción por petición: un solo commit al final de la petición si la
+    respuesta es exitosa (< 400) o un rollback en caso contrario.
+
+    Las tareas en segundo plano y los comandos de la CLI no pasan por una petición (y usan su
+    propio contexto de aplicación), por lo que `commit()` confirma de inmediato en ellos.
+    """
+    @app.before_request
+    def begin_unit_of_work():
+        g.unit_of_work = UnitOfWork(deferred=True)
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        unit_of_work = g.pop('unit_of_work', None)
+        if unit_of_work is None:
+            return response
+        if response.status_code < 400:
+            db.session.commit()
+            unit_of_work.run_callbacks()
+        else:
+            db.session.rollback()
+        return response
+
+    @app.teardown_request
+    def discard_unit_of_work(exc):
+        # La petición terminó con una excepción no controlada: descartar los cambios
+        if g.pop('unit_of_work', None) is not None:
+            db.session.rollback()
+
+    # Registrar si la sesión tiene escrituras sin confirmar (ver `after_commit`)
+    if not event.contains(db.session, 'after_flush', _mark_writes):
+        event.listen(db.session, 'after_flush', _mark_writes)
+        event.listen(db.session, 'do_orm_execute', _mark_statement_writes)
+        event.listen(db.session, 'after_commit', _clear_writes)
+        event.listen(db.session, 'after_rollback', _discard_writes)
+
+
+def _mark_writes(session, flush_context):
+    session.info['uncommitted_writes'] = True
+
+
+def _mark_statement_writes(orm_execute_state):
+    # INSERT/UPDATE/DELETE ejecutados con `db.session.execute` no pasan por el flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['uncommitted_writes'] = True
+
+
+def _clear_writes(session):
+    session.info.pop('uncommitted_writes', None)
+
+
+def _discard_writes(session):
+    session.info.pop('uncommitted_writes', None)
+    # Fuera de una petición, los callbacks de cambios descartados no deben ejecutarse después
+    if has_app_context():
+        unit_of_work = g.get('unit_of_work')
+        if unit_of_work is not None and not unit_of_work.deferred:
+            unit_of_work.callbacks = []
+
+
+def _has_uncommitted_writes():
+    session = db.session()
+    return bool(session.new or session.dirty or session.deleted or session.info.get('uncommitted_writes'))
+
+
+def _current():
+    unit_of_work = g.get('unit_of_work')
+    if unit_of_work is None:
+        unit_of_work = g.unit_of_work = UnitOfWork(deferred=False)
+    return unit_of_work
+
+
+def commit():
+    """
+    Confirmar los cambios de la sesión.
+
+    Dentro de una petición solo se hace flush (se asignan los IDs y se detectan los errores de
+    integridad); el commit real ocurre una vez al final de la petición. Fuera de una petición
+    se confirma de inmediato y se ejecutan los callbacks pendientes.
+    """
+    unit_of_work = _current()
+    if unit_of_work.deferred:
+        db.session.flush()
+        return
+    db.session.commit()
+    unit_of_work.run_callbacks()
+
+
+def after_commit(func, *args, **kwargs):
+    """
+    Ejecutar `func(*args, **kwargs)` después del commit de la unidad de trabajo actual.
+
+    Se usa para los efectos fuera de la base de datos (eventos del stream, invalidación de la
+    caché, filtro de disponibilidad, tareas en segundo plano), que no deben ocurrir si la
+    transacción termina en rollback. Fuera de una petición se ejecuta de inmediato, salvo que
+    la sesión tenga escrituras sin confirmar: entonces espera al siguiente `commit()` (y se
+    descarta si la transacción termina en rollback). Una transacción abierta solo por lecturas
+    no lo retrasa.
+    """
+    unit_of_work = _current()
+    if not unit_of_work.deferred and not _has_uncommitted_writes():
+        func(*args, **kwargs)
+        return
+    unit_of_work.callbacks.append((func, args, kwargs))
+
+
+@contextmanager
+def savepoint():
+    """
+    Ejecutar un bloque dentro de un SAVEPOINT.
+
+    Si el bloque lanza una excepción (por ejemplo `IntegrityError` al hacer flush), solo se
+    deshacen sus cambios y la unidad de trabajo de la petición sigue siendo válida.
+    """
+    with db.session.begin_nested():
+        yield
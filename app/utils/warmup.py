@@ -0,0 +1,72 @@
+import time
+from flask import current_app
+from app import db
+
+
+def warm_up(app, api):
+    """
+    Preparar el worker antes de aceptar tráfico para que las primeras peticiones no paguen
+    el arranque en frío.
+
+    - Abre `WARMUP_POOL_CONNECTIONS` conexiones del pool de la base de datos.
+    - Construye la especificación Swagger y el resolver usado por `expect(validate=True)`,
+      y compila los validadores JSON Schema.
+    - Precarga las cachés (filtro de disponibilidad de usuarios, lista de entradas).
+    - Carga los resúmenes de las entradas más nuevas del feed (`hot_set`).
+
+    Un fallo en cualquiera de los pasos se registra en el log y no impide el arranque.
+
+    Args:
+        app (Flask): La aplicación a preparar.
+        api (Api): La instancia de Flask-RESTX de la aplicación.
+
+    Returns:
+        dict: Segundos empleados en cada paso.
+    """
+    timings = {}
+    with app.app_context():
+        for name, step in (
+            ('pool', lambda: _open_pool_connections(app.config['WARMUP_POOL_CONNECTIONS'])),
+            ('validators', lambda: _compile_validators(app, api)),
+            ('caches', _prime_caches),
+            ('hot_set', _load_hot_set),
+        ):
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                current_app.logger.exception('Warm-up step %s failed', name)
+            timings[name] = time.perf_counter() - start
+        db.session.remove()
+    return timings
+
+
+def _open_pool_connections(count):
+    # Abrir todas las conexiones a la vez para que el pool las cree y las conserve
+    pool_size = getattr(db.engine.pool, 'size', lambda: count)()
+    connections = [db.engine.connect() for _ in range(min(count, pool_size))]
+    for connection in connections:
+        connection.close()
+
+
+def _compile_validators(app, api):
+    from app.controllers.entry_controller import get_entry_validator
+
+    with app.test_request_context():
+        api.refresolver  # Construye (o carga) la especificación Swagger y el resolver de $ref
+    get_entry_validator()
+
+
+def _prime_caches():
+    from app.services.user_service import UserService
+    from app.services.entry_service import EntryService
+
+    UserService.build_taken_filter()
+    EntryService.list_entries()
+
+
+def _load_hot_set():
+    from app.services.entry_service import EntryService
+
+    # La primera página del feed carga el conjunto completo
+    EntryService.list_feed(1)
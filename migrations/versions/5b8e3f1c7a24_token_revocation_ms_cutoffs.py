@@ -0,0 +1,31 @@
+"""token revocation millisecond cutoffs
+
+Revision ID: 5b8e3f1c7a24
+Revises: 9d4f6b2e8a13
+Create Date: 2026-10-19 16:32:47.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e3f1c7a24'
+down_revision = '9d4f6b2e8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_revocations', schema=None) as batch_op:
+        batch_op.alter_column('revoked_before', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=True)
+
+    # Los cortes en segundos eran inclusivos: pasan a milisegundos exclusivos (fin de ese segundo)
+    op.execute('UPDATE token_revocations SET revoked_before = (revoked_before + 1) * 1000 WHERE revoked_before IS NOT NULL')
+
+
+def downgrade():
+    op.execute('UPDATE token_revocations SET revoked_before = (revoked_before - 1) / 1000 WHERE revoked_before IS NOT NULL')
+
+    with op.batch_alter_table('token_revocations', schema=None) as batch_op:
+        batch_op.alter_column('revoked_before', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=True)
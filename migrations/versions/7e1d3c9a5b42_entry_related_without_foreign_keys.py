@@ -0,0 +1,59 @@
+"""entry related rows survive archiving
+
+Revision ID: 7e1d3c9a5b42
+Revises: 5b8e3f1c7a24
+Create Date: 2026-10-19 18:05:12.337914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1d3c9a5b42'
+down_revision = '5b8e3f1c7a24'
+branch_labels = None
+depends_on = None
+
+# Las filas de `entry_related` pueden apuntar a entradas archivadas (`entries_archive`): se
+# eliminan las claves foráneas a `entries` y la limpieza pasa a los servicios
+entry_related = sa.Table('entry_related', sa.MetaData(),
+    sa.Column('id_entry', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('id_related', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id_entry', 'rank'),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # SQLite no elimina restricciones (y estas no tienen nombre): se recrea la tabla sin ellas
+        with op.batch_alter_table('entry_related', recreate='always', copy_from=entry_related):
+            pass
+    else:
+        for fk in sa.inspect(bind).get_foreign_keys('entry_related'):
+            if fk['referred_table'] == 'entries':
+                op.drop_constraint(fk['name'], 'entry_related', type_='foreignkey')
+
+    # Índice para las búsquedas por entrada relacionada (antes lo cubría el de la clave foránea)
+    indexes = sa.inspect(bind).get_indexes('entry_related')
+    if not any(index['column_names'] == ['id_related'] for index in indexes):
+        op.create_index('ix_entry_related_id_related', 'entry_related', ['id_related'])
+
+
+def downgrade():
+    # Las filas de entradas archivadas o eliminadas no cumplirían las claves foráneas
+    entries = sa.table('entries', sa.column('id_entry', sa.Integer))
+    live = sa.select(entries.c.id_entry)
+    op.execute(entry_related.delete().where(
+        sa.or_(entry_related.c.id_entry.not_in(live), entry_related.c.id_related.not_in(live))
+    ))
+
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('entry_related')}
+    with op.batch_alter_table('entry_related', schema=None) as batch_op:
+        if 'ix_entry_related_id_related' in indexes:
+            batch_op.drop_index('ix_entry_related_id_related')
+        batch_op.create_foreign_key('fk_entry_related_id_entry', 'entries', ['id_entry'], ['id_entry'], ondelete='CASCADE')
+        batch_op.create_foreign_key('fk_entry_related_id_related', 'entries', ['id_related'], ['id_entry'], ondelete='CASCADE')
@@ -0,0 +1,50 @@
+"""user profile counters
+
+Revision ID: 8c1f2a7d9e41
+Revises: 51bb9964d71f
+Create Date: 2026-10-19 10:12:03.418227
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f2a7d9e41'
+down_revision = '51bb9964d71f'
+branch_labels = None
+depends_on = None
+
+
+users = sa.table('users',
+    sa.column('id_user', sa.Integer),
+    sa.column('entry_count', sa.Integer),
+)
+entries = sa.table('entries',
+    sa.column('id_entry', sa.Integer),
+    sa.column('id_user', sa.Integer),
+)
+
+
+def upgrade():
+    backfill.add_column('users', sa.Column('entry_count', sa.Integer(), server_default='0', nullable=False))
+    backfill.add_column('users', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+    backfill.add_column('users', sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+    backfill.create_index('ix_entries_id_user_created_at', 'entries', ['id_user', 'created_at'])
+
+    # Inicializar los contadores con las entradas existentes, por bloques de usuarios
+    entry_count = sa.select(sa.func.count(entries.c.id_entry)).where(entries.c.id_user == users.c.id_user).scalar_subquery()
+    backfill.backfill('8c1f2a7d9e41_users_entry_count', users, users.c.id_user, values={'entry_count': entry_count})
+
+
+def downgrade():
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_entries_id_user_created_at')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('follower_count')
+        batch_op.drop_column('entry_count')
+
+    backfill.reset('8c1f2a7d9e41_users_entry_count')
@@ -0,0 +1,37 @@
+"""entry fingerprint bands
+
+Revision ID: 9d4f6b2e8a13
+Revises: c7e2b94d1f58
+Create Date: 2026-10-19 15:48:03.291746
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f6b2e8a13'
+down_revision = 'c7e2b94d1f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('entry_fingerprint_bands',
+    sa.Column('band', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('value', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('id_entry', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_entry'], ['entries.id_entry'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('band', 'value', 'id_entry')
+    )
+    with op.batch_alter_table('entry_fingerprint_bands', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_entry_fingerprint_bands_id_entry'), ['id_entry'], unique=False)
+
+    # Las entradas existentes se indexan con `flask duplicates fingerprint`
+
+
+def downgrade():
+    with op.batch_alter_table('entry_fingerprint_bands', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_entry_fingerprint_bands_id_entry'))
+
+    op.drop_table('entry_fingerprint_bands')
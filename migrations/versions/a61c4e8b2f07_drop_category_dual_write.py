@@ -0,0 +1,79 @@
+"""drop category dual write trigger and recount rollout counters
+
+Revision ID: a61c4e8b2f07
+Revises: 7e1d3c9a5b42
+Create Date: 2026-10-19 14:32:45.106388
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61c4e8b2f07'
+down_revision = '7e1d3c9a5b42'
+# Paso de contracción: se aplica después del despliegue, cuando todas las instancias ya escriben
+# `id_category` y `users.entry_count` (ver README)
+branch_labels = None
+depends_on = None
+
+entries = sa.table('entries',
+    sa.column('id_entry', sa.Integer),
+    sa.column('id_user', sa.Integer),
+    sa.column('category', sa.String),
+    sa.column('id_category', sa.SmallInteger),
+)
+entries_archive = sa.table('entries_archive',
+    sa.column('id_entry', sa.Integer),
+    sa.column('id_user', sa.Integer),
+    sa.column('id_category', sa.SmallInteger),
+)
+users = sa.table('users',
+    sa.column('id_user', sa.Integer),
+    sa.column('entry_count', sa.Integer),
+)
+categories = sa.table('categories',
+    sa.column('id_category', sa.SmallInteger),
+    sa.column('name', sa.String),
+    sa.column('entry_count', sa.Integer),
+)
+
+
+def upgrade():
+    backfill.drop_dual_write_trigger('entries', 'id_category')
+
+    # Filas escritas durante el despliegue por instancias que solo escriben `category` sin que el
+    # trigger las cubriera (dialectos sin trigger): categorías nuevas, `id_category` y contadores
+    conn = op.get_bind()
+    known = sa.select(categories.c.id_category).where(categories.c.name == entries.c.category)
+    conn.execute(categories.insert().from_select(
+        ['name'], sa.select(entries.c.category).where(entries.c.id_category.is_(None), ~known.exists()).distinct()
+    ))
+    backfill.backfill(
+        'a61c4e8b2f07_entries_id_category', entries, entries.c.id_entry,
+        values={'id_category': known.scalar_subquery()}, where=entries.c.id_category.is_(None),
+    )
+    # Las entradas archivadas también cuentan
+    entry_count = (
+        sa.select(sa.func.count(entries.c.id_entry)).where(entries.c.id_category == categories.c.id_category).scalar_subquery()
+        + sa.select(sa.func.count(entries_archive.c.id_entry)).where(entries_archive.c.id_category == categories.c.id_category).scalar_subquery()
+    )
+    conn.execute(categories.update().values(entry_count=entry_count))
+
+    # Las instancias anteriores a 8c1f2a7d9e41 no incrementan `users.entry_count`, y sus entradas
+    # quedaron fuera del rango de su backfill: recontar por bloques de usuarios
+    entry_count = (
+        sa.select(sa.func.count(entries.c.id_entry)).where(entries.c.id_user == users.c.id_user).scalar_subquery()
+        + sa.select(sa.func.count(entries_archive.c.id_entry)).where(entries_archive.c.id_user == users.c.id_user).scalar_subquery()
+    )
+    backfill.backfill('a61c4e8b2f07_users_entry_count', users, users.c.id_user, values={'entry_count': entry_count})
+
+
+def downgrade():
+    backfill.create_dual_write_trigger(
+        'entries', 'id_entry', 'id_category',
+        '(SELECT id_category FROM categories WHERE name = NEW.category)', ['category'],
+    )
+    backfill.reset('a61c4e8b2f07_entries_id_category')
+    backfill.reset('a61c4e8b2f07_users_entry_count')
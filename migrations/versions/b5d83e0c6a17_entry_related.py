@@ -0,0 +1,32 @@
+"""entry related table
+
+Revision ID: b5d83e0c6a17
+Revises: 8c1f2a7d9e41
+Create Date: 2026-10-19 11:02:47.160385
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d83e0c6a17'
+down_revision = '8c1f2a7d9e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('entry_related',
+    sa.Column('id_entry', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('id_related', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['id_entry'], ['entries.id_entry'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_related'], ['entries.id_entry'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_entry', 'rank')
+    )
+
+
+def downgrade():
+    op.drop_table('entry_related')
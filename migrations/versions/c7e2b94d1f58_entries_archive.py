@@ -0,0 +1,55 @@
+"""entries archive
+
+Revision ID: c7e2b94d1f58
+Revises: f3b7d1e5a920
+Create Date: 2026-10-19 15:10:27.583914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2b94d1f58'
+down_revision = 'f3b7d1e5a920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabla aparte en lugar de particiones por rango: MySQL no admite claves foráneas en tablas
+    # InnoDB particionadas. Las entradas se mueven con `flask archive run`.
+    op.create_table('entries_archive',
+    sa.Column('id_entry', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('cover_img', sa.String(length=200), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('content', sa.String(length=200), nullable=False),
+    sa.Column('category', sa.String(length=15), nullable=False),
+    sa.Column('source_file', sa.String(length=100), nullable=True),
+    sa.Column('github_link', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('id_user', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('id_category', sa.SmallInteger(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_category'], ['categories.id_category'], name='fk_entries_archive_id_category'),
+    sa.ForeignKeyConstraint(['id_user'], ['users.id_user'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id_entry')
+    )
+    with op.batch_alter_table('entries_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_entries_archive_id_user'), ['id_user'], unique=False)
+
+
+def downgrade():
+    # Devolver las entradas archivadas a `entries` antes de eliminar la tabla
+    op.execute(
+        'INSERT INTO entries (id_entry, cover_img, title, description, content, category, source_file, '
+        'github_link, created_at, id_user, content_hash, id_category) '
+        'SELECT id_entry, cover_img, title, description, content, category, source_file, '
+        'github_link, created_at, id_user, content_hash, id_category FROM entries_archive'
+    )
+    with op.batch_alter_table('entries_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_entries_archive_id_user'))
+
+    op.drop_table('entries_archive')
@@ -0,0 +1,39 @@
+"""token revocations
+
+Revision ID: d27a4f91c3b8
+Revises: b5d83e0c6a17
+Create Date: 2026-10-19 12:20:31.905142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27a4f91c3b8'
+down_revision = 'b5d83e0c6a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revocations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=36), nullable=True),
+    sa.Column('id_user', sa.Integer(), nullable=True),
+    sa.Column('revoked_before', sa.Integer(), nullable=True),
+    sa.Column('expires_at', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('token_revocations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_revocations_id_user'), ['id_user'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_revocations_jti'), ['jti'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_revocations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_revocations_jti'))
+        batch_op.drop_index(batch_op.f('ix_token_revocations_id_user'))
+
+    op.drop_table('token_revocations')
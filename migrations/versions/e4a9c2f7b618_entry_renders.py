@@ -0,0 +1,39 @@
+"""entry renders
+
+Revision ID: e4a9c2f7b618
+Revises: d27a4f91c3b8
+Create Date: 2026-10-19 13:05:12.447310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c2f7b618'
+down_revision = 'd27a4f91c3b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('entry_renders',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('renderer_version', sa.Integer(), nullable=False),
+    sa.Column('html', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_entries_content_hash'), ['content_hash'], unique=False)
+
+    # Las entradas existentes se renderizan con `flask render rebuild`
+
+
+def downgrade():
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_entries_content_hash'))
+        batch_op.drop_column('content_hash')
+
+    op.drop_table('entry_renders')
@@ -0,0 +1,76 @@
+"""categories
+
+Revision ID: f3b7d1e5a920
+Revises: e4a9c2f7b618
+Create Date: 2026-10-19 13:48:03.215774
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils import backfill
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7d1e5a920'
+down_revision = 'e4a9c2f7b618'
+branch_labels = None
+depends_on = None
+
+entries = sa.table('entries',
+    sa.column('id_entry', sa.Integer),
+    sa.column('category', sa.String),
+    sa.column('id_category', sa.SmallInteger),
+)
+categories = sa.table('categories',
+    sa.column('id_category', sa.SmallInteger),
+    sa.column('name', sa.String),
+    sa.column('entry_count', sa.Integer),
+)
+
+
+def upgrade():
+    # La migración puede volver a ejecutarse tras una interrupción: el DDL ya aplicado se omite
+    if not backfill.has_table('categories'):
+        op.create_table('categories',
+        sa.Column('id_category', sa.SmallInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('name', sa.String(length=15), nullable=False),
+        sa.Column('entry_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id_category'),
+        sa.UniqueConstraint('name')
+        )
+    backfill.add_column('entries', sa.Column('id_category', sa.SmallInteger(), nullable=True))
+    backfill.create_index(op.f('ix_entries_id_category'), 'entries', ['id_category'])
+    backfill.create_foreign_key('fk_entries_id_category', 'entries', 'categories', ['id_category'], ['id_category'])
+
+    # Una fila por categoría distinta (pocas filas: una sola sentencia)
+    conn = op.get_bind()
+    known = sa.select(categories.c.id_category).where(categories.c.name == entries.c.category)
+    conn.execute(categories.insert().from_select(['name'], sa.select(entries.c.category).where(~known.exists()).distinct()))
+
+    # Las instancias que aún escriben solo `category` mantienen `id_category` a través del trigger
+    # (se elimina en a61c4e8b2f07, después del despliegue); las filas existentes se llenan por bloques
+    backfill.create_dual_write_trigger(
+        'entries', 'id_entry', 'id_category',
+        '(SELECT id_category FROM categories WHERE name = NEW.category)', ['category'],
+    )
+    category_id = sa.select(categories.c.id_category).where(categories.c.name == entries.c.category).scalar_subquery()
+    backfill.backfill(
+        'f3b7d1e5a920_entries_id_category', entries, entries.c.id_entry,
+        values={'id_category': category_id}, where=entries.c.id_category.is_(None),
+    )
+
+    entry_count = (
+        sa.select(sa.func.count(entries.c.id_entry)).where(entries.c.id_category == categories.c.id_category).scalar_subquery()
+    )
+    conn.execute(categories.update().values(entry_count=entry_count))
+
+
+def downgrade():
+    backfill.drop_dual_write_trigger('entries', 'id_category')
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_entries_id_category', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_entries_id_category'))
+        batch_op.drop_column('id_category')
+
+    op.drop_table('categories')
+    backfill.reset('f3b7d1e5a920_entries_id_category')
@@ -0,0 +1,38 @@
+from unittest import mock
+from app import create_app, db
+from app.config import Config
+
+
+def create_test_app(database_uri='sqlite://', create_tables=True, **config):
+    """
+    Crear la aplicación con una base de datos SQLite y sin servicios externos.
+
+    Args:
+        database_uri (str): URI de la base de datos (por defecto SQLite en memoria).
+        create_tables (bool): Crear las tablas de los modelos con `create_all`.
+        **config: Valores de configuración a reemplazar.
+
+    Returns:
+        Flask: La aplicación configurada.
+    """
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLALCHEMY_ECHO': False,
+        'CACHE_L2_PATH': '',
+        'WARMUP_ENABLED': False,
+        'BACKGROUND_TASKS_ASYNC': False,
+        'RELATED_ENABLED': False,
+        **config,
+    }
+    # `create_app` carga la configuración de la clase Config
+    with mock.patch.multiple(Config, **overrides):
+        app = create_app()
+    if create_tables:
+        with app.app_context():
+            # Registrar todos los modelos en los metadatos antes de crear las tablas
+            from app.models import (  # noqa: F401
+                category, entry, entry_archive, entry_fingerprint_band, entry_related, entry_render,
+                token_revocation, user,
+            )
+            db.create_all()
+    return app
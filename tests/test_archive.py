@@ -0,0 +1,59 @@
+import unittest
+from datetime import datetime, timedelta
+from app import db
+from app.models.entry import Entry
+from app.models.entry_archive import EntryArchive
+from app.models.entry_related import EntryRelated
+from app.models.user import User
+from app.services.archive_service import ArchiveService
+from app.services.entry_service import EntryService
+from tests.helpers import create_test_app
+
+
+class ArchivedRelatedTest(unittest.TestCase):
+    """Las entradas relacionadas sobreviven al archivo de cualquiera de los dos lados."""
+
+    def setUp(self):
+        self.app = create_test_app(RATELIMIT_ENABLED=False)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.session.add(User(id_user=1, email='ana@example.com', password='x', username='ana', name='Ana'))
+            old, new = datetime.now() - timedelta(days=400), datetime.now()
+            for id_entry, created_at in ((1, old), (2, new), (3, new)):
+                entry = Entry(id_entry=id_entry, cover_img='c.png', title=f'Entrada {id_entry}',
+                              content='x', category='python', id_user=1)
+                # El constructor siempre usa la fecha actual
+                entry.created_at = created_at
+                db.session.add(entry)
+            # 1 <-> 2 y 2 -> 3
+            db.session.add_all([
+                EntryRelated(id_entry=1, rank=0, id_related=2, score=0.9),
+                EntryRelated(id_entry=2, rank=0, id_related=1, score=0.9),
+                EntryRelated(id_entry=2, rank=1, id_related=3, score=0.5),
+            ])
+            db.session.commit()
+            self.assertEqual(ArchiveService.archive(older_than_days=30), 1)
+            self.assertIsNotNone(db.session.get(EntryArchive, 1))
+
+    def related(self, id_entry):
+        response = self.client.get(f'/entries/{id_entry}/related')
+        self.assertEqual(response.status_code, 200)
+        return [(item['id_entry'], item['title']) for item in response.get_json()]
+
+    def test_archived_entry_keeps_its_related(self):
+        self.assertEqual(self.related(1), [(2, 'Entrada 2')])
+
+    def test_live_entry_keeps_archived_neighbour(self):
+        self.assertEqual(self.related(2), [(1, 'Entrada 1'), (3, 'Entrada 3')])
+
+    def test_delete_forgets_rows_on_both_sides(self):
+        with self.app.app_context():
+            EntryService.delete_entry(1)
+            db.session.commit()
+            self.assertEqual(db.session.query(EntryRelated).filter_by(id_related=1).count(), 0)
+            self.assertEqual(db.session.query(EntryRelated).filter_by(id_entry=1).count(), 0)
+        self.assertEqual(self.related(2), [(3, 'Entrada 3')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+from flask_migrate import upgrade, downgrade, stamp
+from sqlalchemy import text
+from app import db
+from app.utils import backfill
+from tests.helpers import create_test_app
+
+CATEGORIES = ['py', 'js', 'go']
+
+
+class Interrupted(Exception):
+    pass
+
+
+class CategoriesBackfillTest(unittest.TestCase):
+    """
+    Migración en línea de `f3b7d1e5a920` (categorías) sobre una base de datos SQLite con datos:
+    backfill por bloques, interrupción, reanudación desde el punto de control y trigger de
+    doble escritura hasta el paso de contracción (`a61c4e8b2f07`).
+    """
+
+    ENTRIES = 500
+    CHUNK_SIZE = 50
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'migrations.db')
+        self.app = create_test_app(
+            f'sqlite:///{path}', BACKFILL_CHUNK_SIZE=self.CHUNK_SIZE, BACKFILL_THROTTLE=0,
+        )
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        logging.disable(logging.CRITICAL)
+        # Llevar el esquema a la revisión anterior a las categorías y cargar las filas existentes
+        stamp(revision='head')
+        downgrade(revision='e4a9c2f7b618')
+        db.session.execute(text("INSERT INTO users (id_user, email, password, username, name) VALUES (1, 'a', 'p', 'a', 'A'), (2, 'b', 'p', 'b', 'B')"))
+        db.session.execute(
+            text("INSERT INTO entries (id_entry, cover_img, title, content, category, id_user) VALUES (:i, 'c', 't', 'x', :c, :u)"),
+            [{'i': i, 'c': CATEGORIES[i % 3], 'u': i % 2 + 1} for i in range(1, self.ENTRIES + 1)],
+        )
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        logging.disable(logging.NOTSET)
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def scalar(self, sql):
+        return db.session.execute(text(sql)).scalar()
+
+    def run_upgrade(self, revision, stop_at=None):
+        """Aplicar la migración registrando los bloques; con `stop_at`, interrumpirla en esa clave."""
+        progress = []
+        run = backfill._run
+
+        def tracked_run(engine, name, pk, transform, chunk_size, throttle, _progress):
+            def record(last_id, max_id, rows):
+                progress.append((name, last_id))
+                if stop_at is not None and last_id >= stop_at:
+                    raise Interrupted(last_id)
+            return run(engine, name, pk, transform, chunk_size, throttle, record)
+
+        db.session.remove()
+        with mock.patch.object(backfill, '_run', tracked_run):
+            upgrade(revision=revision)
+        return progress
+
+    def test_interrupted_backfill_resumes_from_checkpoint(self):
+        with self.assertRaises(Interrupted):
+            self.run_upgrade('f3b7d1e5a920', stop_at=200)
+
+        # Los bloques confirmados quedan hechos y el punto de control apunta al último
+        db.session.remove()
+        checkpoint = db.session.execute(text(
+            "SELECT last_id, max_id, rows, completed_at FROM backfill_checkpoints WHERE name = 'f3b7d1e5a920_entries_id_category'"
+        )).one()
+        self.assertEqual((checkpoint.last_id, checkpoint.max_id, checkpoint.rows), (200, self.ENTRIES, 200))
+        self.assertIsNone(checkpoint.completed_at)
+        self.assertEqual(self.scalar('SELECT count(*) FROM entries WHERE id_category IS NOT NULL'), 200)
+
+        # Mientras tanto, una instancia anterior escribe solo `category`: el trigger completa `id_category`
+        db.session.execute(text("INSERT INTO entries (id_entry, cover_img, title, content, category, id_user) VALUES (1000, 'c', 't', 'x', 'js', 1)"))
+        db.session.commit()
+        self.assertEqual(
+            self.scalar('SELECT id_category FROM entries WHERE id_entry = 1000'),
+            self.scalar("SELECT id_category FROM categories WHERE name = 'js'"),
+        )
+
+        # Al volver a ejecutar la migración, el DDL aplicado se omite y el backfill sigue en 201
+        progress = self.run_upgrade('f3b7d1e5a920')
+        self.assertEqual(progress[0], ('f3b7d1e5a920_entries_id_category', 200 + self.CHUNK_SIZE))
+        self.assertEqual(progress[-1], ('f3b7d1e5a920_entries_id_category', self.ENTRIES))
+        db.session.remove()
+        self.assertEqual(self.scalar('SELECT count(*) FROM entries WHERE id_category IS NULL'), 0)
+        self.assertEqual(self.scalar('SELECT count(*) FROM categories'), len(CATEGORIES))
+        self.assertIsNotNone(self.scalar("SELECT completed_at FROM backfill_checkpoints WHERE name = 'f3b7d1e5a920_entries_id_category'"))
+
+        # El trigger también sigue los cambios de categoría
+        db.session.execute(text("UPDATE entries SET category = 'go' WHERE id_entry = 1"))
+        db.session.commit()
+        self.assertEqual(
+            self.scalar('SELECT id_category FROM entries WHERE id_entry = 1'),
+            self.scalar("SELECT id_category FROM categories WHERE name = 'go'"),
+        )
+
+    def test_contract_step_drops_trigger_and_recounts(self):
+        self.run_upgrade('f3b7d1e5a920')
+        # Entradas de una instancia anterior, que no incrementa `users.entry_count`
+        db.session.execute(text("INSERT INTO entries (id_entry, cover_img, title, content, category, id_user) VALUES (1000, 'c', 't', 'x', 'js', 1)"))
+        db.session.commit()
+
+        self.run_upgrade('head')
+        db.session.remove()
+        self.assertEqual(self.scalar("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'"), 0)
+        counts = dict(db.session.execute(text('SELECT id_user, entry_count FROM users')).all())
+        self.assertEqual(counts, {1: self.ENTRIES // 2 + 1, 2: self.ENTRIES // 2})
+        categories = dict(db.session.execute(text('SELECT name, entry_count FROM categories')).all())
+        self.assertEqual(sum(categories.values()), self.ENTRIES + 1)
+        self.assertEqual(categories['js'], self.scalar("SELECT count(*) FROM entries WHERE category = 'js'"))
+
+    def test_completed_backfill_is_not_repeated(self):
+        self.run_upgrade('f3b7d1e5a920')
+        db.session.remove()
+        from app.models.entry import Entry
+        table = Entry.__table__
+        self.assertEqual(
+            backfill.backfill('f3b7d1e5a920_entries_id_category', table, table.c.id_entry,
+                              values={'id_category': None}, bind=db.engine),
+            0,
+        )
+        self.assertEqual(self.scalar('SELECT count(*) FROM entries WHERE id_category IS NULL'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
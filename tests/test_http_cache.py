@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from app.utils.purge import HTTPPurger, purger, serve_stand_in
+from tests.helpers import create_test_app
+
+
+class StandInTestCase(unittest.TestCase):
+    """Aplicación con el purger HTTP apuntando al servidor local que sustituye al proxy."""
+
+    def setUp(self):
+        self.server = serve_stand_in(port=0)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        host, port = self.server.server_address
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.app = create_test_app(
+            f'sqlite:///{os.path.join(self.tmp.name, "api.db")}',
+            HTTP_CACHE_PURGER=f'http://{host}:{port}/purge',
+            BACKGROUND_TASKS_ASYNC=True,
+            RATELIMIT_ENABLED=False,
+        )
+        self.client = self.app.test_client()
+
+    def purges(self):
+        """Claves recibidas por el servidor desde la última llamada (una lista por petición)."""
+        purger.backend.join()
+        received = [sorted(purge['keys']) for purge in self.server.received]
+        self.server.received.clear()
+        return received
+
+    def create_user(self, username='ana'):
+        return self.client.post('/users/', json={
+            'email': f'{username}@example.com', 'username': username, 'password': 'pw', 'name': username.title(),
+        })
+
+    def login(self, username='ana'):
+        token = self.client.post('/auth/login', json={'username': username, 'password': 'pw'}).get_json()['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+    def create_entry(self, headers, title='Primera'):
+        return self.client.post('/entries/', json={
+            'cover_img': 'c.png', 'title': title, 'content': 'Hola', 'category': 'python',
+        }, headers=headers)
+
+
+class CacheHeadersTest(StandInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_user()
+        self.id_entry = self.create_entry(self.login()).get_json()['id_entry']
+        self.purges()
+
+    def assertCached(self, response, policy, keys):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], self.app.config['HTTP_CACHE_POLICIES'][policy])
+        self.assertIn('Authorization', response.headers['Vary'])
+        self.assertEqual(response.headers['Surrogate-Key'].split(), keys)
+
+    def test_list(self):
+        self.assertCached(self.client.get('/entries/'), 'list', ['entries:list'])
+        self.assertCached(self.client.get('/users/'), 'list', ['users:list'])
+
+    def test_detail_includes_author_key(self):
+        self.assertCached(self.client.get(f'/entries/{self.id_entry}'), 'public', [f'entry:{self.id_entry}', 'user:1'])
+        self.assertCached(self.client.get('/users/ana/profile'), 'public', ['user:1'])
+
+    def test_errors_are_not_stored(self):
+        response = self.client.get('/entries/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        self.assertIn('Authorization', response.headers['Vary'])
+        self.assertNotIn('Surrogate-Key', response.headers)
+
+    def test_reads_do_not_purge(self):
+        self.client.get('/entries/')
+        self.client.get(f'/entries/{self.id_entry}')
+        self.assertEqual(self.purges(), [])
+
+
+class PurgeKeysTest(StandInTestCase):
+    def test_write_paths(self):
+        self.assertEqual(self.create_user().status_code, 200)
+        self.assertEqual(self.purges(), [['users:list']])
+        headers = self.login()
+
+        id_entry = self.create_entry(headers).get_json()['id_entry']
+        self.assertEqual(self.purges(), [['entries:list', 'user:1']])
+
+        response = self.client.post('/entries/bulk', json=[
+            {'cover_img': 'c.png', 'title': f'Bloque {i}', 'content': 'x', 'category': 'go'} for i in range(3)
+        ], headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.purges(), [['entries:list', 'user:1']])
+
+        self.client.put(f'/entries/{id_entry}', json={'title': 'Editada'}, headers=headers)
+        self.assertEqual(self.purges(), [['entries:list', f'entry:{id_entry}', 'user:1']])
+
+        self.client.delete(f'/entries/{id_entry}', headers=headers)
+        self.assertEqual(self.purges(), [['entries:list', f'entry:{id_entry}', 'user:1']])
+
+        self.client.put('/users/ana', json={'name': 'Ana María'}, headers=headers)
+        self.assertEqual(self.purges(), [['entries:list', 'user:1', 'users:list']])
+
+        self.client.delete('/users/ana', headers=headers)
+        self.assertEqual(self.purges(), [['entries:list', 'user:1', 'users:list']])
+
+    def test_purge_method_and_path(self):
+        self.create_user()
+        purger.backend.join()
+        self.assertEqual(
+            [(purge['method'], purge['path']) for purge in self.server.received], [('PURGE', '/purge')]
+        )
+
+    def test_failed_write_does_not_purge(self):
+        self.create_user()
+        self.create_user('bob')
+        id_entry = self.create_entry(self.login()).get_json()['id_entry']
+        self.purges()
+        # Entrada de otro autor: la petición termina en error y no hay commit
+        response = self.client.put(f'/entries/{id_entry}', json={'title': 'x'}, headers=self.login('bob'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.purges(), [])
+
+
+class HTTPPurgerTest(unittest.TestCase):
+    def test_purge_does_not_wait_for_the_proxy(self):
+        server = serve_stand_in(port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address
+        backend = HTTPPurger(f'http://{host}:{port}/')
+
+        sending, release = threading.Event(), threading.Event()
+        send = backend.send
+
+        def slow_send(keys):
+            # Un proxy lento: la purga queda en espera hasta que se libera
+            sending.set()
+            release.wait(5)
+            send(keys)
+
+        with mock.patch.object(backend, 'send', side_effect=slow_send):
+            started = time.perf_counter()
+            backend.purge({'entry:1'})
+            self.assertTrue(sending.wait(5))
+            backend.purge({'entry:2'})
+            backend.purge({'entries:list'})
+            self.assertLess(time.perf_counter() - started, 0.5)
+            self.assertEqual(server.received, [])
+            release.set()
+            backend.join()
+
+        # La primera se envía sola; las acumuladas mientras tanto, en una sola petición
+        self.assertEqual([sorted(purge['keys']) for purge in server.received], [['entry:1'], ['entries:list', 'entry:2']])
+
+
+if __name__ == '__main__':
+    unittest.main()
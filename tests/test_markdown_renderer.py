@@ -0,0 +1,63 @@
+import unittest
+from app.utils.markdown_renderer import render, _is_safe_url
+
+
+class SafeUrlTest(unittest.TestCase):
+    """Pruebas del filtro de esquemas de enlaces e imágenes del renderizador."""
+
+    UNSAFE = [
+        'javascript:alert(1)',
+        'JavaScript:alert(1)',
+        ' javascript:alert(1)',
+        'javascript&#58;alert(1)',
+        'javascript&#0000058;alert(1)',
+        'javascript&#x3a;alert(1)',
+        'javascript&#X3A;alert(1)',
+        'javascript&colon;alert(1)',
+        '&#106;avascript:alert(1)',
+        'java&#x09;script:alert(1)',
+        'java\tscript:alert(1)',
+        'java\nscript&colon;alert(1)',
+        '\x01javascript:alert(1)',
+        'javascript&amp;colon;alert(1)',
+        'data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==',
+        'vbscript&#58;msgbox(1)',
+    ]
+
+    SAFE = [
+        'https://example.com/a?b=c:d',
+        'http://example.com',
+        'mailto:ana@example.com',
+        '/entries/1',
+        'entries/1#a:b',
+        '?q=a:b',
+        '#seccion',
+        '//example.com/img.png',
+        'https&#58;//example.com',
+    ]
+
+    def test_unsafe_urls(self):
+        for url in self.UNSAFE:
+            with self.subTest(url=url):
+                self.assertFalse(_is_safe_url(url))
+
+    def test_safe_urls(self):
+        for url in self.SAFE:
+            with self.subTest(url=url):
+                self.assertTrue(_is_safe_url(url))
+
+    def test_render_drops_entity_encoded_links(self):
+        for url in ('javascript&#58;alert(1)', 'javascript&#x3a;alert(1)', 'javascript&colon;alert(1)'):
+            with self.subTest(url=url):
+                html = render(f'[a]({url}) ![i]({url})')
+                self.assertNotIn('href', html)
+                self.assertNotIn('src', html)
+
+    def test_render_keeps_safe_links(self):
+        html = render('[a](https://example.com) ![i](/img/a.png)')
+        self.assertIn('href="https://example.com"', html)
+        self.assertIn('src="/img/a.png"', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from app.middlewares.rate_limit import MemoryBackend, SQLiteBackend, limiter, parse_limit
+from tests.helpers import create_test_app
+
+
+class TokenBucketTests:
+    """Pruebas comunes a los backends de buckets de tokens."""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('app.middlewares.rate_limit.time')
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.time.side_effect = self.time.monotonic.side_effect = lambda: self.now
+        self.backend = self.make_backend()
+
+    def test_capacity_then_reject_with_retry_after(self):
+        capacity, rate = parse_limit('3/minute')
+        results = [self.backend.consume('login', 'ana', capacity, rate) for _ in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertAlmostEqual(results[-1][1], 20)
+
+    def test_refill(self):
+        capacity, rate = parse_limit('3/minute')
+        for _ in range(3):
+            self.backend.consume('login', 'ana', capacity, rate)
+        self.now += 20
+        self.assertTrue(self.backend.consume('login', 'ana', capacity, rate)[0])
+        self.assertFalse(self.backend.consume('login', 'ana', capacity, rate)[0])
+
+    def test_keys_and_limits_are_independent(self):
+        capacity, rate = parse_limit('1/minute')
+        self.assertTrue(self.backend.consume('login', 'ana', capacity, rate)[0])
+        self.assertTrue(self.backend.consume('login', 'bob', capacity, rate)[0])
+        self.assertTrue(self.backend.consume('write', 'ana', capacity, rate)[0])
+        self.assertFalse(self.backend.consume('login', 'ana', capacity, rate)[0])
+
+
+class MemoryBackendTest(TokenBucketTests, unittest.TestCase):
+    def make_backend(self):
+        return MemoryBackend(max_keys=100)
+
+    def test_full_buckets_are_evicted(self):
+        capacity, rate = parse_limit('5/minute')
+        for i in range(50):
+            self.backend.consume('login', f'user{i}', capacity, rate)
+        self.now += 60
+        self.backend.consume('login', 'ana', capacity, rate)
+        self.assertEqual(list(self.backend._stores['login'].buckets), ['ana'])
+
+
+class SQLiteBackendTest(TokenBucketTests, unittest.TestCase):
+    def make_backend(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return SQLiteBackend(os.path.join(tmp.name, 'rate.db'), max_idle=60, prune_every=10)
+
+    def count(self):
+        return self.backend._connect().execute('SELECT count(*) FROM rate_buckets').fetchone()[0]
+
+    def test_idle_buckets_are_pruned(self):
+        capacity, rate = parse_limit('5/minute')
+        # Nombres de usuario elegidos por el cliente: cada uno crea un bucket
+        for i in range(9):
+            self.backend.consume('login_username', f'user{i}', capacity, rate)
+        self.assertEqual(self.count(), 9)
+        self.now += 61
+        self.backend.consume('login_username', 'ana', capacity, rate)
+        self.assertEqual(self.count(), 1)
+
+    def test_recent_buckets_are_kept(self):
+        capacity, rate = parse_limit('5/minute')
+        for i in range(10):
+            self.backend.consume('login_username', f'user{i}', capacity, rate)
+        self.assertEqual(self.count(), 10)
+
+
+class LoginLimitsTest(unittest.TestCase):
+    """Límites del endpoint de login con el backend SQLite compartido entre procesos."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.app = create_test_app(
+            RATELIMIT_STORAGE=f'sqlite:///{os.path.join(self.tmp.name, "rate.db")}',
+            RATE_LIMITS={'login_ip': '3/minute', 'login_username': '2/minute', 'write': '60/minute'},
+            CONCURRENCY_LIMITS={'bcrypt': 1, 'write': 32},
+            TRUSTED_PROXY_COUNT=1,
+        )
+        self.client = self.app.test_client()
+
+    def login(self, username='ana', ip='203.0.113.1'):
+        return self.client.post('/auth/login', json={'username': username, 'password': 'x'},
+                                headers={'X-Forwarded-For': ip})
+
+    def test_username_limit_returns_429(self):
+        self.assertEqual([self.login().status_code for _ in range(2)], [401, 401])
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '30')
+        # El límite es por cuenta: la misma cuenta desde otra IP sigue bloqueada, otra cuenta no
+        self.assertEqual(self.login(ip='198.51.100.7').status_code, 429)
+        self.assertEqual(self.login('bob', ip='198.51.100.7').status_code, 401)
+
+    def test_ip_limit_uses_forwarded_address(self):
+        for username in ('u1', 'u2', 'u3'):
+            self.assertEqual(self.login(username).status_code, 401)
+        self.assertEqual(self.login('u4').status_code, 429)
+        # Detrás del proxy, otro cliente no comparte el bucket del primero
+        self.assertEqual(self.login('u5', ip='198.51.100.7').status_code, 401)
+
+    def test_untrusted_forwarded_hops_are_ignored(self):
+        # Solo se confía en el salto añadido por el proxy: el cliente no elige su IP
+        for username in ('u1', 'u2', 'u3'):
+            self.assertEqual(self.login(username, ip=f'10.0.0.{username[-1]}, 203.0.113.1').status_code, 401)
+        self.assertEqual(self.login('u4', ip='10.0.0.9, 203.0.113.1').status_code, 429)
+
+    def test_concurrency_cap_returns_503(self):
+        with self.app.app_context():
+            # Una verificación bcrypt en curso ocupa el único lugar del grupo
+            self.assertTrue(limiter.acquire('bcrypt'))
+            try:
+                response = self.login()
+            finally:
+                limiter.release('bcrypt')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], str(self.app.config['CONCURRENCY_RETRY_AFTER']))
+        self.assertEqual(self.login().status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
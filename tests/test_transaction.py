@@ -0,0 +1,175 @@
+import unittest
+from unittest import mock
+from flask import abort
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.user import User
+from app.utils import transaction
+from tests.helpers import create_test_app
+
+
+def new_user(username):
+    return User(email=f'{username}@example.com', password='x', username=username, name=username.title())
+
+
+class UnitOfWorkTest(unittest.TestCase):
+    """Una transacción por petición: un commit al final si la respuesta es exitosa."""
+
+    def setUp(self):
+        self.app = create_test_app(RATELIMIT_ENABLED=False)
+        self.calls = []
+        self.commits = 0
+
+        def count_commit(session):
+            self.commits += 1
+        event.listen(db.session, 'after_commit', count_commit)
+        self.addCleanup(event.remove, db.session, 'after_commit', count_commit)
+
+        def write(username, status=200, error=None):
+            db.session.add(new_user(username))
+            transaction.commit()
+            transaction.after_commit(self.calls.append, username)
+            if error is not None:
+                raise error
+            if status >= 400:
+                abort(status)
+            return {'id_user': User.query.filter_by(username=username).one().id_user}, status
+
+        self.app.add_url_rule('/t/write/<username>', 'write', lambda username: write(username), methods=['POST'])
+        self.app.add_url_rule('/t/twice', 'twice', self.write_twice, methods=['POST'])
+        self.app.add_url_rule('/t/conflict/<int:status>', 'conflict', lambda status: write('ana', status), methods=['POST'])
+        self.app.add_url_rule('/t/error', 'error', lambda: write('ana', error=RuntimeError('boom')), methods=['POST'])
+        self.app.add_url_rule('/t/savepoint', 'savepoint', self.write_with_savepoint, methods=['POST'])
+        self.client = self.app.test_client()
+
+    def write_twice(self):
+        for username in ('ana', 'bob'):
+            db.session.add(new_user(username))
+            transaction.commit()
+            transaction.after_commit(self.calls.append, (username, self.commits))
+        return {}
+
+    def write_with_savepoint(self):
+        db.session.add(new_user('ana'))
+        transaction.commit()
+        try:
+            with transaction.savepoint():
+                db.session.add(new_user('ana'))
+                transaction.commit()
+        except IntegrityError:
+            self.calls.append('duplicate')
+        db.session.add(new_user('bob'))
+        transaction.commit()
+        return {}
+
+    def usernames(self):
+        with self.app.app_context():
+            return sorted(db.session.scalars(db.select(User.username)))
+
+    def test_one_commit_per_successful_request(self):
+        response = self.client.post('/t/twice')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.commits, 1)
+        # Los callbacks se ejecutan una vez, después del único commit
+        self.assertEqual(self.calls, [('ana', 0), ('bob', 0)])
+        self.assertEqual(self.usernames(), ['ana', 'bob'])
+
+    def test_ids_are_assigned_before_the_commit(self):
+        response = self.client.post('/t/write/ana')
+        self.assertEqual(response.get_json(), {'id_user': 1})
+        self.assertEqual(self.calls, ['ana'])
+
+    def test_rollback_on_error_status(self):
+        for status in (400, 403, 404, 409, 500):
+            with self.subTest(status=status):
+                self.assertEqual(self.client.post(f'/t/conflict/{status}').status_code, status)
+                self.assertEqual(self.commits, 0)
+                self.assertEqual(self.calls, [])
+                self.assertEqual(self.usernames(), [])
+
+    def test_rollback_on_exception(self):
+        # La configuración propaga las excepciones: after_request no se ejecuta y el rollback
+        # ocurre en el teardown
+        with self.assertRaises(RuntimeError):
+            self.client.post('/t/error')
+        self.assertEqual((self.commits, self.calls, self.usernames()), (0, [], []))
+        # La sesión sigue siendo válida para la petición siguiente
+        self.assertEqual(self.client.post('/t/write/bob').status_code, 200)
+        self.assertEqual(self.usernames(), ['bob'])
+
+    def test_rollback_on_handled_exception(self):
+        # Sin propagar, la excepción se convierte en una respuesta 500
+        self.app.config['PROPAGATE_EXCEPTIONS'] = False
+        self.assertEqual(self.client.post('/t/error').status_code, 500)
+        self.assertEqual((self.commits, self.calls, self.usernames()), (0, [], []))
+
+    def test_savepoint_recovers_from_integrity_error(self):
+        self.assertEqual(self.client.post('/t/savepoint').status_code, 200)
+        self.assertEqual(self.calls, ['duplicate'])
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(self.usernames(), ['ana', 'bob'])
+
+    def test_failing_callback_does_not_break_the_response(self):
+        def fail():
+            raise RuntimeError('side effect')
+
+        def write():
+            db.session.add(new_user('ana'))
+            transaction.commit()
+            transaction.after_commit(fail)
+            transaction.after_commit(self.calls.append, 'after')
+            return {}
+
+        self.app.add_url_rule('/t/callback', 'callback', write, methods=['POST'])
+        # El fileConfig de Alembic (otras pruebas) desactiva los loggers existentes
+        with mock.patch.object(transaction, 'logger') as logger:
+            self.assertEqual(self.client.post('/t/callback').status_code, 200)
+        logger.exception.assert_called_once()
+        self.assertEqual(self.calls, ['after'])
+        self.assertEqual(self.usernames(), ['ana'])
+
+
+class OutsideRequestTest(unittest.TestCase):
+    """Fuera de una petición (tareas en segundo plano, CLI) `commit()` confirma de inmediato."""
+
+    def setUp(self):
+        self.app = create_test_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+        self.calls = []
+
+    def test_callback_waits_for_pending_writes(self):
+        db.session.add(new_user('ana'))
+        transaction.after_commit(self.calls.append, 'ana')
+        self.assertEqual(self.calls, [])
+        transaction.commit()
+        self.assertEqual(self.calls, ['ana'])
+
+    def test_callback_without_writes_runs_immediately(self):
+        User.query.all()
+        transaction.after_commit(self.calls.append, 'read')
+        self.assertEqual(self.calls, ['read'])
+
+    def test_callback_is_discarded_on_rollback(self):
+        db.session.add(new_user('ana'))
+        transaction.after_commit(self.calls.append, 'ana')
+        db.session.rollback()
+        transaction.commit()
+        self.assertEqual(self.calls, [])
+
+    def test_savepoint_keeps_outer_changes(self):
+        db.session.add(new_user('ana'))
+        transaction.commit()
+        db.session.add(new_user('bob'))
+        with self.assertRaises(IntegrityError):
+            with transaction.savepoint():
+                db.session.add(new_user('ana'))
+                db.session.flush()
+        transaction.commit()
+        self.assertEqual(sorted(db.session.scalars(db.select(User.username))), ['ana', 'bob'])
+
+
+if __name__ == '__main__':
+    unittest.main()